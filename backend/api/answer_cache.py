@@ -0,0 +1,104 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", query.lower()).strip(" ?!.")
+
+
+class AnswerCache:
+    """LRU + TTL cache of chat answers.
+
+    Lookups match exactly on (normalised query, scope), or semantically when a cached query with the
+    same scope has cosine similarity >= similarity_threshold. The scope is whatever else shapes the
+    answer (top_k and retrieval filters). Everything is dropped whenever the index version changes,
+    and an answer built from an older version than the current one is never stored.
+    """
+
+    def __init__(self, max_entries, ttl_seconds, similarity_threshold):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.entries = OrderedDict()
+        self.version = None
+        self.lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def set_version(self, version):
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+
+    def _live(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] < time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def get_exact(self, query, scope):
+        with self.lock:
+            entry = self._live((normalize_query(query), scope))
+            if entry is None:
+                return None
+            self.exact_hits += 1
+            return entry["response"]
+
+    def get_similar(self, embedding, scope):
+        embedding = np.asarray(embedding, dtype="float32")
+        embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        with self.lock:
+            now = time.time()
+            best_key, best_score, expired = None, self.similarity_threshold, []
+            for key, entry in self.entries.items():
+                if entry["expires_at"] < now:
+                    # Evicted rather than skipped, so an expired near-match never shadows a live one again
+                    expired.append(key)
+                    continue
+                if key[1] != scope:
+                    continue
+                score = float(entry["embedding"] @ embedding)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            for key in expired:
+                del self.entries[key]
+            if best_key is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            return self.entries[best_key]["response"]
+
+    def put(self, query, scope, embedding, response, version):
+        """Cache response, unless version (of the sources it was built from) is no longer current."""
+        embedding = np.asarray(embedding, dtype="float32")
+        with self.lock:
+            if version != self.version:
+                return
+            self.entries[(normalize_query(query), scope)] = {
+                "embedding": embedding / (np.linalg.norm(embedding) or 1.0),
+                "response": response,
+                "expires_at": time.time() + self.ttl,
+            }
+            self.entries.move_to_end((normalize_query(query), scope))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "index_version": self.version,
+            }
@@ -0,0 +1,122 @@
+import time
+import asyncio
+from collections import deque
+
+from api.inference_executor import DeadlineExceeded
+
+
+class MicroBatcher:
+    """Collects concurrent requests for up to max_wait_ms (or max_batch_size items) and hands
+    them to process_batch as one list, run on the inference executor.
+
+    Each item comes with the Job it was admitted under; items whose job was abandoned (deadline
+    passed, client gone) by the time a worker picks the batch up are dropped from it. At most one
+    batch per executor worker is in flight, so requests keep batching up while the workers are busy.
+    process_batch must return one result per item, in order.
+    """
+
+    def __init__(self, process_batch, executor, max_batch_size, max_wait_ms, history=1000):
+        self.process_batch = process_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = None
+        self.task = None
+        self.slots = None
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = deque(maxlen=history)
+        self.wait_times = deque(maxlen=history)
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.executor.workers)
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    async def submit(self, item, job):
+        """Result for item, or DeadlineExceeded once job's deadline passes; the job is cancelled either way."""
+        future = asyncio.get_running_loop().create_future()
+        job.item = item
+        await self.queue.put((job, future, time.perf_counter()))
+        try:
+            return await asyncio.wait_for(future, max(job.remaining(), 0))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Deadline exceeded") from None
+        finally:
+            job.cancel()
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            await self.slots.acquire()
+            batch = await self._collect()
+            # Requests whose client already went away are dropped before doing any work
+            for job, future, _ in batch:
+                if future.done():
+                    self.executor.release(job)
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                self.slots.release()
+                continue
+
+            started = time.perf_counter()
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes.append(len(batch))
+            self.wait_times.extend(started - queued_at for _, _, queued_at in batch)
+            asyncio.get_running_loop().create_task(self._process(batch))
+
+    async def _process(self, batch):
+        futures = {id(job): future for job, future, _ in batch}
+        try:
+            live, results = await asyncio.wrap_future(
+                self.executor.submit([job for job, _, _ in batch], lambda jobs: self.process_batch([job.item for job in jobs]))
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.slots.release()
+
+        for job, result in zip(live, results):
+            future = futures.pop(id(job))
+            if not future.done():
+                future.set_result(result)
+        # Dropped by the executor before the batch ran
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(DeadlineExceeded("Deadline exceeded while queued"))
+
+    def metrics(self):
+        sizes = sorted(self.batch_sizes)
+        waits = sorted(self.wait_times)
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+            "p50_batch_size": sizes[len(sizes) // 2] if sizes else 0,
+            "max_seen_batch_size": sizes[-1] if sizes else 0,
+            "p50_wait_ms": round(waits[len(waits) // 2] * 1000, 2) if waits else 0,
+            "p95_wait_ms": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else 0,
+        }
@@ -0,0 +1,70 @@
+from bm25 import tokenize
+
+PROMPT_TEMPLATE = "You are a helpful assistant. Based on the news below, answer the following question.\n\nNews:\n{context}\n\nQuestion: {query}\nAnswer:"
+# Generators whose tokenizer reports no real input limit (transformers uses a huge sentinel)
+DEFAULT_INPUT_TOKENS = 512
+
+
+def source_text(item):
+    # Articles found through the passage index carry their matching passages instead of a summary
+    return item.get("summary", "").strip() or " ".join(item.get("passages", [])).strip()
+
+
+def source_line(item, text):
+    title = item.get("title", "").strip()
+    category = item.get("category", "").strip().title()
+    return f"- ({category}) {title}: {text}\n"
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def input_budget(tokenizer, budget=0):
+    """Prompt tokens available: budget when set, else what the generator accepts."""
+    limit = getattr(tokenizer, "model_max_length", None) or DEFAULT_INPUT_TOKENS
+    if limit > 100000:
+        limit = DEFAULT_INPUT_TOKENS
+    return min(budget, limit) if budget else limit
+
+
+def build_context(query, sources, tokenizer, budget, dedup_threshold):
+    """(prompt, used sources): sources in rank order, minus near-duplicates, until the prompt is full.
+
+    A source whose text shares dedup_threshold of its words with one already used adds nothing
+    for the generator and is skipped. A source that doesn't fit in what is left of the budget
+    is skipped for shorter ones after it; only the first source is cut down to fit, so the
+    context is never empty while there is anything to put in it.
+    """
+    candidates, seen = [], []
+    for item in sources:
+        text = source_text(item)
+        words = set(tokenize(text))
+        if not text or any(jaccard(words, other) >= dedup_threshold for other in seen):
+            continue
+        seen.append(words)
+        candidates.append((item, text))
+    if not candidates:
+        return PROMPT_TEMPLATE.format(context="", query=query), []
+
+    remaining = budget - len(tokenizer(PROMPT_TEMPLATE.format(context="", query=query))["input_ids"])
+    lines = [source_line(item, text) for item, text in candidates]
+    costs = [len(ids) for ids in tokenizer(lines, add_special_tokens=False)["input_ids"]]
+
+    context, used = "", []
+    for (item, text), line, cost in zip(candidates, lines, costs):
+        if cost > remaining and not used and remaining > 0:
+            # Drop words in proportion to the overshoot; tokens per word is close enough to constant
+            words = text.split()
+            while words and cost > remaining:
+                words = words[:max(int(len(words) * remaining / cost) - 1, 0)]
+                line = source_line(item, " ".join(words))
+                cost = len(tokenizer(line, add_special_tokens=False)["input_ids"])
+            if not words:
+                continue
+        if cost > remaining:
+            continue
+        context += line
+        remaining -= cost
+        used.append(item)
+    return PROMPT_TEMPLATE.format(context=context, query=query), used
@@ -0,0 +1,133 @@
+# Chat generation helpers; imported lazily by api.main since transformers takes seconds to import
+import torch
+from transformers import TextStreamer, StoppingCriteria, StoppingCriteriaList
+
+
+class CallbackStreamer(TextStreamer):
+    """Hands each chunk of decoded answer text to on_text as soon as generate produces it.
+
+    The newest holdback tokens are only sent once generation ends, after trim(tokens) has cut the
+    repetition loop that may have ended it, so a client never sees the loop.
+    """
+
+    def __init__(self, tokenizer, on_text, holdback=0, trim=lambda ids: ids):
+        super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        self.on_text = on_text
+        self.holdback = holdback
+        self.trim = trim
+
+    def put(self, value):
+        if self.skip_prompt and self.next_tokens_are_prompt:
+            self.next_tokens_are_prompt = False
+            return
+        self.token_cache.extend(value.reshape(-1).tolist())
+        # Complete words only, as TextStreamer sends them, short of the held-back tokens
+        text = self.tokenizer.decode(self.token_cache[:max(len(self.token_cache) - self.holdback, 0)], **self.decode_kwargs)
+        self._send(text[:text.rfind(" ") + 1])
+
+    def end(self):
+        self._send(self.tokenizer.decode(self.trim(self.token_cache), **self.decode_kwargs))
+        self.token_cache, self.print_len = [], 0
+        self.next_tokens_are_prompt = True
+
+    def _send(self, text):
+        if len(text) > self.print_len:
+            self.on_text(text[self.print_len:])
+            self.print_len = len(text)
+
+
+class StopWhen(StoppingCriteria):
+    """Ends generation at the next token once stop() is true, e.g. when the client has gone."""
+
+    def __init__(self, stop):
+        self.stop = stop
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), bool(self.stop()), dtype=torch.bool, device=input_ids.device)
+
+
+# Shortest n-gram RepetitionStop and trim_repetition treat as a loop
+MIN_NGRAM = 2
+
+
+class RepetitionStop(StoppingCriteria):
+    """Ends a sequence once it has produced the same n-gram (2 <= n <= ngram) times times in a row.
+
+    Small generators that have said what they know tend to loop on a phrase until max tokens
+    instead of emitting EOS; everything after the loop starts is wasted decode steps.
+    """
+
+    def __init__(self, ngram, times):
+        self.ngram = ngram
+        self.times = times
+
+    def __call__(self, input_ids, scores, **kwargs):
+        done = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+        # Single tokens repeat in ordinary text ("....", "2000", subword pieces), so loops start at bigrams
+        for n in range(MIN_NGRAM, self.ngram + 1):
+            if input_ids.shape[1] < n * self.times:
+                break
+            tail = input_ids[:, -n * self.times:].reshape(input_ids.shape[0], self.times, n)
+            done |= (tail == tail[:, :1]).all(dim=2).all(dim=1)
+        return done
+
+
+def answer_complete(ngram, times):
+    return [RepetitionStop(ngram, times)] if times > 1 else []
+
+
+def trim_repetition(ids, ngram, times, special_ids=()):
+    """ids without the repetition loop RepetitionStop ends a sequence on, keeping one copy of the n-gram.
+
+    Trailing special tokens (EOS, the padding after a sequence that stopped early in a batch) are
+    dropped first; a sequence that did not end in a loop is otherwise returned as it is.
+    """
+    end = len(ids)
+    while end and ids[end - 1] in special_ids:
+        end -= 1
+    if times < 2:
+        return ids[:end]
+    for n in range(MIN_NGRAM, ngram + 1):
+        tail = ids[end - n:end]
+        repeats = 1
+        while end >= n * (repeats + 1) and ids[end - n * (repeats + 1):end - n * repeats] == tail:
+            repeats += 1
+        if repeats >= times:
+            return ids[:end - n * (repeats - 1)]
+    return ids[:end]
+
+
+def generate_batch(generator, prompts, max_new_tokens, ngram, times):
+    """Answers for prompts as one padded batch; each stops at EOS, max_new_tokens or a repetition loop."""
+    tokenizer = generator.tokenizer
+    outputs = generator(
+        prompts,
+        max_new_tokens=max_new_tokens,
+        batch_size=len(prompts),
+        stopping_criteria=StoppingCriteriaList(answer_complete(ngram, times)),
+        return_tensors=True,
+    )
+    special_ids = set(tokenizer.all_special_ids)
+    return [
+        tokenizer.decode(trim_repetition(output["generated_token_ids"].tolist(), ngram, times, special_ids), skip_special_tokens=True).strip()
+        for output in outputs
+    ]
+
+
+def stream_generate(generator, prompt, on_text, stop, max_new_tokens, ngram, times):
+    tokenizer = generator.tokenizer
+    inputs = tokenizer(prompt, return_tensors="pt", truncation=True)
+    special_ids = set(tokenizer.all_special_ids)
+    # A loop RepetitionStop ends on is at most ngram * times tokens, all but one copy of which is cut
+    streamer = CallbackStreamer(
+        tokenizer, on_text,
+        holdback=ngram * (times - 1) if times > 1 else 0,
+        trim=lambda ids: trim_repetition(ids, ngram, times, special_ids),
+    )
+    generator.model.generate(
+        input_ids=inputs["input_ids"],
+        attention_mask=inputs["attention_mask"],
+        max_new_tokens=max_new_tokens,
+        streamer=streamer,
+        stopping_criteria=StoppingCriteriaList([StopWhen(stop), *answer_complete(ngram, times)]),
+    )
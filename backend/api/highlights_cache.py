@@ -0,0 +1,74 @@
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024
+
+
+class HighlightsCache:
+    """Serialised /api/highlights responses, built once per index version and kept in memory.
+
+    Each (category, source, offset, limit) variant is encoded once with its strong ETag and its
+    gzip/brotli bodies, so repeated polling costs a dict lookup. Items come from the bundle's
+    metadata store, which filters and pages them itself.
+    """
+
+    def __init__(self, max_variants=64):
+        self.max_variants = max_variants
+        self.version = None
+        self.metadata = None
+        self.variants = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _refresh(self, version, metadata):
+        if version != self.version:
+            self.metadata = metadata
+            self.variants.clear()
+            self.version = version
+
+    def get(self, version, metadata, category=None, source=None, offset=0, limit=None):
+        key = (category and category.lower(), source and source.lower(), offset, limit)
+        with self.lock:
+            self._refresh(version, metadata)
+            variant = self.variants.get(key)
+            if variant is None:
+                variant = self._build(*key)
+                self.variants[key] = variant
+                while len(self.variants) > self.max_variants:
+                    self.variants.popitem(last=False)
+            self.variants.move_to_end(key)
+            return variant
+
+    def _build(self, category, source, offset, limit):
+        total, items = self.metadata.page(category, source, offset, limit)
+
+        body = json.dumps(items, separators=(",", ":")).encode("utf-8")
+        etag = hashlib.sha1(body).hexdigest()
+        variant = {"total": total, "etag": etag, "identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            variant["gzip"] = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                variant["br"] = brotli.compress(body, quality=5)
+        return variant
+
+
+def pick_encoding(variant, accept_encoding):
+    accepted = {part.split(";")[0].strip() for part in (accept_encoding or "").lower().split(",")}
+    for encoding in ("br", "gzip"):
+        if encoding in accepted and encoding in variant:
+            return encoding
+    return "identity"
+
+
+def etag_matches(if_none_match, *etags):
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+    return "*" in candidates or any(etag in candidates for etag in etags)
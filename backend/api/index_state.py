@@ -0,0 +1,244 @@
+import asyncio
+import threading
+from collections import defaultdict
+import numpy as np
+
+from config import HYBRID_RETRIEVAL, RRF_K, RETRIEVAL_CANDIDATES, PASSAGES_PER_ARTICLE
+from config import CURRENT_BUNDLE_FILE, PASSAGE_CURRENT_FILE, EMBEDDING_MODEL_ID
+from index_bundle import current_version, legacy_version, load_bundle
+from index_factory import configure_search, prepare_vectors, search_params, metric
+from bm25 import BM25Index, reciprocal_rank_fusion
+from passage_store import read_passage_index
+
+
+class IncompatibleBundle(Exception):
+    """A bundle whose vectors come from a different embedding model than the one queries are embedded with."""
+
+
+class IndexState:
+    """One immutable snapshot of a published bundle: FAISS index, metadata and manifest.
+
+    Metadata stays in the bundle's metadata store and is fetched by id for each result; only the
+    ids, categories and sources needed for filtering are held in memory.
+    """
+
+    def __init__(self, bundle):
+        self.version = bundle["version"]
+        self.index = bundle["index"]
+        self.metadata = bundle["metadata"]
+        self.manifest = bundle["manifest"]
+        # Legacy bundles have no manifest entry and are flat L2 over raw vectors
+        self.index_type = self.manifest.get("index_type", "flat_l2")
+        configure_search(self.index)
+        # Bundles from before hybrid retrieval have no postings file; indexing a few thousand highlights is quick
+        self.bm25 = BM25Index.from_dict(bundle["bm25"]) if bundle.get("bm25") else BM25Index.build(list(self.metadata))
+        self.ids = set()
+        self.ids_by_category = defaultdict(set)
+        self.ids_by_source = defaultdict(set)
+        for doc_id, category, sources in self.metadata.project("id", "category", "sources"):
+            self.ids.add(doc_id)
+            self.ids_by_category[(category or "").lower()].add(doc_id)
+            for source in sources or []:
+                self.ids_by_source[source.lower()].add(doc_id)
+
+    def __len__(self):
+        return len(self.metadata)
+
+    def allowed_ids(self, category=None, source=None):
+        """Ids passing the category/source filters, or None when the query is unfiltered."""
+        if not category and not source:
+            return None
+        ids = set(self.ids)
+        if category:
+            ids &= self.ids_by_category.get(category.lower(), set())
+        if source:
+            ids &= self.ids_by_source.get(source.lower(), set())
+        return ids
+
+    def scored_vector_search(self, query_embeddings, k, allowed=None):
+        """(FAISS id, score) of the k nearest highlights per query, restricted to allowed when given.
+
+        Scores are higher-is-better: cosine similarity, or negative L2 distance for legacy flat_l2 bundles.
+        """
+        queries = prepare_vectors(query_embeddings, self.index_type)
+        if allowed is None:
+            # Over-fetch by the number of tombstoned vectors so dropped highlights don't eat into k
+            tombstones = max(self.index.ntotal - len(self.ids), 0)
+            D, I = self.index.search(queries, k + tombstones)
+        elif not allowed:
+            return [[] for _ in range(len(queries))]
+        else:
+            # The ID selector skips everything outside the filter inside FAISS itself
+            params = search_params(self.index, allowed, len(allowed) / max(self.index.ntotal, 1))
+            D, I = self.index.search(queries, min(k, len(allowed)), params=params)
+        if metric(self.index_type) == "l2":
+            D = -D
+        return [[(int(idx), float(score)) for idx, score in zip(ids, scores) if idx in self.ids][:k] for ids, scores in zip(I, D)]
+
+    def vector_search(self, query_embeddings, k, allowed=None):
+        """FAISS ids of the k nearest highlights per query, restricted to allowed when given."""
+        return [[doc_id for doc_id, _ in hits] for hits in self.scored_vector_search(query_embeddings, k, allowed)]
+
+    def ranked(self, query_embeddings, k, category=None, source=None):
+        """Metadata of the k nearest highlights to one query, each with its score, for /api/search."""
+        hits = self.scored_vector_search(query_embeddings, k, self.allowed_ids(category, source))[0]
+        items = self.metadata.get([doc_id for doc_id, _ in hits])
+        return [{**item, "score": round(score, 4)} for item, (_, score) in zip(items, hits)]
+
+    def search(self, query_embeddings, top_ks, queries=None, filters=None):
+        """Retrieve highlights for a batch of queries and map ids back to metadata.
+
+        With query texts and HYBRID_RETRIEVAL on, FAISS and BM25 candidates are fused by reciprocal
+        rank fusion. filters holds one (category, source) pair per query; queries sharing a filter
+        are searched together.
+        """
+        filters = filters or [(None, None)] * len(top_ks)
+        groups = defaultdict(list)
+        for i, query_filter in enumerate(filters):
+            groups[query_filter].append(i)
+
+        results = [None] * len(top_ks)
+        hybrid = HYBRID_RETRIEVAL and queries is not None
+        for query_filter, members in groups.items():
+            allowed = self.allowed_ids(*query_filter)
+            k = max(top_ks[i] for i in members)
+            if hybrid:
+                k = max(k, RETRIEVAL_CANDIDATES)
+            for i, ids in zip(members, self.vector_search(query_embeddings[members], k, allowed)):
+                if hybrid:
+                    lexical = [doc_id for doc_id, _ in self.bm25.search(queries[i], k, allowed)]
+                    ids = reciprocal_rank_fusion([ids, lexical], RRF_K)
+                results[i] = self.metadata.get(ids[:top_ks[i]])
+        return results
+
+
+class PassageState:
+    """One immutable snapshot of a published passage bundle: FAISS index over passages and their store."""
+
+    def __init__(self, version):
+        self.version = version
+        self.index, self.store, self.manifest = read_passage_index(version)
+        self.index_type = self.manifest["index_type"]
+        configure_search(self.index)
+        # Filters are per article; passage_articles maps every passage row to its article row
+        self.passage_articles = np.asarray(self.store.passages["article"])
+        self.categories = np.array([article["category"].lower() for article in self.store.articles])
+        self.sources = np.array([article["source"].lower() for article in self.store.articles])
+
+    def __len__(self):
+        return len(self.store)
+
+    def allowed_ids(self, category=None, source=None):
+        """Passage ids whose article passes the category/source filters, or None when unfiltered."""
+        if not category and not source:
+            return None
+        keep = np.ones(len(self.store.articles), dtype=bool)
+        if category:
+            keep &= self.categories == category.lower()
+        if source:
+            keep &= self.sources == source.lower()
+        if not len(keep):
+            return set()
+        return set(np.flatnonzero(keep[self.passage_articles]).tolist())
+
+    def search(self, query_embeddings, top_ks, filters=None):
+        """Articles whose passages best match each query, passages merged per article.
+
+        Several passages of one article often rank together, so FAISS is asked for enough
+        passages to still fill top_k distinct articles.
+        """
+        filters = filters or [(None, None)] * len(top_ks)
+        groups = defaultdict(list)
+        for i, query_filter in enumerate(filters):
+            groups[query_filter].append(i)
+
+        results = [[] for _ in top_ks]
+        for query_filter, members in groups.items():
+            allowed = self.allowed_ids(*query_filter)
+            k = min(max(top_ks[i] for i in members) * PASSAGES_PER_ARTICLE * 4, len(self.store))
+            if not k or (allowed is not None and not allowed):
+                continue
+            queries = prepare_vectors(query_embeddings[members], self.index_type)
+            if allowed is None:
+                D, I = self.index.search(queries, k)
+            else:
+                params = search_params(self.index, allowed, len(allowed) / max(self.index.ntotal, 1))
+                D, I = self.index.search(queries, min(k, len(allowed)), params=params)
+            if self.manifest["metric"] == "l2":
+                D = -D
+            for i, ids, scores in zip(members, I, D):
+                hits = [(int(passage_id), score) for passage_id, score in zip(ids, scores) if passage_id >= 0]
+                results[i] = self.store.group_by_article(
+                    [passage_id for passage_id, _ in hits], [score for _, score in hits], top_ks[i], PASSAGES_PER_ARTICLE
+                )
+        return results
+
+
+class IndexManager:
+    """Holds the live IndexState (or PassageState) and swaps in newly published bundles.
+
+    Readers take `manager.state` once per request and keep using that snapshot, so queries already
+    in flight finish on the old index while new ones see the new one. A bundle built with another
+    embedding model than EMBEDDING_MODEL_ID is never swapped in: its rankings would be meaningless.
+    """
+
+    def __init__(self, name="index", unit="highlights", load=lambda version: IndexState(load_bundle(version)),
+                 current_file=CURRENT_BUNDLE_FILE, legacy_files=True):
+        self.state = None
+        self.lock = threading.Lock()
+        self.reloads = 0
+        # Last version refused for its embedding model, so the watcher doesn't load it again every interval
+        self.rejected = None
+        self.name = name
+        self.unit = unit
+        self.load = load
+        self.current_file = current_file
+        # Only the highlight index has pre-bundle flat files to fall back to when nothing is published
+        self.legacy_files = legacy_files
+
+    def on_disk_version(self):
+        """The published version; with nothing published, the legacy flat files' version, which changes with their mtimes."""
+        version = current_version(self.current_file)
+        if version is None and self.legacy_files:
+            return legacy_version()
+        return version
+
+    def reload(self, force=False):
+        with self.lock:
+            version = current_version(self.current_file)
+            if version is None and not self.legacy_files:
+                return False
+            if not force and self.state is not None and self.on_disk_version() in (None, self.state.version):
+                return False
+            state = self.load(version)
+            # Legacy bundles predate the manifest entry; there is nothing to compare them by
+            embedding_model = state.manifest.get("embedding_model", EMBEDDING_MODEL_ID)
+            if embedding_model != EMBEDDING_MODEL_ID:
+                self.rejected = state.version
+                raise IncompatibleBundle(
+                    f"{self.name} bundle {state.version} was built with {embedding_model}, "
+                    f"but queries are embedded with {EMBEDDING_MODEL_ID}"
+                )
+            self.state = state
+            self.reloads += 1
+            print(f"✅ Loaded {self.name} bundle {self.state.version} ({len(self.state)} {self.unit})")
+            return True
+
+    async def watch(self, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            # Nothing on disk, or nothing new: no reload, so missing legacy files aren't retried every interval
+            version = self.on_disk_version()
+            if version is None or version == self.rejected:
+                continue
+            if self.state is not None and version == self.state.version:
+                continue
+            try:
+                await loop.run_in_executor(None, self.reload)
+            except Exception as e:
+                print(f"❌ Failed to load new {self.name} bundle: {e}")
+
+
+def passage_manager():
+    return IndexManager("passage", "passages", PassageState, PASSAGE_CURRENT_FILE, legacy_files=False)
@@ -0,0 +1,162 @@
+import math
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from worker_pool import threads_per_worker
+
+
+class Overloaded(Exception):
+    """The inference queue is full; retry_after is a guess, in seconds, at when it will have room."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Inference queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Job:
+    """One admitted request, from admission until a model worker starts on it (or it is dropped).
+
+    A job is abandoned once its deadline passes or its caller cancels it; abandoned jobs are
+    skipped instead of run, and never block admission of new ones.
+    """
+
+    def __init__(self, deadline):
+        self.admitted_at = time.perf_counter()
+        self.deadline = self.admitted_at + deadline
+        self.state = "queued"
+        self.cancelled = False
+        self.item = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def remaining(self):
+        return self.deadline - time.perf_counter()
+
+    def abandoned(self):
+        return self.cancelled or self.remaining() <= 0
+
+
+class InferenceExecutor:
+    """Runs model calls on a fixed number of worker threads behind a bounded queue.
+
+    Requests are admitted with admit() before any work is queued for them; once max_queue jobs
+    are waiting, admit() raises Overloaded so the endpoint can shed load with a Retry-After
+    instead of letting latency grow without bound. Torch intra-op threads are split between the
+    workers, so concurrent generations don't oversubscribe the cores.
+    """
+
+    def __init__(self, workers, max_queue, threads=0, history=1000):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.threads = threads_per_worker(workers, threads)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference", initializer=self._init_worker)
+        self.lock = threading.Lock()
+        self.waiting = set()
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.completed = 0
+        self.wait_times = deque(maxlen=history)
+        self.run_times = deque(maxlen=history)
+
+    def _init_worker(self):
+        # set_num_threads is process-wide: every worker runs with its share of the cores
+        import torch
+        torch.set_num_threads(self.threads)
+
+    def _purge(self):
+        abandoned = [job for job in self.waiting if job.abandoned()]
+        for job in abandoned:
+            self._drop(job)
+
+    def _drop(self, job):
+        if job.state == "queued":
+            job.state = "dropped"
+            self.waiting.discard(job)
+            self.expired += 1
+
+    def admit(self, deadline):
+        """A Job for one request, or Overloaded when max_queue jobs are already waiting."""
+        with self.lock:
+            self._purge()
+            if len(self.waiting) >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded(self.retry_after())
+            job = Job(deadline)
+            self.waiting.add(job)
+            self.admitted += 1
+            return job
+
+    def release(self, job):
+        """Give back a job that will never be submitted (e.g. answered from cache or its client left)."""
+        with self.lock:
+            self._drop(job)
+
+    def submit(self, jobs, fn):
+        """Run fn(live_jobs) on a worker; returns a concurrent Future of (live_jobs, result).
+
+        Jobs abandoned while queued are dropped when the worker picks the batch up; if none are
+        left, fn is not called and the future raises DeadlineExceeded.
+        """
+        return self.pool.submit(self._run, jobs, fn)
+
+    def _run(self, jobs, fn):
+        started = time.perf_counter()
+        with self.lock:
+            live = []
+            for job in jobs:
+                if job.state == "queued" and not job.abandoned():
+                    job.state = "running"
+                    self.waiting.discard(job)
+                    self.wait_times.append(started - job.admitted_at)
+                    live.append(job)
+                else:
+                    self._drop(job)
+            if not live:
+                raise DeadlineExceeded("Deadline exceeded while queued")
+            self.running += len(live)
+        try:
+            return live, fn(live)
+        finally:
+            with self.lock:
+                self.running -= len(live)
+                self.completed += len(live)
+                self.run_times.append(time.perf_counter() - started)
+
+    def retry_after(self):
+        """Seconds until the current queue has drained at the recent median run time per call."""
+        runs = sorted(self.run_times)
+        median = runs[len(runs) // 2] if runs else 1.0
+        return max(1, math.ceil((len(self.waiting) / self.workers + 1) * median))
+
+    def metrics(self):
+        with self.lock:
+            self._purge()
+            waits = sorted(self.wait_times)
+            runs = sorted(self.run_times)
+            return {
+                "workers": self.workers,
+                "threads_per_worker": self.threads,
+                "max_queue": self.max_queue,
+                "queue_depth": len(self.waiting),
+                "running": self.running,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "completed": self.completed,
+                "p50_wait_ms": round(waits[len(waits) // 2] * 1000, 2) if waits else 0,
+                "p95_wait_ms": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else 0,
+                "p50_run_ms": round(runs[len(runs) // 2] * 1000, 2) if runs else 0,
+                "p95_run_ms": round(runs[int(len(runs) * 0.95)] * 1000, 2) if runs else 0,
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,17 +1,35 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse, JSONResponse
+from pydantic import BaseModel, field_validator
+from typing import Optional
 import json
 import os
-import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+import time
+import asyncio
 
 # Setup config
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import FAISS_INDEX_FILE, METADATA_FILE, EMBEDDING_MODEL, GEN_MODEL_NAME
+from config import EMBEDDING_MODEL, GEN_MODEL_NAME, EMBEDDING_MODEL_ID, QUERY_EMBEDDING_STORE_DIR, QUERY_EMBEDDING_STORE_MAX_ENTRIES, INDEX_WATCH_INTERVAL, PASSAGE_TOP_K
+from config import CHAT_BATCH_MAX_SIZE, CHAT_BATCH_WAIT_MS, ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_SIMILARITY
+from config import MODEL_WARMUP, WARMUP_RETRY_AFTER
+from config import INFERENCE_EXECUTOR_WORKERS, INFERENCE_EXECUTOR_THREADS, INFERENCE_QUEUE_SIZE, CHAT_DEADLINE, SEARCH_DEADLINE
+from config import CHAT_MAX_TOP_K, SEARCH_MAX_TOP_K, CHAT_MAX_NEW_TOKENS, CHAT_REPEAT_NGRAM, CHAT_REPEAT_STOP
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_DEDUP_THRESHOLD
+from embedding_store import EmbeddingStore, encode_with_store
+from metadata_store import JsonMetadata
+from model_registry import get_embedder, get_generator, backends
+from api.batcher import MicroBatcher
+from api.inference_executor import InferenceExecutor, Overloaded, DeadlineExceeded
+from api.context import build_context, input_budget
+from api.answer_cache import AnswerCache
+from api.highlights_cache import HighlightsCache, pick_encoding, etag_matches
+from api.index_state import IndexManager, IncompatibleBundle, passage_manager
+from api.readiness import Component, Warmup
+from api.observability import RequestTelemetry
+import telemetry
+from telemetry import span
 
 # ------------------ FASTAPI SETUP ------------------ #
 app = FastAPI()
@@ -28,75 +46,444 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count", "X-Profile-Id"],
 )
+# Outermost, so latency covers CORS handling and the whole streamed body
+app.add_middleware(RequestTelemetry)
 
 
 @app.get("/")
 def root():
     return {"message": "News Highlights API is running."}
 
+# ------------------ INDEX BUNDLE ------------------ #
+# The pipeline publishes versioned bundles; they are swapped in here without restarting the API
+index_manager = IndexManager()
+# Full-text passages are a separate bundle series; chat works without them
+passage_index = passage_manager()
+# Both are loaded by the warm-up thread below, not at import
+
+def index_version():
+    state = index_manager.state
+    return state.version if state else None
+
+def sources_version(state=None, passage_state=None):
+    """Chat sources come from both bundle series; a new bundle in either invalidates cached answers.
+
+    Pass the index snapshots an answer was built from to get their version rather than the live one.
+    """
+    if state is None and passage_state is None:
+        state, passage_state = index_manager.state, passage_index.state
+    return (state.version if state else None, passage_state.version if passage_state else None)
+
+@app.on_event("startup")
+async def start_index_watcher():
+    loop = asyncio.get_running_loop()
+    app.state.index_watchers = [loop.create_task(manager.watch(INDEX_WATCH_INTERVAL)) for manager in (index_manager, passage_index)]
+
+@app.on_event("shutdown")
+async def stop_index_watcher():
+    for watcher in app.state.index_watchers:
+        watcher.cancel()
+
+@app.post("/api/admin/reload")
+def reload_index():
+    try:
+        reloaded = index_manager.reload(force=True)
+        passages_reloaded = passage_index.reload(force=True)
+    except IncompatibleBundle as e:
+        return JSONResponse({"error": str(e)}, status_code=409)
+    passage_state = passage_index.state
+    return {
+        "reloaded": reloaded,
+        "version": index_version(),
+        "passages_reloaded": passages_reloaded,
+        "passages_version": passage_state.version if passage_state else None,
+    }
+
+highlights_cache = HighlightsCache()
+
 @app.get("/api/highlights")
-def get_highlights():
-    with open(METADATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+def get_highlights(request: Request, category: str = None, source: str = None, offset: int = 0, limit: int = None):
+    state = index_manager.state
+    metadata = state.metadata if state else JsonMetadata([])
+    variant = highlights_cache.get(index_version(), metadata, category, source, max(offset, 0), limit)
+    encoding = pick_encoding(variant, request.headers.get("accept-encoding"))
+    etag = variant["etag"] if encoding == "identity" else f"{variant['etag']}-{encoding}"
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Total-Count": str(variant["total"]),
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag, variant["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=variant[encoding], media_type="application/json", headers=headers)
 
 # ------------------ LOAD MODELS ------------------ #
-gen_model = None
+# Set by the warm-up thread once each model has loaded
+embed_model, gen_model = None, None
+
+def load_embedder():
+    global embed_model
+    # Backends (torch / int8 / onnx) come from EMBEDDING_BACKEND and GEN_BACKEND
+    embed_model = get_embedder()
+
+def load_generator():
+    global gen_model
+    gen_model = get_generator()
+
+# One real inference per model before reporting ready, so the first user request doesn't pay for
+# lazy allocations and kernel selection
+def warm_embedder():
+    embed_model.encode(["What happened in the news today?"])
 
-try:
-    faiss_index = faiss.read_index(FAISS_INDEX_FILE)
-    with open(METADATA_FILE, "r", encoding="utf-8") as f:
-        metadata = json.load(f)
-    embed_model = SentenceTransformer(EMBEDDING_MODEL)
+def warm_generator():
+    from api.generation import generate_batch
+    generate_batch(gen_model, [build_prompt("What happened in the news today?", [])[0]], 8, CHAT_REPEAT_NGRAM, CHAT_REPEAT_STOP)
 
-    tokenizer = AutoTokenizer.from_pretrained(GEN_MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(GEN_MODEL_NAME)
-    gen_model = pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+def model_info(name):
+    return lambda: {"backend": backends.get(name)}
 
-    print("✅ Models loaded successfully")
+def bundle_info(manager):
+    return lambda: {"version": manager.state.version if manager.state else None}
 
-except Exception as e:
-    print("❌ Failed to load models:", e)
-    faiss_index, metadata, embed_model, gen_model = None, [], None, None
+# Bundles first (milliseconds; /api/highlights only needs the index), then the embedder, then the generator
+warmup = Warmup([
+    Component("index", index_manager.reload, check=lambda: index_manager.state is not None, info=bundle_info(index_manager)),
+    # Without a passage bundle, chat retrieval falls back to highlights alone
+    Component("passages", passage_index.reload, required=False, info=bundle_info(passage_index),
+              present=lambda: passage_index.state is not None),
+    Component("embedder", load_embedder, warm_embedder if MODEL_WARMUP else None, info=model_info(f"embedder:{EMBEDDING_MODEL}")),
+    Component("generator", load_generator, warm_generator if MODEL_WARMUP else None, info=model_info(f"generator:{GEN_MODEL_NAME}")),
+])
+
+@app.on_event("startup")
+async def start_warmup():
+    warmup.start()
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving, whether or not models have loaded."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 200 once every required component has loaded and warmed up, 503 until then."""
+    report = warmup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+def not_ready(*names):
+    """503 naming the components still loading, or None when all of them are up; failed ones keep the old error."""
+    failed = [name for name in names if warmup.status(name) == "failed"]
+    if failed:
+        return {"error": f"{', '.join(failed)} not loaded properly."}
+    loading = [name for name in names if not warmup.is_ready(name)]
+    if loading:
+        return JSONResponse(
+            {"error": f"Still loading: {', '.join(loading)}.", "components": {name: warmup.status(name) for name in loading}},
+            status_code=503,
+            headers={"Retry-After": str(WARMUP_RETRY_AFTER)},
+        )
+    return None
+
+# Repeated queries are answered from a persistent embedding store instead of re-encoding
+query_store = EmbeddingStore(QUERY_EMBEDDING_STORE_DIR, EMBEDDING_MODEL_ID, max_entries=QUERY_EMBEDDING_STORE_MAX_ENTRIES)
+QUERY_STORE_FLUSH_EVERY = 32
+
+def embed_queries(queries):
+    embeddings = encode_with_store(query_store, queries, lambda: embed_model)
+    if len(query_store.pending) >= QUERY_STORE_FLUSH_EVERY:
+        query_store.save()
+    return embeddings
+
+@app.on_event("shutdown")
+def save_query_store():
+    query_store.save()
+
+# Answers are cached per index and passage version; publishing a new bundle empties the cache
+answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_SIMILARITY)
 
 # ------------------ INPUT FORMAT ------------------ #
 class ChatQuery(BaseModel):
     query: str
     top_k: int = 3
+    category: Optional[str] = None
+    source: Optional[str] = None
+    # Seconds the client is prepared to wait; capped at CHAT_DEADLINE
+    timeout: Optional[float] = None
+
+    @field_validator("top_k")
+    @classmethod
+    def cap_top_k(cls, top_k):
+        # Every extra source costs retrieval and prompt tokens; the context budget can't use many anyway
+        return max(1, min(top_k, CHAT_MAX_TOP_K))
+
+    def filters(self):
+        return (self.category or None, self.source or None)
+
+    def cache_scope(self):
+        """Cached answers are only reused for the same top_k and filters."""
+        return (self.top_k, *self.filters())
+
+    def deadline(self):
+        return min(self.timeout, CHAT_DEADLINE) if self.timeout else CHAT_DEADLINE
+
+# ------------------ RETRIEVAL & GENERATION ------------------ #
+def build_prompt(query, sources):
+    """(prompt, sources it uses): near-duplicates dropped, the rest in rank order while they fit the generator's input."""
+    tokenizer = gen_model.tokenizer
+    return build_context(query, sources, tokenizer, input_budget(tokenizer, CONTEXT_TOKEN_BUDGET), CONTEXT_DEDUP_THRESHOLD)
+
+def retrieve(state, passage_state, query_embeddings, payloads):
+    """Highlights for each query, followed by up to PASSAGE_TOP_K full-text articles they don't already cover."""
+    batch_sources = state.search(
+        query_embeddings,
+        [payload.top_k for payload in payloads],
+        queries=[payload.query for payload in payloads],
+        filters=[payload.filters() for payload in payloads],
+    )
+    if passage_state is None or PASSAGE_TOP_K <= 0:
+        return batch_sources
+    batch_articles = passage_state.search(
+        query_embeddings, [PASSAGE_TOP_K + payload.top_k for payload in payloads], filters=[payload.filters() for payload in payloads]
+    )
+    for sources, articles in zip(batch_sources, batch_articles):
+        urls = {item.get("url") for item in sources}
+        sources.extend([article for article in articles if article["url"] not in urls][:PASSAGE_TOP_K])
+    return batch_sources
+
+def run_chat_batch(payloads):
+    """Embed, search and generate for a batch of chat queries in one pass each."""
+    # The whole batch uses one snapshot of each index, even if a reload happens
+    state, passage_state = index_manager.state, passage_index.state
+    version = sources_version(state, passage_state)
+    queries = [payload.query for payload in payloads]
+    with span("chat.embed", batch_size=len(queries)):
+        query_embeddings = embed_queries(queries)
+
+    # Near-duplicates of recently answered questions skip search and generation
+    responses = [answer_cache.get_similar(embedding, payload.cache_scope()) for embedding, payload in zip(query_embeddings, payloads)]
+    pending = [i for i, response in enumerate(responses) if response is None]
+    if not pending:
+        return responses
+
+    with span("chat.search", batch_size=len(pending)):
+        batch_sources = retrieve(state, passage_state, query_embeddings[pending], [payloads[i] for i in pending])
+    # Answers cite only the sources that made it into their prompt
+    with span("chat.prompt", batch_size=len(pending)):
+        prompts, batch_sources = zip(*(build_prompt(queries[i], sources) for i, sources in zip(pending, batch_sources)))
+
+    try:
+        from api.generation import generate_batch
+        # The pipeline pads the prompts and runs them through the model as one batch
+        with span("chat.generate", batch_size=len(pending)):
+            answers = generate_batch(gen_model, list(prompts), CHAT_MAX_NEW_TOKENS, CHAT_REPEAT_NGRAM, CHAT_REPEAT_STOP)
+    except Exception as e:
+        for i in pending:
+            responses[i] = {"error": f"Text generation failed: {e}"}
+        return responses
+
+    for i, answer, sources in zip(pending, answers, batch_sources):
+        responses[i] = {"answer": answer, "sources": sources}
+        # Dropped if a bundle was swapped in while this batch was generating
+        answer_cache.put(queries[i], payloads[i].cache_scope(), query_embeddings[i], responses[i], version)
+    return responses
+
+# Every model call on the request path runs here, so concurrent chats and searches queue up instead of fighting over cores
+inference_executor = InferenceExecutor(INFERENCE_EXECUTOR_WORKERS, INFERENCE_QUEUE_SIZE, INFERENCE_EXECUTOR_THREADS)
+chat_batcher = MicroBatcher(run_chat_batch, inference_executor, max_batch_size=CHAT_BATCH_MAX_SIZE, max_wait_ms=CHAT_BATCH_WAIT_MS)
+
+@app.on_event("startup")
+async def start_chat_batcher():
+    chat_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_chat_batcher():
+    await chat_batcher.stop()
+    inference_executor.shutdown()
+
+def overloaded(e):
+    return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": str(e.retry_after)})
+
+# ------------------ SEARCH ENDPOINT ------------------ #
+@app.get("/api/search")
+async def search(q: str, top_k: int = 10, category: str = None, source: str = None):
+    """Ranked highlights with similarity scores, straight from FAISS: no BM25, no generator, no batching.
+
+    The query embedding goes through the inference executor like chat's, with a shorter deadline.
+    """
+    unavailable = not_ready("index", "embedder")
+    if unavailable is not None:
+        return unavailable
+
+    start = time.perf_counter()
+    state = index_manager.state
+    try:
+        job = inference_executor.admit(SEARCH_DEADLINE)
+    except Overloaded as e:
+        return overloaded(e)
+
+    def run(jobs):
+        with span("search.embed"):
+            query_embeddings = embed_queries([q])
+        with span("search.search"):
+            return state.ranked(query_embeddings, max(1, min(top_k, SEARCH_MAX_TOP_K)), category or None, source or None)
+
+    try:
+        _, results = await asyncio.wrap_future(inference_executor.submit([job], run))
+    except DeadlineExceeded as e:
+        return JSONResponse({"error": str(e)}, status_code=504)
+    return {"query": q, "version": state.version, "results": results, "took_ms": round((time.perf_counter() - start) * 1000, 2)}
 
 # ------------------ CHAT QUERY ENDPOINT ------------------ #
 @app.post("/api/chat-query")
-def chat_query(payload: ChatQuery):
-    if not faiss_index:
-        return {"error": "FAISS index not loaded properly."}
+async def chat_query(payload: ChatQuery):
+    unavailable = not_ready("index", "embedder", "generator")
+    if unavailable is not None:
+        return unavailable
 
-    if not embed_model:
-        return {"error": "Embedding model not loaded properly."}
+    answer_cache.set_version(sources_version())
+    cached = answer_cache.get_exact(payload.query, payload.cache_scope())
+    if cached is not None:
+        return cached
 
-    if not gen_model:
-        return {"error": "Generation model not loaded properly."}
+    try:
+        job = inference_executor.admit(payload.deadline())
+    except Overloaded as e:
+        return overloaded(e)
+    try:
+        return await chat_batcher.submit(payload, job)
+    except DeadlineExceeded as e:
+        return JSONResponse({"error": str(e)}, status_code=504)
 
-    query_embedding = embed_model.encode([payload.query])[0].astype("float32")
-    D, I = faiss_index.search(np.array([query_embedding]), payload.top_k)
+# ------------------ STREAMING CHAT ENDPOINT ------------------ #
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    context = ""
-    for idx in I[0]:
-        if 0 <= idx < len(metadata):
-            item = metadata[idx]
-            summary = item.get("summary", "").strip()
-            title = item.get("title", "").strip()
-            category = item.get("category", "").strip().title()
-            if summary:
-                context += f"- ({category}) {title}: {summary}\n"
+def cached_stream(cached):
+    yield sse_event("sources", cached["sources"])
+    yield sse_event("token", {"text": cached["answer"]})
+    yield sse_event("done", cached)
 
-    prompt = f"You are a helpful assistant. Based on the news below, answer the following question.\n\nNews:\n{context}\n\nQuestion: {payload.query}\nAnswer:"
+# How long a stream waits for its next event before checking whether the client is still there
+STREAM_DISCONNECT_POLL = 1.0
 
+async def stream_chat(request, payload, job):
+    """Yield the retrieved sources straight away, then answer tokens as the generator decodes them.
+
+    Embedding, retrieval and generation run as one job on the inference executor, which hands each
+    event to the event loop; an open stream holds no thread while it waits. A client that goes away
+    cancels the job: still queued, it never runs; already generating, it stops at the next token.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def emit(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    def produce(jobs):
+        with span("chat.embed", batch_size=1):
+            query_embedding = embed_queries([payload.query])[0]
+        cached = answer_cache.get_similar(query_embedding, payload.cache_scope())
+        if cached is not None:
+            for event in cached_stream(cached):
+                emit(event)
+            return
+
+        state, passage_state = index_manager.state, passage_index.state
+        version = sources_version(state, passage_state)
+        with span("chat.search", batch_size=1):
+            sources = retrieve(state, passage_state, query_embedding[None, :], [payload])[0]
+        with span("chat.prompt", batch_size=1):
+            prompt, sources = build_prompt(payload.query, sources)
+        emit(sse_event("sources", sources))
+
+        from api.generation import stream_generate
+
+        answer = []
+        def on_text(text):
+            answer.append(text)
+            emit(sse_event("token", {"text": text}))
+
+        try:
+            with span("chat.generate", batch_size=1, stream=True):
+                stream_generate(gen_model, prompt, on_text, job.abandoned, CHAT_MAX_NEW_TOKENS, CHAT_REPEAT_NGRAM, CHAT_REPEAT_STOP)
+        except Exception as e:
+            raise RuntimeError(f"Text generation failed: {e}") from e
+        if job.abandoned():
+            # Cut short: not an answer worth caching
+            raise DeadlineExceeded("Deadline exceeded while generating")
+
+        response = {"answer": "".join(answer).strip(), "sources": sources}
+        answer_cache.put(payload.query, payload.cache_scope(), query_embedding, response, version)
+        emit(sse_event("done", response))
+
+    future = inference_executor.submit([job], produce)
+    future.add_done_callback(lambda _: emit(None))
     try:
-        result = gen_model(prompt, max_length=200)[0]["generated_text"].strip()
-    except Exception as e:
-        return {"error": f"Text generation failed: {e}"}
+        while True:
+            if await request.is_disconnected():
+                return
+            try:
+                event = await asyncio.wait_for(events.get(), STREAM_DISCONNECT_POLL)
+            except asyncio.TimeoutError:
+                continue
+            if event is None:
+                break
+            yield event
+        if future.exception() is not None:
+            yield sse_event("error", {"error": str(future.exception())})
+    finally:
+        job.cancel()
 
-    return {
-        "answer": result,
-        "sources": [metadata[idx] for idx in I[0] if 0 <= idx < len(metadata)]
-    }
+@app.post("/api/chat-query/stream")
+async def chat_query_stream(request: Request, payload: ChatQuery):
+    unavailable = not_ready("index", "embedder", "generator")
+    if unavailable is not None:
+        return unavailable
+
+    answer_cache.set_version(sources_version())
+    cached = answer_cache.get_exact(payload.query, payload.cache_scope())
+    if cached is not None:
+        stream = cached_stream(cached)
+    else:
+        # Admitted before the response starts, so a full queue is a real 429 rather than an error event
+        try:
+            stream = stream_chat(request, payload, inference_executor.admit(payload.deadline()))
+        except Overloaded as e:
+            return overloaded(e)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/chat-metrics")
+def chat_metrics():
+    return {**chat_batcher.metrics(), "executor": inference_executor.metrics(), "answer_cache": answer_cache.stats()}
+
+# ------------------ PROMETHEUS METRICS ------------------ #
+# Request counts/latency and stage spans are recorded as they happen; these are read at scrape time
+telemetry.callback("news_component_ready", "1 once a component has loaded and warmed up.",
+                   lambda: {(name,): int(warmup.is_ready(name)) for name in warmup.components}, labels=["component"])
+telemetry.callback("news_inference_queue_depth", "Chat jobs waiting for an inference worker.",
+                   lambda: inference_executor.metrics()["queue_depth"])
+telemetry.callback("news_inference_running", "Chat jobs running on inference workers.",
+                   lambda: inference_executor.metrics()["running"])
+telemetry.callback("news_inference_jobs_total", "Chat jobs by outcome at the inference executor.",
+                   lambda: {(outcome,): inference_executor.metrics()[outcome] for outcome in ("admitted", "rejected", "expired", "completed")},
+                   kind="counter", labels=["outcome"])
+telemetry.callback("news_answer_cache_lookups_total", "Chat answer cache lookups by result.",
+                   lambda: {(result,): answer_cache.stats()[result] for result in ("exact_hits", "semantic_hits", "misses")},
+                   kind="counter", labels=["result"])
+telemetry.callback("news_index_documents", "Highlights in the loaded index bundle.",
+                   lambda: len(index_manager.state.metadata) if index_manager.state else None)
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=telemetry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,82 @@
+import os
+import time
+import asyncio
+import hmac
+import uuid
+
+from config import PROFILE_REQUESTS, PROFILE_TOKEN, PROFILE_INTERVAL_MS, PROFILE_DIR, PROFILE_KEEP
+import telemetry
+from api.profiler import SamplingProfiler, prune_profiles
+
+REQUESTS = telemetry.counter("news_http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"])
+# Until the last body chunk, so a streamed chat answer counts in full, not just up to its first event
+REQUEST_SECONDS = telemetry.histogram("news_http_request_seconds", "HTTP request latency by route.", ["method", "route"])
+IN_FLIGHT = telemetry.gauge("news_http_requests_in_flight", "HTTP requests being served.")
+PROFILE_HEADER = b"x-profile"
+
+
+def profile_requested(scope):
+    if not PROFILE_REQUESTS:
+        return False
+    value = dict(scope["headers"]).get(PROFILE_HEADER, b"").decode("latin-1")
+    if PROFILE_TOKEN:
+        return hmac.compare_digest(value, PROFILE_TOKEN)
+    return value == "1"
+
+
+def save_profile(profiler, profile_id, scope):
+    profiler.stop()
+    profiler.save(os.path.join(PROFILE_DIR, f"{profile_id}.folded"))
+    prune_profiles(PROFILE_DIR, PROFILE_KEEP)
+    print(f"🔥 Profiled {scope['method']} {scope['path']}: {profiler.samples} samples → {profile_id}.folded")
+
+
+def route_name(scope):
+    # The matched route's template, so /api/foo/{id} is one series; unknown paths share one too
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestTelemetry:
+    """ASGI middleware: request count and latency per route, and the opt-in per-request profiler.
+
+    A profiled response carries X-Profile-Id; the collapsed stacks are written to
+    PROFILE_DIR/<id>.folded once the response body has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        profiler, profile_id = None, None
+        if profile_requested(scope):
+            profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000).start()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_id is not None:
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        self.in_flight += 1
+        IN_FLIGHT.set(self.in_flight)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_flight -= 1
+            IN_FLIGHT.set(self.in_flight)
+            route = route_name(scope)
+            REQUESTS.inc(method=scope["method"], route=route, status=status)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route)
+            if profiler is not None:
+                # Joining the sampler thread and writing the file would hold up every other request on the loop
+                await asyncio.get_running_loop().run_in_executor(None, save_profile, profiler, profile_id, scope)
@@ -0,0 +1,78 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+# Leaf frames of threads that are parked, not working: condition/queue waits, the event loop's
+# select, an idle executor worker. Leaving them out keeps the flame graph about the request.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval and counts them as collapsed stacks.
+
+    All threads are sampled, not just the one serving the request: chat inference runs on the
+    executor's threads. Other requests in flight at the same time show up as well, under the name
+    of their thread.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self):
+        """One "frame;frame;frame count" line per stack, as flamegraph.pl, inferno and speedscope read."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+
+def prune_profiles(directory, keep):
+    """Delete all but the newest keep profiles in directory."""
+    profiles = sorted((entry for entry in os.scandir(directory) if entry.name.endswith(".folded")),
+                      key=lambda entry: entry.stat().st_mtime)
+    for entry in profiles[:max(len(profiles) - keep, 0)]:
+        os.remove(entry.path)
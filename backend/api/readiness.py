@@ -0,0 +1,117 @@
+import time
+import threading
+
+# Import time of the API process, the zero point for reported cold-start times
+PROCESS_START = time.perf_counter()
+
+
+class Component:
+    """One warm-up stage: load it, optionally run a warm-up pass on it, then report it ready.
+
+    check, when given, reports the component's live state instead, so a bundle that failed at
+    startup but was picked up later by the index watcher counts as ready. present, when given, says
+    whether there was anything to load: an optional component that loaded fine but found nothing
+    (no passage bundle published yet) reports "absent" instead of ready.
+    """
+
+    def __init__(self, name, load, warm=None, required=True, check=None, info=None, present=None):
+        self.name = name
+        self.load = load
+        self.warm = warm
+        self.required = required
+        self.check = check
+        self.info = info
+        self.present = present
+        self.status = "pending"
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.ready_after = None
+
+    def run(self):
+        try:
+            self.status = "loading"
+            start = time.perf_counter()
+            self.load()
+            self.load_seconds = time.perf_counter() - start
+            if self.warm is not None:
+                self.status = "warming"
+                start = time.perf_counter()
+                self.warm()
+                self.warmup_seconds = time.perf_counter() - start
+            self.ready_after = time.perf_counter() - PROCESS_START
+            self.status = "ready"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+            print(f"❌ Failed to load {self.name}: {e}")
+
+    @property
+    def absent(self):
+        return self.status == "ready" and self.present is not None and not self.present()
+
+    @property
+    def ready(self):
+        if self.check is not None and self.status in ("ready", "failed"):
+            return bool(self.check())
+        return self.status == "ready" and not self.absent
+
+    @property
+    def state(self):
+        return "ready" if self.ready else "absent" if self.absent else self.status
+
+    def report(self):
+        status = self.state
+        report = {
+            "status": status,
+            "required": self.required,
+            "load_seconds": None if self.load_seconds is None else round(self.load_seconds, 3),
+            "warmup_seconds": None if self.warmup_seconds is None else round(self.warmup_seconds, 3),
+            "ready_after_seconds": None if self.ready_after is None else round(self.ready_after, 3),
+            "error": self.error if status == "failed" else None,
+        }
+        if self.info is not None and status == "ready":
+            report.update(self.info())
+        return report
+
+
+class Warmup:
+    """Loads components one after another on a background thread, so the API serves requests
+    that don't need them (highlights, health checks) while models are still loading.
+
+    Components are loaded in the order given: cheap ones first, so they come up within
+    milliseconds instead of waiting behind the models.
+    """
+
+    def __init__(self, components):
+        self.components = {component.name: component for component in components}
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        for component in self.components.values():
+            component.run()
+        if self.ready:
+            print(f"🚀 Ready in {time.perf_counter() - PROCESS_START:.2f}s")
+
+    def is_ready(self, name):
+        return self.components[name].ready
+
+    def status(self, name):
+        return self.components[name].state
+
+    @property
+    def ready(self):
+        return all(component.ready for component in self.components.values() if component.required)
+
+    def report(self):
+        return {
+            "ready": self.ready,
+            # Optional components that are not ready: the API serves without them, at reduced quality
+            "degraded": [name for name, component in self.components.items() if not component.required and not component.ready],
+            "uptime_seconds": round(time.perf_counter() - PROCESS_START, 3),
+            "components": {name: component.report() for name, component in self.components.items()},
+        }
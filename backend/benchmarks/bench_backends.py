@@ -0,0 +1,157 @@
+# Compare inference backends (torch fp32, dynamic int8, ONNX Runtime) on latency and output quality.
+#
+#   python benchmarks/bench_backends.py --backends torch int8 onnx --articles 64
+#
+# fp32 torch is the reference: summaries are scored with ROUGE-1/ROUGE-L F1 against its output,
+# and embeddings with recall@k of each article's nearest neighbours. Articles come from the latest
+# summary snapshot when it exists, otherwise from synthetic text.
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+from config import MODEL_NAME, EMBEDDING_MODEL, GEN_MODEL_NAME, MAX_SUMMARY_WORDS
+from incremental import iter_articles
+from news_store import SUMMARY, load_dataset
+from inference_backend import load_summarizer, load_sentence_transformer, load_generator
+from create_summary import summary_input
+from summary_scheduler import ThroughputReport, summarize_scheduled
+
+WORDS = ("government minister announced police court market shares rates bank team coach season "
+         "match injury album tour festival health hospital climate rain flood council city").split()
+
+
+def load_articles(n, seed=0):
+    articles = [article for _, _, article in iter_articles(load_dataset(SUMMARY, {}, fields=("title", "raw_text"))) if summary_input(article)]
+    if len(articles) >= n:
+        return [{"title": a["title"], "raw_text": a["raw_text"]} for a in articles[:n]], "scraped"
+    rng = random.Random(seed)
+    return [{"title": " ".join(rng.choices(WORDS, k=8)), "raw_text": " ".join(rng.choices(WORDS, k=rng.randint(60, 300)))}
+            for _ in range(n)], "synthetic"
+
+
+def _lcs(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def _f1(overlap, candidate_len, reference_len):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate_len, overlap / reference_len
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge(candidate, reference):
+    """ROUGE-1 and ROUGE-L F1 on lower-cased whitespace tokens."""
+    c, r = candidate.lower().split(), reference.lower().split()
+    if not c or not r:
+        return {"rouge1": float(c == r), "rougeL": float(c == r)}
+    unigram_overlap = sum(min(c.count(w), r.count(w)) for w in set(c))
+    return {"rouge1": _f1(unigram_overlap, len(c), len(r)), "rougeL": _f1(_lcs(c, r), len(c), len(r))}
+
+
+def mean_rouge(candidates, references):
+    scores = [rouge(c or "", r or "") for c, r in zip(candidates, references)]
+    return {key: round(float(np.mean([s[key] for s in scores])), 4) for key in ("rouge1", "rougeL")}
+
+
+def recall_at_k(embeddings, reference, k):
+    """Share of each item's k nearest neighbours under the reference embeddings that are also found here."""
+    def neighbours(vectors):
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        scores = vectors @ vectors.T
+        np.fill_diagonal(scores, -np.inf)
+        return np.argsort(-scores, axis=1)[:, :k]
+    found, expected = neighbours(embeddings), neighbours(reference)
+    return round(float(np.mean([len(set(f) & set(e)) / k for f, e in zip(found, expected)])), 4)
+
+
+def bench_summarizer(backend, texts):
+    start = time.perf_counter()
+    summarizer, used = load_summarizer(MODEL_NAME, backend)
+    load_seconds = time.perf_counter() - start
+    articles = [{} for _ in texts]
+    report = ThroughputReport()
+    summarize_scheduled(summarizer, articles, texts, report)
+    return used, load_seconds, [a.get("summary") for a in articles], report.as_dict()
+
+
+def bench_embedder(backend, texts):
+    start = time.perf_counter()
+    model, used = load_sentence_transformer(EMBEDDING_MODEL, backend)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    embeddings = np.asarray(model.encode(texts, batch_size=16), dtype="float32")
+    seconds = time.perf_counter() - start
+    return used, load_seconds, embeddings, {"seconds": round(seconds, 3), "articles_per_sec": round(len(texts) / seconds, 2)}
+
+
+def bench_generator(backend, prompts):
+    start = time.perf_counter()
+    generator, used = load_generator(GEN_MODEL_NAME, backend)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    answers = [output["generated_text"] for output in generator(prompts, max_length=200, batch_size=len(prompts))]
+    seconds = time.perf_counter() - start
+    return used, load_seconds, answers, {"seconds": round(seconds, 3), "ms_per_answer": round(1000 * seconds / len(prompts), 1)}
+
+
+def compare(name, bench, backends, inputs, score):
+    """Run bench for each backend; the first backend's outputs are the reference for score()."""
+    results = []
+    reference = None
+    for backend in backends:
+        try:
+            used, load_seconds, outputs, timing = bench(backend, inputs)
+        except Exception as e:
+            results.append({"backend": backend, "error": f"{type(e).__name__}: {e}"})
+            continue
+        if reference is None:
+            reference = (timing, outputs)
+        entry = {"backend": backend, "used": used, "load_seconds": round(load_seconds, 2), **timing}
+        speed_key = "articles_per_sec" if "articles_per_sec" in timing else "seconds"
+        base = reference[0][speed_key]
+        entry["speedup"] = round(timing[speed_key] / base if speed_key == "articles_per_sec" else base / timing[speed_key], 2)
+        entry.update(score(outputs, reference[1]))
+        results.append(entry)
+        print(f"✅ {name} / {backend} done", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--articles", type=int, default=64)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--models", nargs="+", default=["summarizer", "embedder"],
+                        choices=["summarizer", "embedder", "generator"])
+    parser.add_argument("--prompts", type=int, default=8, help="generator prompts")
+    args = parser.parse_args()
+
+    articles, origin = load_articles(args.articles)
+    report = {"articles": len(articles), "origin": origin, "max_summary_tokens": MAX_SUMMARY_WORDS}
+
+    if "summarizer" in args.models:
+        texts = [summary_input(a) for a in articles]
+        report["summarizer"] = compare("summarizer", bench_summarizer, args.backends, texts, mean_rouge)
+    if "embedder" in args.models:
+        texts = [a["title"] + " " + a["raw_text"][:500] for a in articles]
+        report["embedder"] = compare("embedder", bench_embedder, args.backends, texts,
+                                     lambda found, expected: {f"recall@{args.k}": recall_at_k(found, expected, args.k)})
+    if "generator" in args.models:
+        prompts = [f"Answer the question using only the context.\nContext: {a['raw_text'][:600]}\nQuestion: What happened?"
+                   for a in articles[:args.prompts]]
+        report["generator"] = compare("generator", bench_generator, args.backends, prompts, mean_rouge)
+
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,75 @@
+# Compare ANN-based highlight clustering against the original greedy O(n²) algorithm.
+#
+#   python benchmarks/bench_clustering.py --sizes 1000 10000 100000
+#
+# Embeddings are synthetic: topic centroids plus noise, spread over three sources, so clusters
+# exist at roughly the density seen in real scrapes.
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+from config import COSINE_THRESHOLD
+from clustering import greedy_clusters, ann_clusters
+
+SOURCES = ["ABC News", "The Guardian", "The New Daily"]
+# The greedy Python loop takes minutes beyond this size, and its n×n matrix grows quadratically
+GREEDY_LIMIT = 10000
+
+
+def synthetic_embeddings(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(max(1, n // 5), dim))
+    labels = rng.integers(0, len(topics), n)
+    embeddings = (topics[labels] + rng.normal(scale=0.8, size=(n, dim))).astype("float32")
+    sources = [SOURCES[i] for i in rng.integers(0, len(SOURCES), n)]
+    return embeddings, sources
+
+
+def co_clustered_pairs(clusters):
+    pairs = set()
+    for cluster in clusters:
+        head = cluster[0]
+        pairs.update((head, j) for j in cluster[1:])
+    return pairs
+
+
+def run(n, dim, threshold, index_types):
+    embeddings, sources = synthetic_embeddings(n, dim)
+    result = {"articles": n, "dim": dim, "threshold": threshold}
+
+    reference = None
+    if n <= GREEDY_LIMIT:
+        start = time.perf_counter()
+        reference = greedy_clusters(embeddings, sources, threshold)
+        result["greedy"] = {"seconds": round(time.perf_counter() - start, 3), "clusters": len(reference)}
+    else:
+        result["greedy"] = {"skipped": f"n×n matrix needs {n * n * 4 / 1e9:.0f} GB"}
+
+    for index_type in index_types:
+        start = time.perf_counter()
+        clusters = ann_clusters(embeddings, sources, threshold, index_type=index_type)
+        entry = {"seconds": round(time.perf_counter() - start, 3), "clusters": len(clusters)}
+        if reference is not None:
+            expected, found = co_clustered_pairs(reference), co_clustered_pairs(clusters)
+            entry["identical"] = clusters == reference
+            entry["pair_recall"] = round(len(expected & found) / max(len(expected), 1), 4)
+            entry["pair_precision"] = round(len(expected & found) / max(len(found), 1), 4)
+        result[index_type] = entry
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--threshold", type=float, default=COSINE_THRESHOLD)
+    parser.add_argument("--index-types", nargs="+", default=["flat", "ivf", "hnsw"])
+    args = parser.parse_args()
+
+    results = [run(n, args.dim, args.threshold, args.index_types) for n in args.sizes]
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,87 @@
+# Recall@k, QPS, build time and memory of each highlight index type against exact search.
+#
+#   python benchmarks/bench_index.py --sizes 10000 100000 --nprobe 8 16 32 --ef-search 32 64 128
+#
+# Ground truth is exact inner-product search over normalised vectors (flat_ip). Embeddings are
+# synthetic topic clusters like bench_clustering's, normalised, so the numbers transfer to MiniLM.
+import os
+import sys
+import json
+import time
+import argparse
+import faiss
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from index_factory import INDEX_TYPES, create_index, configure_search, prepare_vectors, choose_index_type
+
+
+def synthetic_corpus(n, queries, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(max(1, n // 5), dim))
+    labels = rng.integers(0, len(topics), n + queries)
+    vectors = (topics[labels] + rng.normal(scale=0.8, size=(n + queries, dim))).astype("float32")
+    return vectors[:n], vectors[n:]
+
+
+def recall_at_k(found, expected):
+    k = expected.shape[1]
+    return float(np.mean([len(set(f) & set(e)) / k for f, e in zip(found, expected)]))
+
+
+def timed_search(index, queries, k):
+    start = time.perf_counter()
+    _, I = index.search(queries, k)
+    return I, len(queries) / (time.perf_counter() - start)
+
+
+def run(n, dim, queries, k, index_types, nprobes, ef_searches):
+    corpus, query_vectors = synthetic_corpus(n, queries, dim)
+    ids = np.arange(n, dtype="int64")
+    result = {"vectors": n, "dim": dim, "queries": queries, "k": k, "auto_choice": choose_index_type(n, "auto"), "types": []}
+
+    exact, _ = create_index("flat_ip", dim, prepare_vectors(corpus, "flat_ip"))
+    exact.add_with_ids(prepare_vectors(corpus, "flat_ip"), ids)
+    expected, _ = timed_search(exact, prepare_vectors(query_vectors, "flat_ip"), k)
+
+    for index_type in index_types:
+        vectors, q = prepare_vectors(corpus, index_type), prepare_vectors(query_vectors, index_type)
+        start = time.perf_counter()
+        index, params = create_index(index_type, dim, vectors)
+        index.add_with_ids(vectors, ids)
+        entry = {
+            "index_type": index_type,
+            "params": params,
+            "build_seconds": round(time.perf_counter() - start, 3),
+            "memory_mb": round(faiss.serialize_index(index).nbytes / 1e6, 2),
+            "runs": [],
+        }
+        # Sweep the query-time knob that applies to this type
+        if index_type.startswith("ivf"):
+            settings = [{"nprobe": nprobe} for nprobe in nprobes]
+        elif index_type == "hnsw":
+            settings = [{"ef_search": ef} for ef in ef_searches]
+        else:
+            settings = [{}]
+        for setting in settings:
+            configure_search(index, **setting)
+            found, qps = timed_search(index, q, k)
+            entry["runs"].append({**setting, f"recall@{k}": round(recall_at_k(found, expected), 4), "qps": round(qps, 1)})
+        result["types"].append(entry)
+        print(f"✅ {n} vectors / {index_type} done", file=sys.stderr)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--index-types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    args = parser.parse_args()
+
+    results = [run(n, args.dim, args.queries, args.k, args.index_types, args.nprobe, args.ef_search) for n in args.sizes]
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,107 @@
+# Article-page parse throughput of each HTML parser backend over the recorded HTML snapshot, and of
+# the parse process pool.
+#
+#   python benchmarks/bench_parse.py --repeats 5 --workers 2 4
+#
+# Every article page in the snapshot goes through its scraper's real extractor. Each backend's output
+# is checked against html.parser (what the scrapers used before); "mismatches" counts pages where it
+# differs. Pool runs submit every page at once, as concurrent fetch threads would.
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+from page_parser import BACKENDS, installed, parse_page, _extract
+from scraper_abc import parse_summary_and_raw_text, CATEGORY_URLS as ABC_URLS
+from scraper_guardian import parse_guardian_article, CATEGORY_URLS as GUARDIAN_URLS
+from scraper_thenewdaily import parse_newdaily_text, CATEGORY_URLS as NEWDAILY_URLS
+from html_snapshot import SNAPSHOT_FILE, load_snapshot
+
+EXTRACTORS = {
+    "www.abc.net.au": parse_summary_and_raw_text,
+    "www.theguardian.com": parse_guardian_article,
+    "thenewdaily.com.au": parse_newdaily_text,
+}
+LISTING_URLS = {*ABC_URLS.values(), *GUARDIAN_URLS.values(), *NEWDAILY_URLS.values()}
+
+
+def article_pages(snapshot):
+    """(url, extractor, body bytes) for every article page the snapshot has an extractor for."""
+    pages = []
+    for url, html in snapshot["pages"].items():
+        extract = EXTRACTORS.get(url.split("://", 1)[-1].split("/", 1)[0])
+        if extract is not None and url not in LISTING_URLS:
+            pages.append((url, extract, html.encode("utf-8")))
+    return pages
+
+
+def bench_backend(pages, backend, repeats):
+    runs, outputs = [], {}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for url, extract, content in pages:
+            outputs[url] = extract(parse_page(content, backend))
+        runs.append(time.perf_counter() - start)
+    return sorted(runs)[len(runs) // 2], outputs
+
+
+def bench_pool(pages, backend, workers, repeats):
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # Untimed: spawning workers and importing the scrapers is paid once per scrape, not per page
+        list(pool.map(_extract, [extract for _, extract, _ in pages[:workers]], [content for _, _, content in pages[:workers]],
+                      [backend] * workers))
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            futures = [pool.submit(_extract, extract, content, backend) for _, extract, content in pages]
+            for future in futures:
+                future.result()
+            runs.append(time.perf_counter() - start)
+    return sorted(runs)[len(runs) // 2]
+
+
+def throughput(seconds, pages, size):
+    return {
+        "seconds": round(seconds, 3),
+        "ms_per_page": round(seconds * 1000 / len(pages), 2),
+        "pages_per_sec": round(len(pages) / seconds, 1),
+        "mb_per_sec": round(size / 1e6 / seconds, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=SNAPSHOT_FILE)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=[b for b in BACKENDS if installed(b)])
+    parser.add_argument("--repeats", type=int, default=3, help="runs per case; the median is reported")
+    parser.add_argument("--workers", type=int, nargs="*", default=[], help="parse pool sizes to measure, with the fastest backend")
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(args.fixtures)
+    pages = article_pages(snapshot)
+    size = sum(len(content) for _, _, content in pages)
+    print(f"📄 {len(pages)} article pages, {size / 1e6:.1f} MB ({snapshot.get('mode')} snapshot)", file=sys.stderr)
+
+    _, reference = bench_backend(pages, "html.parser", 1)
+    results = []
+    for backend in args.backends:
+        seconds, outputs = bench_backend(pages, backend, args.repeats)
+        mismatches = [url for url in reference if outputs[url] != reference[url]]
+        results.append({"backend": backend, "workers": 1, **throughput(seconds, pages, size), "mismatches": len(mismatches)})
+        print(f"⏱️ {backend}: {results[-1]['pages_per_sec']} pages/s, {results[-1]['mb_per_sec']} MB/s, "
+              f"{len(mismatches)} mismatches", file=sys.stderr)
+        for url in mismatches[:3]:
+            print(f"   ≠ {url}", file=sys.stderr)
+
+    for workers in args.workers:
+        backend = args.backends[0]
+        seconds = bench_pool(pages, backend, workers, args.repeats)
+        results.append({"backend": backend, "workers": workers, **throughput(seconds, pages, size)})
+        print(f"⏱️ {backend} × {workers} processes: {results[-1]['pages_per_sec']} pages/s", file=sys.stderr)
+
+    print(json.dumps({"pages": len(pages), "mb": round(size / 1e6, 2), "cpu_count": os.cpu_count(), "results": results}, indent=2))
@@ -0,0 +1,144 @@
+# Build time, on-disk size and query latency of the full-text passage index.
+#
+#   python benchmarks/bench_passages.py --passages 10000 100000 --index-types auto flat_ip hnsw
+#
+# Articles are synthetic word soup shaped like the scraped corpus (~450 words each) and their
+# passage vectors are synthetic topic clusters (one topic per article), so the numbers isolate
+# chunking, indexing, the compact store and passage → article merging from the embedding model.
+# --embed N additionally times the real encoder on N passages at PASSAGE_EMBED_BATCH.
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import faiss
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PASSAGE_WORDS, PASSAGE_OVERLAP, PASSAGE_EMBED_BATCH, PASSAGES_PER_ARTICLE
+from index_factory import INDEX_TYPES, choose_index_type, create_index, prepare_vectors
+from passage_store import chunk_articles, write_passage_store, embedding_text, PassageStore
+
+WORDS = ("government minister announced police court market shares rates bank team coach season "
+         "match injury album tour festival health hospital climate rain flood council city").split()
+
+
+def synthetic_articles(passages, seed=0):
+    """Articles whose bodies chunk into at least `passages` passages in total."""
+    rng = random.Random(seed)
+    step = PASSAGE_WORDS - PASSAGE_OVERLAP
+    articles, total = [], 0
+    while total < passages:
+        words = rng.randint(150, 750)
+        articles.append({
+            "url": f"https://example.com/{len(articles)}",
+            "title": " ".join(rng.choices(WORDS, k=8)),
+            "source": rng.choice(["ABC News", "The Guardian", "The New Daily"]),
+            "category": rng.choice(["news", "sport", "business", "lifestyle"]),
+            "raw_text": " ".join(rng.choices(WORDS, k=words)),
+        })
+        total += 1 + max(0, -(-(words - PASSAGE_WORDS) // step))
+    return articles
+
+
+def synthetic_vectors(passages, dim, seed=0):
+    """Passages of one article share a topic, so merging back to articles actually has work to do."""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(int(passages["article"].max()) + 1, dim))
+    return (topics[passages["article"]] + rng.normal(scale=0.6, size=(len(passages), dim))).astype("float32")
+
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def json_list_bytes(records, texts, passages):
+    """Size of the same data as one JSON list with a full record per passage, the highlight metadata layout."""
+    return len(json.dumps([
+        {**records[row["article"]], "text": texts[row["start"]:row["end"]].decode("utf-8")} for row in passages
+    ], separators=(",", ":")).encode("utf-8"))
+
+
+def time_queries(index, store, queries, k):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        D, I = index.search(query[None, :], min(k * PASSAGES_PER_ARTICLE * 4, len(store)))
+        store.group_by_article(I[0], D[0], k, PASSAGES_PER_ARTICLE)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return {"p50_ms": round(float(np.percentile(latencies, 50)), 3), "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+            "qps": round(len(queries) / (latencies.sum() / 1000), 1)}
+
+
+def time_embedding(records, texts, passages, n):
+    from worker_pool import get_encoder
+    sample = [embedding_text(records[row["article"]], texts[row["start"]:row["end"]].decode("utf-8")) for row in passages[:n]]
+    encoder = get_encoder()
+    encoder.encode(sample[:PASSAGE_EMBED_BATCH], batch_size=PASSAGE_EMBED_BATCH)  # warm-up
+    start = time.perf_counter()
+    encoder.encode(sample, batch_size=PASSAGE_EMBED_BATCH)
+    seconds = time.perf_counter() - start
+    return {"passages": len(sample), "batch_size": PASSAGE_EMBED_BATCH, "passages_per_sec": round(len(sample) / seconds, 1)}
+
+
+def run(n, dim, queries, k, index_types, embed):
+    start = time.perf_counter()
+    records, texts, passages = chunk_articles(synthetic_articles(n))
+    result = {
+        "passages": len(passages),
+        "articles": len(records),
+        "chunk_seconds": round(time.perf_counter() - start, 3),
+        "json_list_mb": round(json_list_bytes(records, texts, passages) / 1e6, 2),
+        "types": [],
+    }
+    if embed:
+        result["embedding"] = time_embedding(records, texts, passages, embed)
+
+    vectors = synthetic_vectors(passages, dim)
+    query_vectors = vectors[np.random.default_rng(1).integers(0, len(vectors), queries)]
+    # auto resolves to one of the explicit types; benchmark each resolved type once
+    for index_type in dict.fromkeys(choose_index_type(len(vectors), requested) for requested in index_types):
+        prepared, q = prepare_vectors(vectors, index_type), prepare_vectors(query_vectors, index_type)
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            index, params = create_index(index_type, dim, prepared)
+            index.add_with_ids(prepared, np.arange(len(prepared), dtype="int64"))
+            index_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            write_passage_store(directory, records, texts, passages)
+            store_seconds = time.perf_counter() - start
+            store_mb = directory_bytes(directory) / 1e6
+            start = time.perf_counter()
+            store = PassageStore(directory)
+            open_ms = (time.perf_counter() - start) * 1000
+            result["types"].append({
+                "index_type": index_type,
+                "params": params,
+                "index_build_seconds": round(index_seconds, 3),
+                "store_write_seconds": round(store_seconds, 3),
+                "store_mb": round(store_mb, 2),
+                "index_mb": round(faiss.serialize_index(index).nbytes / 1e6, 2),
+                "store_open_ms": round(open_ms, 2),
+                f"query_top{k}": time_queries(index, store, q, k),
+            })
+            if store.texts is not None:
+                store.texts.close()
+        print(f"✅ {len(passages)} passages / {index_type} done", file=sys.stderr)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--passages", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3, help="articles per query")
+    parser.add_argument("--index-types", nargs="+", default=["auto", "flat_ip", "hnsw"], choices=("auto",) + INDEX_TYPES)
+    parser.add_argument("--embed", type=int, default=0, help="also time the real encoder on this many passages")
+    args = parser.parse_args()
+
+    results = [run(n, args.dim, args.queries, args.k, args.index_types, args.embed) for n in args.passages]
+    print(json.dumps({"passage_words": PASSAGE_WORDS, "passage_overlap": PASSAGE_OVERLAP, "results": results}, indent=2))
@@ -0,0 +1,128 @@
+# Write time, disk size, load time and resident memory of the pretty-printed JSON files against
+# the SQLite stores (news.db for pipeline datasets, metadata.db for index bundles).
+#
+#   python benchmarks/bench_storage.py --articles 5000 20000
+#
+# Every load runs in a fresh interpreter so RSS is not polluted by earlier cases; "rss_mb" is the
+# growth of VmRSS across the load and "peak_rss_mb" the growth of VmHWM. Articles are synthetic,
+# ~840 words drawn from the scraped corpus's word stream (so text compresses like real articles);
+# highlight metadata covers half of them.
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from news_store import SUMMARY, load_dataset, save_dataset
+from metadata_store import MetadataStore, JsonMetadata, write_metadata
+from incremental import stable_id
+from synthetic import synthetic_dataset, corpus_words
+
+LOOKUP_IDS = 5
+
+
+def synthetic_metadata(data):
+    items = []
+    for categories in data.values():
+        for articles in categories.values():
+            for article in articles[::2]:
+                items.append({
+                    "id": stable_id(article["url"]), "title": article["title"], "summary": article["summary"],
+                    "url": article["url"], "category": article["category"], "sources": [article["source"]],
+                    "frequency": 1, "content_hash": article["content_hash"],
+                })
+    return items
+
+
+def write_fixtures(directory, n):
+    data = synthetic_dataset(n, corpus_words(load_dataset(SUMMARY, {}, fields=("raw_text",))))
+    metadata = synthetic_metadata(data)
+    timings = {}
+
+    start = time.perf_counter()
+    with open(os.path.join(directory, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    with open(os.path.join(directory, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    timings["json_write_seconds"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    save_dataset(SUMMARY, data, path=os.path.join(directory, "news.db"))
+    write_metadata(os.path.join(directory, "metadata.db"), metadata)
+    timings["sqlite_write_seconds"] = round(time.perf_counter() - start, 3)
+
+    with open(os.path.join(directory, "ids.json"), "w", encoding="utf-8") as f:
+        json.dump([item["id"] for item in random.Random(1).sample(metadata, LOOKUP_IDS)], f)
+    sizes = {name: round(os.path.getsize(os.path.join(directory, name)) / 1e6, 2)
+             for name in ("summary.json", "news.db", "metadata.json", "metadata.db")}
+    return {"articles": n, "highlights": len(metadata), **timings, "disk_mb": sizes}
+
+
+def memory_kb():
+    """(VmRSS, VmHWM) in kB. ru_maxrss is no use here: Linux carries it over from the parent across exec."""
+    status = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            status[key] = value
+    return int(status["VmRSS"].split()[0]), int(status["VmHWM"].split()[0])
+
+
+# Each case loads what one consumer needs and returns it, so it stays resident while RSS is read
+CASES = {
+    # Pipeline: the highlights stage reading summarised articles
+    "json_summary": lambda d, ids: json.load(open(os.path.join(d, "summary.json"), encoding="utf-8")),
+    "sqlite_summary": lambda d, ids: load_dataset(SUMMARY, path=os.path.join(d, "news.db")),
+    "sqlite_summary_projected": lambda d, ids: load_dataset(
+        SUMMARY, fields=("title", "summary", "url"), path=os.path.join(d, "news.db")),
+    # API: opening a bundle's metadata and resolving one query's hits
+    "json_metadata": lambda d, ids: (lambda m: (m, m.get(ids)))(JsonMetadata.load(os.path.join(d, "metadata.json"))),
+    "sqlite_metadata": lambda d, ids: (lambda m: (m, m.get(ids)))(MetadataStore(os.path.join(d, "metadata.db"))),
+    "sqlite_metadata_filter_columns": lambda d, ids: (lambda m: (m, m.project("id", "category", "sources")))(
+        MetadataStore(os.path.join(d, "metadata.db"))),
+}
+
+
+def measure(case, directory):
+    with open(os.path.join(directory, "ids.json"), "r", encoding="utf-8") as f:
+        ids = json.load(f)
+    rss_before, peak_before = memory_kb()
+    start = time.perf_counter()
+    loaded = CASES[case](directory, ids)
+    seconds = time.perf_counter() - start
+    rss_after, peak_after = memory_kb()
+    del loaded
+    return {"case": case, "load_ms": round(seconds * 1000, 1),
+            "rss_mb": round((rss_after - rss_before) / 1024, 1), "peak_rss_mb": round((peak_after - peak_before) / 1024, 1)}
+
+
+def run(n, repeats):
+    with tempfile.TemporaryDirectory() as directory:
+        result = write_fixtures(directory, n)
+        result["loads"] = []
+        for case in CASES:
+            runs = [json.loads(subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--measure", case, "--dir", directory],
+                check=True, capture_output=True, text=True).stdout) for _ in range(repeats)]
+            # Median by load time; RSS barely varies between runs
+            result["loads"].append(sorted(runs, key=lambda r: r["load_ms"])[len(runs) // 2])
+        print(f"✅ {n} articles done", file=sys.stderr)
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--measure", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.dir)))
+    else:
+        print(json.dumps([run(n, args.repeats) for n in args.articles], indent=2))
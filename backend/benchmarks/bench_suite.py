@@ -0,0 +1,396 @@
+# End-to-end benchmark suite: every pipeline stage plus API latency under load, offline, written as
+# one JSON file per run so runs can be compared across commits.
+#
+#   python benchmarks/bench_suite.py                                # all stages → benchmarks/results/<commit>.json
+#   python benchmarks/bench_suite.py --stages parse highlights index --articles 5000
+#   python benchmarks/compare_results.py benchmarks/results/<old>.json benchmarks/results/<new>.json
+#
+# Stages (each in a fresh interpreter, against a scratch NEWS_DATA_DIR/RAG_INDEX_DIR, so model loads
+# and caches don't leak between them and the real scraper output is never touched):
+#   parse       replay the recorded ABC/Guardian HTML through the unmodified scrapers
+#   summarise   summarise synthetic articles (model load reported, not timed)
+#   highlights  embed synthetic articles into an empty embedding store, then cluster them
+#   index       build and publish the FAISS bundle over those highlights
+#   api         start uvicorn on that bundle; p50/p95/p99 and QPS of /api/highlights, /api/search and
+#               /api/chat-query under the closed-loop load generator
+# Synthetic articles draw their words from the snapshot's article text; see synthetic.py.
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from collections import deque
+from contextlib import redirect_stdout
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+STAGES = ("parse", "summarise", "highlights", "index", "api")
+# Stages that read the synthetic dataset; it is generated once per suite run
+DATA_STAGES = {"summarise", "highlights", "index", "api"}
+# Knobs recorded with every run, so a comparison shows what changed besides the code
+CONFIG_KEYS = (
+    "MODEL_NAME", "EMBEDDING_MODEL_ID", "GEN_MODEL_NAME", "SUMMARY_BACKEND", "GEN_BACKEND",
+    "SUMMARY_TOKEN_BUDGET", "SUMMARY_MAX_BATCH", "SUMMARY_MAX_INPUT_TOKENS", "COSINE_THRESHOLD",
+    "CLUSTER_INDEX_TYPE", "FAISS_INDEX_TYPE", "FAISS_NPROBE", "FAISS_HNSW_EF_SEARCH", "HYBRID_RETRIEVAL",
+    "INFERENCE_WORKERS", "INFERENCE_EXECUTOR_WORKERS", "CHAT_BATCH_MAX_SIZE", "CHAT_MAX_NEW_TOKENS",
+    "SCRAPE_CONCURRENCY", "HTML_PARSER", "PARSE_WORKERS",
+)
+
+
+def median_run(runs, key="seconds"):
+    return sorted(runs, key=lambda run: run[key])[len(runs) // 2]
+
+
+def synthetic_path(workdir):
+    return os.path.join(workdir, "synthetic.json")
+
+
+def load_synthetic(workdir):
+    with open(synthetic_path(workdir), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ------------------ STAGES (run inside a stage subprocess) ------------------ #
+def stage_config(args):
+    import config
+    from create_summary import BATCH_SIZE
+    from page_parser import BACKEND, parse_workers
+    return {"BATCH_SIZE": BATCH_SIZE, "PARSE_BACKEND": BACKEND, "PARSE_POOL": parse_workers(),
+            **{key: getattr(config, key) for key in CONFIG_KEYS}}
+
+
+def stage_data(args):
+    from html_snapshot import load_snapshot, replay, scrape_snapshot_sources
+    from synthetic import synthetic_dataset, corpus_words
+
+    with replay(load_snapshot(args["fixtures"])):
+        words = corpus_words(scrape_snapshot_sources())
+    data = synthetic_dataset(args["articles"], words, args["seed"], args["duplicate_rate"])
+    with open(synthetic_path(args["workdir"]), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return {"articles": args["articles"], "duplicate_rate": args["duplicate_rate"], "vocabulary": len(set(words))}
+
+
+def stage_parse(args):
+    from html_snapshot import load_snapshot, replay, scrape_snapshot_sources
+    from incremental import iter_articles
+
+    snapshot = load_snapshot(args["fixtures"])
+    runs = []
+    for _ in range(args["repeats"]):
+        with replay(snapshot) as served:
+            start = time.perf_counter()
+            data = scrape_snapshot_sources()
+            seconds = time.perf_counter() - start
+        articles = sum(1 for _, _, article in iter_articles(data) if article.get("raw_text"))
+        runs.append({"seconds": seconds, "pages": served["pages"], "bytes": served["bytes"], "articles": articles})
+    run = median_run(runs)
+    return {
+        "snapshot_mode": snapshot.get("mode"),
+        "pages": run["pages"],
+        "mb": round(run["bytes"] / 1e6, 2),
+        "articles": run["articles"],
+        "seconds": round(run["seconds"], 3),
+        "pages_per_sec": round(run["pages"] / run["seconds"], 2),
+        "mb_per_sec": round(run["bytes"] / 1e6 / run["seconds"], 2),
+        "articles_per_sec": round(run["articles"] / run["seconds"], 2),
+    }
+
+
+def stage_summarise(args):
+    from create_summary import summary_input, summarize_batch
+    from incremental import iter_articles
+    from model_registry import get_summarizer
+    from summary_scheduler import ThroughputReport
+    from synthetic import without_summaries
+    from worker_pool import get_pool
+
+    articles, texts = [], []
+    for _, _, article in iter_articles(without_summaries(load_synthetic(args["workdir"]))):
+        text = summary_input(article)
+        if text is not None and len(articles) < args["summary_articles"]:
+            articles.append(article)
+            texts.append(text)
+
+    start = time.perf_counter()
+    pool = get_pool()
+    if pool is not None:
+        pool.warm()
+    else:
+        get_summarizer()
+    load_seconds = time.perf_counter() - start
+
+    report = ThroughputReport()
+    summarize_batch(articles, texts, report)
+    return {"model_load_seconds": round(load_seconds, 2), **report.as_dict()}
+
+
+def stage_highlights(args):
+    from clustering import ann_clusters
+    from config import COSINE_THRESHOLD
+    from create_highlights import collect_articles, embed_articles, build_highlights
+    from news_store import HIGHLIGHTS, save_dataset
+    from worker_pool import get_encoder
+
+    data = load_synthetic(args["workdir"])
+    all_articles = collect_articles(data)
+
+    start = time.perf_counter()
+    get_encoder()
+    load_seconds = time.perf_counter() - start
+
+    # The scratch embedding store starts empty, so this is a cold embed of every article
+    start = time.perf_counter()
+    embeddings = embed_articles(all_articles)
+    embed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clusters = ann_clusters(embeddings, [a["source"] for a in all_articles], COSINE_THRESHOLD)
+    cluster_seconds = time.perf_counter() - start
+
+    # The whole stage as the pipeline runs it, now that every embedding is in the store
+    start = time.perf_counter()
+    highlights = build_highlights(data)
+    build_seconds = time.perf_counter() - start
+    save_dataset(HIGHLIGHTS, highlights)
+    return {
+        "articles": len(all_articles),
+        "model_load_seconds": round(load_seconds, 2),
+        "embed_seconds": round(embed_seconds, 3),
+        "embed_articles_per_sec": round(len(all_articles) / embed_seconds, 2),
+        "cluster_seconds": round(cluster_seconds, 3),
+        "clusters": len(clusters),
+        "highlights": len(highlights),
+        "build_highlights_cached_seconds": round(build_seconds, 3),
+    }
+
+
+def stage_index(args):
+    from create_faiss_index import build_index
+    from index_bundle import bundle_dir, current_version
+    from news_store import HIGHLIGHTS, load_dataset
+
+    highlights = load_dataset(HIGHLIGHTS, default=[])
+    if not highlights:
+        raise RuntimeError("No highlights in the scratch store; run the highlights stage first")
+    start = time.perf_counter()
+    version = build_index(highlights)
+    seconds = time.perf_counter() - start
+    directory = bundle_dir(version)
+    with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    return {
+        "highlights": len(highlights),
+        "index_type": manifest.get("index_type"),
+        "seconds": round(seconds, 3),
+        "bundle_mb": round(size / 1e6, 2),
+        "published": current_version() == version,
+    }
+
+
+STAGE_FUNCTIONS = {
+    "config": stage_config, "data": stage_data, "parse": stage_parse, "summarise": stage_summarise,
+    "highlights": stage_highlights, "index": stage_index,
+}
+
+
+def run_stage_here(name, args):
+    sys.path.append(BACKEND_DIR)
+    sys.path.append(os.path.join(BACKEND_DIR, "scraper"))
+    # Pipeline code prints progress; stdout is reserved for the stage's JSON result
+    with redirect_stdout(sys.stderr):
+        result = STAGE_FUNCTIONS[name](args)
+    print(json.dumps(result))
+
+
+# ------------------ ORCHESTRATION ------------------ #
+def stage_env(workdir):
+    return {
+        **os.environ,
+        "NEWS_DATA_DIR": os.path.join(workdir, "news_data"),
+        "RAG_INDEX_DIR": os.path.join(workdir, "rag_index"),
+        # Every page must be parsed, not answered from the conditional-GET cache
+        "HTTP_CACHE_ENABLED": "0",
+        "PYTHONUNBUFFERED": "1",
+    }
+
+
+def run_stage(name, args):
+    """Result of one stage in its own interpreter; failures are recorded, not raised."""
+    print(f"⏱️ Stage {name}...", file=sys.stderr)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--run-stage", name, "--stage-args", json.dumps(args)],
+        cwd=BACKEND_DIR, env=stage_env(args["workdir"]), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    tail = deque(maxlen=20)
+    for line in process.stderr:
+        if args["verbose"]:
+            sys.stderr.write(line)
+        tail.append(line.rstrip())
+    stdout = process.stdout.read()
+    if process.wait() != 0:
+        print(f"❌ Stage {name} failed:\n" + "\n".join(tail), file=sys.stderr)
+        return {"error": tail[-1] if tail else f"exit code {process.returncode}"}
+    print(f"✅ Stage {name} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(url, timeout):
+    """(seconds to /healthz, seconds to /readyz or None, last /readyz body); gives up early if a component failed."""
+    import httpx
+    start = time.perf_counter()
+    healthy = None
+    report = {}
+    while time.perf_counter() - start < timeout:
+        try:
+            if healthy is None and httpx.get(f"{url}/healthz", timeout=1).status_code == 200:
+                healthy = time.perf_counter() - start
+            if healthy is not None:
+                response = httpx.get(f"{url}/readyz", timeout=1)
+                report = response.json()
+                if response.status_code == 200:
+                    return healthy, time.perf_counter() - start, report
+                if any(c["status"] == "failed" and c["required"] for c in report.get("components", {}).values()):
+                    return healthy, None, report
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    return healthy, None, report
+
+
+def run_api(args):
+    import httpx
+    from loadgen import run_load, QUESTIONS
+
+    print("⏱️ Stage api...", file=sys.stderr)
+    titles = [a["title"] for categories in load_synthetic(args["workdir"]).values()
+              for articles in categories.values() for a in articles]
+    queries = list(QUESTIONS) + titles[:200]
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=stage_env(args["workdir"]),
+        stdout=None if args["verbose"] else subprocess.DEVNULL, stderr=None if args["verbose"] else subprocess.DEVNULL,
+    )
+    try:
+        healthy, ready, report = wait_until_ready(url, args["ready_timeout"])
+        result = {"startup": {
+            "healthz_seconds": None if healthy is None else round(healthy, 2),
+            "ready_seconds": None if ready is None else round(ready, 2),
+            "components": report.get("components", {}),
+        }}
+        components = report.get("components", {})
+        for scenario in args["scenarios"]:
+            needs = ("index", "embedder", "generator") if scenario == "chat" else ("index", "embedder") if scenario == "search" else ("index",)
+            missing = [name for name in needs if components.get(name, {}).get("status") != "ready"]
+            if missing:
+                result[scenario] = {"skipped": f"not ready: {', '.join(missing)}"}
+                continue
+            chat = scenario == "chat"
+            runs = []
+            for concurrency in args["chat_concurrency"] if chat else args["concurrency"]:
+                duration = args["chat_duration"] if chat else args["duration"]
+                runs.append(asyncio.run(run_load(url, scenario, concurrency, duration, args["warmup"], queries)))
+                print(f"📈 {scenario} x{concurrency}: {runs[-1]['qps']} req/s, p95 {runs[-1]['p95_ms']} ms", file=sys.stderr)
+            result[scenario] = runs
+            if chat:
+                result["chat_metrics"] = httpx.get(f"{url}/api/chat-metrics", timeout=10).json()
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def git_meta():
+    def git(*command):
+        try:
+            return subprocess.run(["git", *command], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def run_suite(args):
+    meta = {
+        **git_meta(),
+        "started_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {key: value for key, value in args.items()
+                 if key not in ("workdir", "verbose", "started", "output", "run_stage", "stage_args")},
+    }
+    results = {"meta": meta, "config": run_stage("config", args), "stages": {}}
+    if DATA_STAGES & set(args["stages"]):
+        results["stages"]["data"] = run_stage("data", args)
+    for name in args["stages"]:
+        results["stages"][name] = run_api(args) if name == "api" else run_stage(name, args)
+    meta["seconds"] = round(time.perf_counter() - args["started"], 1)
+    return results
+
+
+def default_output(meta):
+    name = f"{meta.get('commit') or 'unknown'}{'-dirty' if meta.get('dirty') else ''}"
+    return os.path.join(RESULTS_DIR, f"{name}.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--articles", type=int, default=2000, help="synthetic articles for highlights/index/api")
+    parser.add_argument("--summary-articles", type=int, default=64)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3, help="parse runs; the median is reported")
+    parser.add_argument("--fixtures", default=os.path.join(BENCH_DIR, "fixtures", "html_snapshot.json.xz"))
+    parser.add_argument("--scenarios", nargs="+", choices=["highlights", "search", "chat"], default=["highlights", "search", "chat"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--chat-concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--chat-duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--ready-timeout", type=float, default=600)
+    parser.add_argument("--workdir", help="scratch data directory (kept); default is a temporary one")
+    parser.add_argument("--output", help="default: benchmarks/results/<commit>[-dirty].json")
+    parser.add_argument("--verbose", action="store_true", help="show stage and server logs")
+    parser.add_argument("--run-stage", choices=list(STAGE_FUNCTIONS), help=argparse.SUPPRESS)
+    parser.add_argument("--stage-args", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage_here(args.run_stage, json.loads(args.stage_args))
+        sys.exit(0)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="news-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    options = {**vars(args), "workdir": os.path.abspath(workdir), "started": time.perf_counter()}
+    try:
+        results = run_suite(options)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or default_output(results["meta"])
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results["stages"], indent=2))
+    print(f"💾 Results written to {output}", file=sys.stderr)
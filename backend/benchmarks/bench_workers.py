@@ -0,0 +1,81 @@
+# Measure how summarisation and embedding scale across inference worker processes.
+#
+#   python benchmarks/bench_workers.py --workers 1 2 4 8 --articles 256
+#
+# Each worker count gets a fresh pool; model loading happens in a warm-up pass and is not timed.
+# Texts are synthetic news-like word salad with varied lengths, so batches see realistic padding.
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+from summary_scheduler import ThroughputReport
+from worker_pool import WorkerPool
+
+WORDS = ("government minister announced police court market shares rates bank team coach season "
+         "match injury album tour festival health hospital climate rain flood council city "
+         "students school report million billion week year today").split()
+
+
+def synthetic_texts(n, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(40, 400))).capitalize() + "." for _ in range(n)]
+
+
+def run(workers, threads, texts, tasks):
+    pool = WorkerPool(workers=workers, threads=threads)
+    try:
+        start = time.perf_counter()
+        pool.warm()
+        result = {"workers": workers, "threads_per_worker": pool.threads,
+                  "warmup_seconds": round(time.perf_counter() - start, 2)}
+        outputs = {}
+
+        if "summarize" in tasks:
+            report = ThroughputReport()
+            outputs["summarize"] = pool.summarize(texts, report)
+            result["summarize"] = report.as_dict()
+
+        if "encode" in tasks:
+            start = time.perf_counter()
+            outputs["encode"] = pool.encode(texts)
+            seconds = time.perf_counter() - start
+            result["encode"] = {"seconds": round(seconds, 2), "articles_per_sec": round(len(texts) / seconds, 2)}
+        return result, outputs
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads-per-worker", type=int, default=0, help="0 = cpu_count // workers")
+    parser.add_argument("--articles", type=int, default=256)
+    parser.add_argument("--tasks", nargs="+", default=["summarize", "encode"], choices=["summarize", "encode"])
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.articles)
+    results = []
+    baseline = None
+    for workers in args.workers:
+        result, outputs = run(workers, args.threads_per_worker, texts, args.tasks)
+        if baseline is None:
+            baseline = (result, outputs)
+        # Sharding must not change results: compare every run against the first worker count
+        for task in args.tasks:
+            base_result, base_outputs = baseline
+            rate, base_rate = result[task]["articles_per_sec"], base_result[task]["articles_per_sec"]
+            result[task]["speedup"] = round(rate / base_rate, 2) if base_rate else None
+            if task == "summarize":
+                same = sum(a == b for a, b in zip(outputs[task], base_outputs[task]))
+                result[task]["matches_baseline"] = round(same / len(texts), 4)
+            else:
+                result[task]["max_abs_diff"] = float(abs(outputs[task] - base_outputs[task]).max())
+        results.append(result)
+        print(f"🧵 {workers} workers done", file=sys.stderr)
+
+    print(json.dumps({"cpu_count": os.cpu_count(), "articles": len(texts), "results": results}, indent=2))
@@ -0,0 +1,96 @@
+# Compare two bench_suite.py result files metric by metric.
+#
+#   python benchmarks/compare_results.py benchmarks/results/abc123.json benchmarks/results/def456.json
+#   python benchmarks/compare_results.py old.json new.json --threshold 0.1 --fail-on-regression
+#
+# Throughputs (*_per_sec, qps) are better higher; latencies and durations (*_ms, *seconds) better
+# lower. Other numbers (counts, sizes) are shown but never count as a regression. Config knobs that
+# differ between the runs are listed first, since they explain most differences.
+import sys
+import json
+import argparse
+
+
+def flatten(value, prefix=""):
+    """{"stages.api.search.0.p95_ms": 12.3, ...} for every number in a result file."""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        # Load runs are keyed by concurrency so runs at different levels line up
+        items = ((f"c{item['concurrency']}" if isinstance(item, dict) and "concurrency" in item else str(i), item)
+                 for i, item in enumerate(value))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    else:
+        return {}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def direction(name):
+    """+1 if higher is better, -1 if lower is better, 0 if neither."""
+    leaf = name.rsplit(".", 1)[-1]
+    if leaf.endswith("_per_sec") or leaf == "qps":
+        return 1
+    if leaf.endswith("_ms") or leaf.endswith("seconds"):
+        return -1
+    return 0
+
+
+def compare(old, new, threshold):
+    """Rows of (metric, old, new, relative change, verdict) for the stage metrics both runs have."""
+    old_flat, new_flat = flatten(old.get("stages", {})), flatten(new.get("stages", {}))
+    rows = []
+    for name in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[name], new_flat[name]
+        change = (after - before) / before if before else 0.0
+        better = direction(name)
+        verdict = ""
+        if better and abs(change) >= threshold:
+            verdict = "better" if change * better > 0 else "REGRESSION"
+        rows.append((name, before, after, change, verdict))
+    return rows
+
+
+def config_changes(old, new):
+    old_config, new_config = old.get("config", {}), new.get("config", {})
+    return [(key, old_config.get(key), new_config.get(key)) for key in sorted(old_config.keys() | new_config.keys())
+            if old_config.get(key) != new_config.get(key)]
+
+
+def label(result):
+    meta = result.get("meta", {})
+    return f"{meta.get('commit') or 'unknown'}{'-dirty' if meta.get('dirty') else ''}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.05, help="relative change worth flagging")
+    parser.add_argument("--all", action="store_true", help="also list metrics that moved less than the threshold")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.old, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"{label(old)} → {label(new)}")
+    for key, before, after in config_changes(old, new):
+        print(f"⚙️  {key}: {before} → {after}")
+
+    rows = compare(old, new, args.threshold)
+    width = max((len(row[0]) for row in rows), default=10)
+    for name, before, after, change, verdict in rows:
+        if verdict or args.all:
+            print(f"{name:<{width}}  {before:>12g}  {after:>12g}  {change:>+8.1%}  {verdict}")
+
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    print(f"{len(regressions)} regression(s), {sum(row[4] == 'better' for row in rows)} improvement(s) "
+          f"beyond {args.threshold:.0%} across {len(rows)} metrics")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
@@ -0,0 +1,207 @@
+# Recorded ABC and Guardian HTML for offline benchmarks: category listings and article pages, keyed by
+# URL, in one xz-compressed JSON file (pages share most of their markup, which xz stores once).
+#
+#   python benchmarks/html_snapshot.py --live            # record the current sites through the scrapers
+#   python benchmarks/html_snapshot.py --from-corpus     # rebuild pages from the scraped dataset
+#
+# --from-corpus lays the articles of the latest scrape out in the markup the parsers select on, padded
+# with site chrome (navigation, inline state script, footer) so pages are as heavy to parse as real
+# ones. replay() serves a snapshot to the unmodified scrapers in place of the network.
+import os
+import sys
+import json
+import lzma
+import re
+import random
+import argparse
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from html import escape
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, "scraper"))
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html_snapshot.json.xz")
+
+# Sources the snapshot covers, as named in scraper_manager.SOURCES
+SNAPSHOT_SOURCES = ("ABC News", "The Guardian")
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    with lzma.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_snapshot(snapshot, path=SNAPSHOT_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with lzma.open(path, "wt", encoding="utf-8", preset=9) as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+
+
+class SnapshotResponse:
+    """The parts of requests.Response the scrapers use."""
+
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+@contextmanager
+def replay(snapshot):
+    """Serve every scraper fetch from snapshot instead of the network; yields live page/byte counters.
+
+    Needs HTTP_CACHE_ENABLED=0, or the conditional-GET cache would skip parsing pages it has seen.
+    """
+    import requests
+    import scraper_base
+
+    pages = {url: html.encode("utf-8") for url, html in snapshot["pages"].items()}
+    served = {"pages": 0, "bytes": 0}
+    lock = threading.Lock()
+
+    def fetch(url, headers=None):
+        if url not in pages:
+            raise requests.HTTPError(f"404 Client Error: {url} is not in the snapshot")
+        with lock:
+            served["pages"] += 1
+            served["bytes"] += len(pages[url])
+        return SnapshotResponse(pages[url])
+
+    original = scraper_base.fetch
+    scraper_base.fetch = fetch
+    try:
+        yield served
+    finally:
+        scraper_base.fetch = original
+
+
+def scrape_snapshot_sources(on_article=None):
+    """Run the real scraper for every snapshot source; call inside replay()."""
+    from scraper_manager import source_jobs, run_jobs
+    return run_jobs([job for source in SNAPSHOT_SOURCES for job in source_jobs(source)], {}, on_article)
+
+
+def record_live():
+    """Scrape the live sites once, keeping every page body the scrapers fetched."""
+    import scraper_base
+    pages = {}
+    original = scraper_base.fetch
+
+    def fetch(url, headers=None):
+        response = original(url, headers=headers)
+        pages[url] = response.content.decode(response.encoding or "utf-8", errors="replace")
+        return response
+
+    scraper_base.fetch = fetch
+    try:
+        data = scrape_snapshot_sources()
+    finally:
+        scraper_base.fetch = original
+    return {"recorded_at": datetime.now().isoformat(), "mode": "live", "articles": count_articles(data), "pages": pages}
+
+
+# ------------------ REBUILDING FROM THE SCRAPED DATASET ------------------ #
+def site_chrome(rng, site, links=400, state_kb=24):
+    """Navigation, inline app state and footer in the proportions of a real news page."""
+    sections = ["news", "sport", "business", "lifestyle", "music", "politics", "world", "science", "health", "arts"]
+    nav = "".join(
+        f'<li class="{site}-nav__item"><a class="{site}-nav__link" href="/{rng.choice(sections)}/{rng.randrange(10**8)}" '
+        f'data-link-name="nav : {rng.choice(sections)}">{escape(rng.choice(sections).title())} {i}</a></li>'
+        for i in range(links)
+    )
+    state = json.dumps([{"id": rng.randrange(10**9), "section": rng.choice(sections), "score": rng.random(),
+                         "flags": [rng.random() < 0.5 for _ in range(4)]} for _ in range(state_kb * 8)])
+    header = f'<header class="{site}-header"><nav><ul class="{site}-nav">{nav}</ul></nav></header>'
+    footer = f'<footer class="{site}-footer"><ul>{nav[: len(nav) // 3]}</ul></footer>'
+    script = f'<script id="__NEXT_DATA__" type="application/json">{escape(state)}</script>'
+    return header, footer + script
+
+
+def page(rng, site, title, main):
+    header, footer = site_chrome(rng, site)
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{escape(title)}</title>'
+            f'<meta name="viewport" content="width=device-width, initial-scale=1"></head>'
+            f'<body>{header}<main id="maincontent">{main}</main>{footer}</body></html>')
+
+
+def paragraphs(text, sentences=3):
+    parts = re.split(r"(?<=[.!?])\s+", text.strip())
+    return [" ".join(parts[i:i + sentences]) for i in range(0, len(parts), sentences)]
+
+
+def url_path(url):
+    return "/" + url.split("://", 1)[-1].split("/", 1)[-1]
+
+
+def abc_pages(rng, category_url, category, articles):
+    cards = "".join(
+        f'<li class="FeaturedCollection_cardList__lnpB_"><div class="Card_card"><h3><a href="{escape(url_path(a["url"]))}">'
+        f'{escape(a["title"])}</a></h3></div></li>' for a in articles
+    )
+    pages = {category_url: page(rng, "abc", f"{category.title()} - ABC News",
+                                f'<h2>{escape(category.title())}</h2><ul class="FeaturedCollection_layout__kEyQk">{cards}</ul>')}
+    for a in articles:
+        in_short = ""
+        if a.get("summary"):
+            in_short = (f'<div class="Article_main___guM5"><h2>In short:</h2><p>{escape(a["summary"])}</p>'
+                        f"<h2>What's next?</h2><p>More to come.</p></div>")
+        body = "".join(f"<p>{escape(p)}</p>" for p in paragraphs(a.get("raw_text", "")))
+        pages[a["url"]] = page(rng, "abc", a["title"], f'<h1>{escape(a["title"])}</h1>{in_short}'
+                               f'<div class="ArticleRender_article__7i2EW">{body}</div>')
+    return pages
+
+
+def guardian_pages(rng, category_url, container_id, articles):
+    cards = "".join(
+        f'<li><div class="dcr-card"><a href="{escape(url_path(a["url"]))}" aria-label="{escape(a["title"])}"></a>'
+        f'<h3>{escape(a["title"])}</h3></div></li>' for a in articles
+    )
+    pages = {category_url: page(rng, "dcr", "Guardian", f'<section><div id="{container_id}"><ul>{cards}</ul></div></section>')}
+    for a in articles:
+        body = "".join(f'<p class="dcr-para">{escape(p)}</p>' for p in paragraphs(a.get("raw_text", "")))
+        pages[a["url"]] = page(rng, "dcr", a["title"], f'<h1>{escape(a["title"])}</h1><div data-gu-name="body">{body}</div>')
+    return pages
+
+
+def rebuild_from_corpus(data, seed=0):
+    """A snapshot whose pages parse back to the articles of data (the raw scrape)."""
+    from scraper_abc import CATEGORY_URLS as ABC_URLS
+    from scraper_guardian import CATEGORY_URLS as GUARDIAN_URLS, CONTAINER_IDS
+
+    rng = random.Random(seed)
+    pages = {}
+    for category, url in ABC_URLS.items():
+        pages.update(abc_pages(rng, url, category, data.get("ABC News", {}).get(category, [])))
+    for category, url in GUARDIAN_URLS.items():
+        pages.update(guardian_pages(rng, url, CONTAINER_IDS[category], data.get("The Guardian", {}).get(category, [])))
+    return {"recorded_at": datetime.now().isoformat(), "mode": "corpus", "articles": count_articles(data), "pages": pages}
+
+
+def count_articles(data):
+    return sum(len(data.get(source, {}).get(category, [])) for source in SNAPSHOT_SOURCES for category in data.get(source, {}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--live", action="store_true")
+    mode.add_argument("--from-corpus", action="store_true")
+    parser.add_argument("--output", default=SNAPSHOT_FILE)
+    args = parser.parse_args()
+
+    # Every page must really be fetched and parsed, not answered from the conditional-GET cache
+    os.environ["HTTP_CACHE_ENABLED"] = "0"
+    if args.live:
+        snapshot = record_live()
+    else:
+        from news_store import RAW, load_dataset
+        snapshot = rebuild_from_corpus(load_dataset(RAW, {}))
+    save_snapshot(snapshot, args.output)
+    size = sum(len(html.encode("utf-8")) for html in snapshot["pages"].values())
+    print(f"💾 {len(snapshot['pages'])} pages ({size / 1e6:.1f} MB, {snapshot['articles']} articles) "
+          f"saved to {args.output} ({os.path.getsize(args.output) / 1e3:.0f} kB)")
@@ -0,0 +1,117 @@
+# Closed-loop HTTP load generator: `concurrency` clients each send their next request as soon as the
+# last one returns, for `duration` seconds after a short untimed warm-up.
+#
+#   python benchmarks/loadgen.py --url http://localhost:8000 --scenario highlights --concurrency 16 --duration 10
+#
+# Latency percentiles cover 2xx responses only; shed requests (429/503) are fast and would flatter
+# them, so they are counted per status instead.
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+import httpx
+
+QUESTIONS = (
+    "What happened in sport today?", "Any news about interest rates?", "What is the latest on the election?",
+    "Which albums came out this week?", "What did the Reserve Bank announce?", "How did the AFL round go?",
+    "Is there anything about the housing market?", "What are the biggest business stories?",
+    "Any updates on the weather and floods?", "What's new in lifestyle and health?",
+)
+CATEGORIES = ("sport", "business", "music", "lifestyle")
+
+
+def scenario_requests(name, queries=QUESTIONS, seed=0):
+    """An endless stream of (method, path, params, json) for one scenario."""
+    rng = random.Random(seed)
+    while True:
+        if name == "highlights":
+            # Mostly the unfiltered front page, like the UI's first load
+            params = {} if rng.random() < 0.6 else {"category": rng.choice(CATEGORIES)}
+            yield "GET", "/api/highlights", params, None
+        elif name == "search":
+            yield "GET", "/api/search", {"q": rng.choice(queries), "top_k": 10}, None
+        elif name == "chat":
+            yield "POST", "/api/chat-query", None, {"query": rng.choice(queries), "top_k": 3}
+        else:
+            raise ValueError(f"Unknown scenario {name}")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)]
+
+
+def summarize(latencies, statuses, errors, seconds, concurrency):
+    ok = sorted(latency for latency, status in zip(latencies, statuses) if 200 <= status < 300)
+    by_status = {}
+    for status in statuses:
+        by_status[str(status)] = by_status.get(str(status), 0) + 1
+    ms = lambda value: None if value is None else round(value * 1000, 2)
+    return {
+        "concurrency": concurrency,
+        "seconds": round(seconds, 2),
+        "requests": len(statuses) + errors,
+        "qps": round(len(ok) / seconds, 2) if seconds else 0,
+        "p50_ms": ms(percentile(ok, 0.50)),
+        "p95_ms": ms(percentile(ok, 0.95)),
+        "p99_ms": ms(percentile(ok, 0.99)),
+        "max_ms": ms(ok[-1] if ok else None),
+        "mean_ms": ms(sum(ok) / len(ok) if ok else None),
+        "status": by_status,
+        "errors": errors,
+    }
+
+
+async def run_load(url, scenario, concurrency, duration, warmup=2.0, queries=QUESTIONS, timeout=120.0):
+    requests = scenario_requests(scenario, queries)
+    latencies, statuses = [], []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                method, path, params, body = next(requests)
+                sent = time.perf_counter()
+                try:
+                    response = await client.request(method, path, params=params, json=body)
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = None
+                if sent < measure_from:
+                    continue
+                if status is None:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - sent)
+                    statuses.append(status)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        seconds = time.perf_counter() - measure_from
+    return summarize(latencies, statuses, errors, seconds, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=["highlights", "search", "chat"], nargs="+", default=["highlights", "search"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    args = parser.parse_args()
+
+    results = []
+    for scenario in args.scenario:
+        for concurrency in args.concurrency:
+            result = asyncio.run(run_load(args.url, scenario, concurrency, args.duration, args.warmup))
+            results.append({"scenario": scenario, **result})
+            print(f"📈 {scenario} x{concurrency}: {result['qps']} req/s, p95 {result['p95_ms']} ms", file=sys.stderr)
+    print(json.dumps(results, indent=2))
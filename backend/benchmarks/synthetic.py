@@ -0,0 +1,83 @@
+# Synthetic scrapes for benchmarks: articles in the combined_data shape the pipeline reads, with words
+# drawn from a real corpus so text tokenises, embeds and compresses like real articles.
+#
+#   python benchmarks/synthetic.py --articles 2000 --duplicate-rate 0.3 > synthetic.json
+#
+# duplicate_rate is the share of articles that re-report an earlier story from another outlet (a
+# lightly reworded copy), which is what highlight clustering looks for.
+import os
+import sys
+import json
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from incremental import content_hash, iter_articles
+
+FALLBACK_WORDS = ("government minister announced police court market shares rates bank team coach season "
+                  "match injury album tour festival health hospital climate rain flood council city").split()
+SOURCES = ("ABC News", "The Guardian", "The New Daily")
+CATEGORIES = ("news", "sport", "business", "lifestyle", "music")
+
+
+def corpus_words(data):
+    """Every word of every article's raw_text in data, duplicates kept so sampling follows real frequencies."""
+    words = [word for _, _, article in iter_articles(data) for word in article.get("raw_text", "").split()]
+    return words or FALLBACK_WORDS
+
+
+def reword(rng, words, text, rate):
+    """text with about rate of its words swapped for corpus words."""
+    return " ".join(rng.choice(words) if rng.random() < rate else word for word in text.split())
+
+
+def synthetic_dataset(n, words=None, seed=0, duplicate_rate=0.0):
+    rng = random.Random(seed)
+    words = words or FALLBACK_WORDS
+    data = {source: {category: [] for category in CATEGORIES} for source in SOURCES}
+    published = []
+    for i in range(n):
+        if duplicate_rate and published and rng.random() < duplicate_rate:
+            # Another outlet's take on an earlier story: same category, reworded title and text
+            original = rng.choice(published)
+            source = rng.choice([s for s in SOURCES if s != original["source"]])
+            category = original["category"]
+            title = reword(rng, words, original["title"], 0.2)
+            raw_text = reword(rng, words, original["raw_text"], 0.1)
+            summary = reword(rng, words, original["summary"], 0.2)
+        else:
+            source, category = rng.choice(SOURCES), rng.choice(CATEGORIES)
+            title = " ".join(rng.choices(words, k=10))
+            raw_text = " ".join(rng.choices(words, k=rng.randint(300, 1400)))
+            summary = " ".join(rng.choices(words, k=45))
+        article = {
+            "title": title, "url": f"https://example.com/{i}", "source": source, "category": category,
+            "summary": summary, "raw_text": raw_text,
+            "scraped_at": "2026-10-18T00:00:00", "content_hash": content_hash(title, raw_text),
+        }
+        data[source][category].append(article)
+        if duplicate_rate:
+            published.append(article)
+    return data
+
+
+def without_summaries(data):
+    """A copy of data as the scraper leaves it, for benchmarking summarisation."""
+    return {source: {category: [{**article, "summary": ""} for article in articles]
+                     for category, articles in categories.items()}
+            for source, categories in data.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--words-from", help="JSON dataset whose raw_text supplies the vocabulary")
+    args = parser.parse_args()
+
+    words = None
+    if args.words_from:
+        with open(args.words_from, "r", encoding="utf-8") as f:
+            words = corpus_words(json.load(f))
+    print(json.dumps(synthetic_dataset(args.articles, words, args.seed, args.duplicate_rate), indent=2))
@@ -0,0 +1,86 @@
+# === bm25.py === (in-process BM25 inverted index over highlight titles and summaries)
+import re
+import math
+import heapq
+from collections import Counter, defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:['.&-][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "what who when where which why how does did do about after over into than then there their they".split()
+)
+
+
+def tokenize(text):
+    """Lower-cased word tokens; names and tickers like "o'brien", "asx", "bhp.ax" survive intact."""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def document_text(item):
+    return f"{item.get('title', '')} {item.get('summary', '')}"
+
+
+class BM25Index:
+    """Okapi BM25 over {doc id: text}; postings map each term to (doc id, term frequency) pairs.
+
+    Only postings of the query terms are touched, so a query costs O(matching postings), and an
+    optional allowed-id set restricts scoring before any score is computed.
+    """
+
+    def __init__(self, postings, doc_lengths, k1=1.2, b=0.75):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.avgdl = sum(doc_lengths.values()) / len(doc_lengths) if doc_lengths else 0.0
+        n = len(doc_lengths)
+        self.idf = {term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in postings.items()}
+
+    @classmethod
+    def build(cls, items, text=document_text, **kwargs):
+        """Index metadata items by their "id" (falling back to list position, like the FAISS ids)."""
+        postings = defaultdict(list)
+        doc_lengths = {}
+        for pos, item in enumerate(items):
+            doc_id = item.get("id", pos)
+            tokens = tokenize(text(item))
+            doc_lengths[doc_id] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                postings[term].append((doc_id, tf))
+        return cls(dict(postings), doc_lengths, **kwargs)
+
+    def to_dict(self):
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_lengths": [[doc_id, length] for doc_id, length in self.doc_lengths.items()],
+            "postings": {term: [list(posting) for posting in docs] for term, docs in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        postings = {term: [tuple(posting) for posting in docs] for term, docs in data["postings"].items()}
+        return cls(postings, {doc_id: length for doc_id, length in data["doc_lengths"]}, k1=data["k1"], b=data["b"])
+
+    def search(self, query, k, allowed=None):
+        """Top-k (doc id, score) pairs; allowed, when given, is the set of ids that may be returned."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avgdl or 1.0))
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse ranked id lists: score(id) = Σ 1 / (k + rank). Returns ids, best first."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])
@@ -5,24 +5,174 @@ ENV = os.getenv("ENV", "development")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SCRAPER_DIR = os.path.join(BASE_DIR, "scraper")
-NEWS_DATA_DIR = os.path.join(SCRAPER_DIR, "news_data")
+# Overridable so benchmarks (and tests of the pipeline) can run against a scratch directory
+NEWS_DATA_DIR = os.getenv("NEWS_DATA_DIR", os.path.join(SCRAPER_DIR, "news_data"))
 
-RAG_INDEX_DIR = os.path.join(SCRAPER_DIR, "rag_index")
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", os.path.join(SCRAPER_DIR, "rag_index"))
 
+HTTP_CACHE_DIR = os.path.join(NEWS_DATA_DIR, "http_cache")
+
+# Scraped, summarised and highlight datasets live in one SQLite database (WAL mode) as append-only
+# snapshots; the JSON files are what runs wrote before it and are read only while it has no snapshot
+NEWS_DB = os.path.join(NEWS_DATA_DIR, "news.db")
+NEWS_DB_SNAPSHOTS_KEEP = int(os.getenv("NEWS_DB_SNAPSHOTS_KEEP", 3))
+# zlib article bodies: ~40% smaller on disk, slower full-text loads (stages that skip raw_text don't pay)
+NEWS_DB_COMPRESS_TEXT = os.getenv("NEWS_DB_COMPRESS_TEXT", "1") == "1"
 RAW_JSON = os.path.join(NEWS_DATA_DIR, "combined_articles.json")
 SUMMARY_JSON = os.path.join(NEWS_DATA_DIR, "combined_articles_with_summary.json")
 HIGHLIGHTS_JSON = os.path.join(NEWS_DATA_DIR, "combined_articles_with_summary_highlights.json")
+EMBEDDING_STORE_DIR = os.path.join(NEWS_DATA_DIR, "embeddings")
+QUERY_EMBEDDING_STORE_DIR = os.path.join(NEWS_DATA_DIR, "query_embeddings")
 
 MODEL_NAME = os.getenv("MODEL_NAME", "t5-small")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
-GEN_MODEL_NAME = "declare-lab/flan-alpaca-base"
+GEN_MODEL_NAME = os.getenv("GEN_MODEL_NAME", "declare-lab/flan-alpaca-base")
+
+# Inference backend per model: torch (fp32) | int8 (dynamic quantisation) | onnx (ONNX Runtime,
+# falls back to torch when optimum/onnxruntime can't export the model)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", INFERENCE_BACKEND)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", INFERENCE_BACKEND)
+GEN_BACKEND = os.getenv("GEN_BACKEND", INFERENCE_BACKEND)
+ONNX_EXPORT_DIR = os.path.join(BASE_DIR, "onnx_models")
+# Vectors from different backends differ slightly, so stores and bundles are keyed by both
+EMBEDDING_MODEL_ID = EMBEDDING_MODEL if EMBEDDING_BACKEND == "torch" else f"{EMBEDDING_MODEL}@{EMBEDDING_BACKEND}"
 
-# FAISS
+# FAISS (legacy flat files; the pipeline now publishes versioned bundles)
 FAISS_INDEX_FILE = os.path.join(RAG_INDEX_DIR, "highlight_index.faiss")
 METADATA_FILE = os.path.join(RAG_INDEX_DIR, "metadata.json")
+INDEX_BUNDLES_DIR = os.path.join(RAG_INDEX_DIR, "bundles")
+CURRENT_BUNDLE_FILE = os.path.join(RAG_INDEX_DIR, "CURRENT")
+INDEX_BUNDLES_KEEP = int(os.getenv("INDEX_BUNDLES_KEEP", 3))
+INDEX_WATCH_INTERVAL = float(os.getenv("INDEX_WATCH_INTERVAL", 5))
+
+# Highlight index type: flat_l2 | flat_ip | ivf_flat | ivf_pq | hnsw | auto (by corpus size)
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "auto")
+FAISS_AUTO_FLAT_LIMIT = int(os.getenv("FAISS_AUTO_FLAT_LIMIT", 50000))
+FAISS_AUTO_PQ_LIMIT = int(os.getenv("FAISS_AUTO_PQ_LIMIT", 2000000))
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", 16))
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", 32))
+FAISS_HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", 64))
+FAISS_PQ_BITS = int(os.getenv("FAISS_PQ_BITS", 8))
+# An incrementally updated IVF index is retrained once the corpus outgrows its training set this much
+FAISS_RETRAIN_GROWTH = float(os.getenv("FAISS_RETRAIN_GROWTH", 2.0))
+
+# Chat retrieval: BM25 fused with FAISS by reciprocal rank fusion over RETRIEVAL_CANDIDATES per side
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "1") == "1"
+RRF_K = int(os.getenv("RRF_K", 60))
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", 20))
+
+# Full-text passage index: every article's raw_text in overlapping word windows, published as its
+# own bundle series; chat adds up to PASSAGE_TOP_K articles found through their passages
+PASSAGE_BUNDLES_DIR = os.path.join(RAG_INDEX_DIR, "passages")
+PASSAGE_CURRENT_FILE = os.path.join(RAG_INDEX_DIR, "PASSAGES_CURRENT")
+PASSAGE_EMBEDDING_STORE_DIR = os.path.join(NEWS_DATA_DIR, "passage_embeddings")
+PASSAGE_EMBEDDING_STORE_MAX_ENTRIES = int(os.getenv("PASSAGE_EMBEDDING_STORE_MAX_ENTRIES", 1000000))
+PASSAGE_WORDS = int(os.getenv("PASSAGE_WORDS", 120))
+PASSAGE_OVERLAP = int(os.getenv("PASSAGE_OVERLAP", 30))
+PASSAGE_EMBED_BATCH = int(os.getenv("PASSAGE_EMBED_BATCH", 256))
+PASSAGE_TOP_K = int(os.getenv("PASSAGE_TOP_K", 2))
+PASSAGES_PER_ARTICLE = int(os.getenv("PASSAGES_PER_ARTICLE", 2))
 
 # Thresholds
 COSINE_THRESHOLD = float(os.getenv("COSINE_THRESHOLD", 0.5))
 MAX_SUMMARY_WORDS = int(os.getenv("MAX_SUMMARY_WORDS", 60))
-MAX_CHARS = int(os.getenv("MAX_CHARS", 500))
 
+# Summarisation scheduler (inputs are truncated by tokens; batches are capped by padded tokens)
+SUMMARY_MAX_INPUT_TOKENS = int(os.getenv("SUMMARY_MAX_INPUT_TOKENS", 128))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", 4096))
+SUMMARY_MAX_BATCH = int(os.getenv("SUMMARY_MAX_BATCH", 32))
+
+# Multi-process CPU inference (1 = in-process; 0 threads per worker = share all cores evenly)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+INFERENCE_THREADS_PER_WORKER = int(os.getenv("INFERENCE_THREADS_PER_WORKER", 0))
+
+# Scraping
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 16))
+SCRAPE_PER_HOST_LIMIT = int(os.getenv("SCRAPE_PER_HOST_LIMIT", 8))
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", 15))
+SCRAPE_MAX_RETRIES = int(os.getenv("SCRAPE_MAX_RETRIES", 3))
+SCRAPE_BACKOFF = float(os.getenv("SCRAPE_BACKOFF", 0.5))
+# Longest Retry-After a server can make a fetch thread sleep; longer ones get the usual exponential backoff
+SCRAPE_MAX_BACKOFF = float(os.getenv("SCRAPE_MAX_BACKOFF", 60))
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+# Article page parser: selectolax | lxml | html.parser | auto (fastest installed); extractors return the
+# same text with each. PARSE_WORKERS > 1 parses pages in that many processes, off the fetch threads;
+# 1 parses on the fetch threads; 0 = one per core (up to 4) for the BeautifulSoup parsers, none for
+# selectolax, which parses a page faster than it can be sent to another process
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", 0))
+
+# Incremental runs
+INCREMENTAL = os.getenv("INCREMENTAL", "0") == "1"
+RETENTION_DAYS = float(os.getenv("RETENTION_DAYS", 3))
+TOMBSTONE_COMPACT_RATIO = float(os.getenv("TOMBSTONE_COMPACT_RATIO", 0.2))
+
+# Embedding store
+EMBEDDING_STORE_MAX_ENTRIES = int(os.getenv("EMBEDDING_STORE_MAX_ENTRIES", 200000))
+QUERY_EMBEDDING_STORE_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_STORE_MAX_ENTRIES", 20000))
+EMBEDDING_STORE_COMPACT_RATIO = float(os.getenv("EMBEDDING_STORE_COMPACT_RATIO", 0.25))
+
+# Highlight clustering (flat | ivf | hnsw | auto)
+CLUSTER_INDEX_TYPE = os.getenv("CLUSTER_INDEX_TYPE", "auto")
+CLUSTER_QUERY_BATCH = int(os.getenv("CLUSTER_QUERY_BATCH", 4096))
+CLUSTER_HNSW_M = int(os.getenv("CLUSTER_HNSW_M", 32))
+CLUSTER_NPROBE = int(os.getenv("CLUSTER_NPROBE", 16))
+
+# API start-up: bundles and models load on a background thread; /readyz turns 200 once they have,
+# after one warm-up inference per model (MODEL_WARMUP=0 skips it)
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+WARMUP_RETRY_AFTER = int(os.getenv("WARMUP_RETRY_AFTER", 5))
+
+# API inference executor: model calls run on INFERENCE_EXECUTOR_WORKERS threads that split the cores
+# (0 threads = cores / workers); once INFERENCE_QUEUE_SIZE requests are waiting, chat and search
+# requests get a 429 with Retry-After. Requests still queued after CHAT_DEADLINE (SEARCH_DEADLINE for
+# /api/search) seconds are dropped unrun
+INFERENCE_EXECUTOR_WORKERS = int(os.getenv("INFERENCE_EXECUTOR_WORKERS", 1))
+INFERENCE_EXECUTOR_THREADS = int(os.getenv("INFERENCE_EXECUTOR_THREADS", 0))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", 32))
+CHAT_DEADLINE = float(os.getenv("CHAT_DEADLINE", 30))
+SEARCH_DEADLINE = float(os.getenv("SEARCH_DEADLINE", 5))
+
+# Request caps: top_k and answer length are clamped server-side whatever the client asks for
+CHAT_MAX_TOP_K = int(os.getenv("CHAT_MAX_TOP_K", 10))
+SEARCH_MAX_TOP_K = int(os.getenv("SEARCH_MAX_TOP_K", 50))
+CHAT_MAX_NEW_TOKENS = int(os.getenv("CHAT_MAX_NEW_TOKENS", 200))
+# Generation also stops once an answer repeats an n-gram (2 <= n <= CHAT_REPEAT_NGRAM) CHAT_REPEAT_STOP times in a row
+CHAT_REPEAT_NGRAM = int(os.getenv("CHAT_REPEAT_NGRAM", 4))
+CHAT_REPEAT_STOP = int(os.getenv("CHAT_REPEAT_STOP", 4))
+# Chat context: sources are added in rank order until the prompt holds CONTEXT_TOKEN_BUDGET tokens
+# (0 = the generator's input limit); a source sharing CONTEXT_DEDUP_THRESHOLD of its words with an
+# earlier one is skipped
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 0))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", 0.8))
+
+# Chat micro-batching
+CHAT_BATCH_MAX_SIZE = int(os.getenv("CHAT_BATCH_MAX_SIZE", 8))
+CHAT_BATCH_WAIT_MS = float(os.getenv("CHAT_BATCH_WAIT_MS", 20))
+
+# Chat answer cache
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 1024))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 900))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.95))
+
+# In-process pipeline: "dag" runs whole stages, "stream" passes articles through bounded queues
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "dag")
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", 4))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 64))
+STREAM_BATCH_WAIT = float(os.getenv("STREAM_BATCH_WAIT", 1.0))
+
+# Telemetry: stage spans are timed into the Prometheus metrics served at /metrics; OTEL_TRACES=1 also
+# exports them as OpenTelemetry traces (the OTLP exporter reads the standard OTEL_EXPORTER_OTLP_* settings)
+OTEL_TRACES = os.getenv("OTEL_TRACES", "0") == "1"
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "news-highlights")
+# Pipeline runs write their metrics here for node_exporter's textfile collector (empty = off)
+PIPELINE_METRICS_FILE = os.getenv("PIPELINE_METRICS_FILE", "")
+# Per-request sampling profiler: with PROFILE_REQUESTS=1, a request sent with "X-Profile: 1" (or
+# X-Profile set to PROFILE_TOKEN when one is configured) is sampled every PROFILE_INTERVAL_MS and its
+# collapsed stacks are written to PROFILE_DIR for flamegraph.pl / speedscope
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "0") == "1"
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
@@ -0,0 +1,209 @@
+# === embedding_store.py === (content-addressed embedding cache shared by the pipeline and the API)
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+
+from config import EMBEDDING_STORE_MAX_ENTRIES, EMBEDDING_STORE_COMPACT_RATIO
+
+
+class EmbeddingStore:
+    """float32 vectors keyed by sha1(model name + text).
+
+    Vectors live in an append-only raw float32 file that is memory-mapped for reads; keys.json maps
+    each key to its row and names the vectors file it refers to. Evicted or invalidated rows become
+    dead space that is reclaimed by rewriting the file once it exceeds EMBEDDING_STORE_COMPACT_RATIO
+    of all rows.
+
+    keys.json is always replaced last. Appends only add rows past the ones it lists, and a rewrite
+    goes to a new, generation-numbered file that the old keys.json does not refer to, so a save
+    interrupted at any point leaves the previous keys.json and the rows it points at intact.
+    """
+
+    def __init__(self, directory, model_name, max_entries=EMBEDDING_STORE_MAX_ENTRIES):
+        self.directory = directory
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.keys_path = os.path.join(directory, "keys.json")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _vectors_file(self, generation):
+        # Generation 0 is the name stores used before files were numbered
+        return "vectors.f32" if generation == 0 else f"vectors-{generation}.f32"
+
+    def _load(self):
+        self.dim = None
+        self.rows = {}
+        self.last_used = {}
+        self.total_rows = 0
+        self.pending = {}
+        self.vectors = None
+        self.generation = 0
+        self.vectors_path = os.path.join(self.directory, self._vectors_file(0))
+        if not os.path.exists(self.keys_path):
+            return
+        with open(self.keys_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        # Even an invalidated store's file is never written over: the next save starts a new generation
+        self.generation = meta.get("generation", 0)
+        self.vectors_path = os.path.join(self.directory, meta.get("vectors", self._vectors_file(self.generation)))
+        if meta.get("model") != self.model_name:
+            print(f"♻️ Embedding store built with {meta.get('model')}, invalidating for {self.model_name}")
+            return
+        # Rows past total_rows are an append that never got into keys.json; the next save writes over them.
+        # Fewer bytes than keys.json lists means the file is not the one it was written against.
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        if size < meta["total_rows"] * (meta["dim"] or 0) * 4:
+            print(f"⚠️ {self.vectors_path} has {size} bytes for {meta['total_rows']} rows in keys.json, rebuilding the store")
+            return
+        self.dim = meta["dim"]
+        self.rows = meta["rows"]
+        self.last_used = meta["last_used"]
+        self.total_rows = meta["total_rows"]
+        if self.total_rows:
+            self.vectors = np.memmap(self.vectors_path, dtype="float32", mode="r", shape=(self.total_rows, self.dim))
+
+    def key(self, text):
+        return hashlib.sha1(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def __len__(self):
+        return len(self.rows) + len(self.pending)
+
+    def get(self, text):
+        key = self.key(text)
+        with self.lock:
+            if key in self.pending:
+                vector = self.pending[key]
+            elif key in self.rows:
+                vector = np.array(self.vectors[self.rows[key]])
+            else:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.last_used[key] = time.time()
+            return vector
+
+    def put(self, text, vector):
+        key = self.key(text)
+        vector = np.asarray(vector, dtype="float32")
+        with self.lock:
+            if self.dim is None:
+                self.dim = vector.shape[0]
+            if key not in self.rows:
+                self.pending[key] = vector
+            self.last_used[key] = time.time()
+
+    def save(self):
+        with self.lock:
+            self._evict()
+            dead_rows = self.total_rows - len(self.rows)
+            os.makedirs(self.directory, exist_ok=True)
+            # A fresh (or invalidated) store starts a new file too, rather than writing over one that an
+            # older keys.json may still describe
+            if dead_rows > EMBEDDING_STORE_COMPACT_RATIO * self.total_rows or (self.pending and not self.total_rows):
+                self._compact()
+            elif self.pending:
+                # Appended at total_rows, over anything an interrupted save left past it
+                with open(self.vectors_path, "r+b") as f:
+                    f.seek(self.total_rows * self.dim * 4)
+                    f.truncate()
+                    for key, vector in self.pending.items():
+                        f.write(vector.tobytes())
+                        self.rows[key] = self.total_rows
+                        self.total_rows += 1
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.pending = {}
+            self._write_keys()
+            self._remove_old_vectors()
+            if self.total_rows:
+                self.vectors = np.memmap(self.vectors_path, dtype="float32", mode="r", shape=(self.total_rows, self.dim))
+
+    def _evict(self):
+        overflow = len(self.rows) + len(self.pending) - self.max_entries
+        if overflow <= 0:
+            return
+        for key in sorted(self.last_used, key=self.last_used.get)[:overflow]:
+            self.rows.pop(key, None)
+            self.pending.pop(key, None)
+            self.last_used.pop(key, None)
+
+    def _compact(self):
+        """Write the live rows and pending vectors to the next generation's file; keys.json switches to it."""
+        generation = self.generation + 1
+        path = os.path.join(self.directory, self._vectors_file(generation))
+        rows = {}
+        with open(path, "wb") as f:
+            for key, row in self.rows.items():
+                f.write(np.asarray(self.vectors[row]).tobytes())
+                rows[key] = len(rows)
+            for key, vector in self.pending.items():
+                f.write(vector.tobytes())
+                rows[key] = len(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        self.vectors = None
+        self.generation = generation
+        self.vectors_path = path
+        self.rows = rows
+        self.total_rows = len(rows)
+        self.pending = {}
+        self.last_used = {key: self.last_used[key] for key in rows}
+
+    def _write_keys(self):
+        meta = {
+            "model": self.model_name,
+            "generation": self.generation,
+            "vectors": os.path.basename(self.vectors_path),
+            "dim": self.dim,
+            "total_rows": self.total_rows,
+            "rows": self.rows,
+            "last_used": {key: self.last_used[key] for key in self.rows},
+        }
+        tmp_path = self.keys_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.keys_path)
+
+    def _remove_old_vectors(self):
+        """Delete vectors files keys.json no longer refers to: older generations, or one a crashed rewrite left."""
+        current = os.path.basename(self.vectors_path)
+        for name in os.listdir(self.directory):
+            if name.startswith("vectors") and name.endswith(".f32") and name != current:
+                os.remove(os.path.join(self.directory, name))
+
+
+def encode_with_store(store, texts, get_model, batch_size=16, show_progress_bar=False):
+    """Return float32 embeddings for texts, encoding only store misses.
+
+    get_model is called lazily, so a fully cached run never loads the embedding model.
+    """
+    vectors = [store.get(text) for text in texts]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        encoded = get_model().encode([texts[i] for i in missing], batch_size=batch_size, show_progress_bar=show_progress_bar)
+        for i, vector in zip(missing, encoded):
+            vector = np.asarray(vector, dtype="float32")
+            store.put(texts[i], vector)
+            vectors[i] = vector
+    if not vectors:
+        return np.zeros((0, store.dim or 0), dtype="float32")
+    return np.vstack(vectors).astype("float32")
+
+
+_shared_stores = {}
+_shared_lock = threading.Lock()
+
+
+def shared_store(directory, model_name, **kwargs):
+    """One EmbeddingStore per (directory, model) per process, so concurrent stages never race on its files."""
+    with _shared_lock:
+        key = (directory, model_name)
+        if key not in _shared_stores:
+            _shared_stores[key] = EmbeddingStore(directory, model_name, **kwargs)
+        return _shared_stores[key]
@@ -0,0 +1,49 @@
+# === incremental.py === (helpers for INCREMENTAL=1 runs, shared by the pipeline stages)
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+
+
+def content_hash(*parts):
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def article_hash(article):
+    if article.get("content_hash"):
+        return article["content_hash"]
+    return content_hash(article.get("title", "").strip(), article.get("raw_text", "").strip())
+
+
+def stable_id(url):
+    """Positive 60-bit FAISS id derived from the URL, so it survives re-runs."""
+    return int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:15], 16)
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_articles(data):
+    for source, categories in data.items():
+        for category, articles in categories.items():
+            for article in articles:
+                yield source, category, article
+
+
+def merge_scrapes(previous, current, retention_days):
+    """Overlay a fresh scrape on the previous one, keeping older articles inside the retention window."""
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+    current_urls = {article["url"] for _, _, article in iter_articles(current)}
+
+    merged = {source: {category: list(articles) for category, articles in categories.items()}
+              for source, categories in current.items()}
+    for source, category, article in iter_articles(previous):
+        if article["url"] in current_urls or article.get("scraped_at", "") < cutoff:
+            continue
+        merged.setdefault(source, {}).setdefault(category, []).append(article)
+        current_urls.add(article["url"])
+    return merged
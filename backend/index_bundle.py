@@ -0,0 +1,111 @@
+# === index_bundle.py === (versioned FAISS index + metadata bundles, published atomically)
+import os
+import json
+import shutil
+import uuid
+from datetime import datetime
+import faiss
+
+from metadata_store import open_metadata
+from config import INDEX_BUNDLES_DIR, CURRENT_BUNDLE_FILE, INDEX_BUNDLES_KEEP, FAISS_INDEX_FILE, METADATA_FILE
+
+INDEX_FILENAME = "highlight_index.faiss"
+METADATA_FILENAME = "metadata.db"
+# Bundles published before metadata.db hold the same items as a JSON list
+LEGACY_METADATA_FILENAME = "metadata.json"
+MANIFEST_FILENAME = "manifest.json"
+BM25_FILENAME = "bm25.json"
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def current_version(current_file=CURRENT_BUNDLE_FILE):
+    try:
+        with open(current_file, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def bundle_dir(version, bundles_dir=INDEX_BUNDLES_DIR):
+    return os.path.join(bundles_dir, version)
+
+
+def publish_bundle(write_files, manifest, bundles_dir=INDEX_BUNDLES_DIR, current_file=CURRENT_BUNDLE_FILE):
+    """Write a new bundle into a temp dir, rename it into place, then flip CURRENT to it.
+
+    write_files(directory) writes the index and metadata files; readers only ever see complete bundles.
+    The highlight index is published by default; other indexes pass their own directory and pointer file.
+    """
+    version = datetime.now().strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    os.makedirs(bundles_dir, exist_ok=True)
+    tmp_dir = os.path.join(bundles_dir, f".tmp-{version}")
+    os.makedirs(tmp_dir)
+
+    write_files(tmp_dir)
+    manifest = {"version": version, "created_at": datetime.now().isoformat(), **manifest}
+    with open(os.path.join(tmp_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    os.rename(tmp_dir, bundle_dir(version, bundles_dir))
+    _write_atomic(current_file, version)
+    prune_bundles(bundles_dir, current_file)
+    return version
+
+
+def prune_bundles(bundles_dir=INDEX_BUNDLES_DIR, current_file=CURRENT_BUNDLE_FILE):
+    """Keep the newest INDEX_BUNDLES_KEEP bundles (at least one) so an API still serving an older one can finish."""
+    versions = sorted(name for name in os.listdir(bundles_dir) if not name.startswith("."))
+    current = current_version(current_file)
+    for version in versions[:max(len(versions) - max(INDEX_BUNDLES_KEEP, 1), 0)]:
+        if version != current:
+            shutil.rmtree(bundle_dir(version, bundles_dir), ignore_errors=True)
+
+
+def legacy_version():
+    """Version of the pre-bundle flat index files, from their mtimes; None when they don't exist."""
+    try:
+        return f"legacy-{os.stat(FAISS_INDEX_FILE).st_mtime_ns}-{os.stat(METADATA_FILE).st_mtime_ns}"
+    except OSError:
+        return None
+
+
+def bundle_paths(version=None):
+    """(index path, metadata path, manifest path) of a bundle, falling back to the legacy flat files."""
+    version = version or current_version()
+    if version is None:
+        return FAISS_INDEX_FILE, METADATA_FILE, None
+    directory = bundle_dir(version)
+    metadata_path = os.path.join(directory, METADATA_FILENAME)
+    if not os.path.exists(metadata_path):
+        metadata_path = os.path.join(directory, LEGACY_METADATA_FILENAME)
+    return (
+        os.path.join(directory, INDEX_FILENAME),
+        metadata_path,
+        os.path.join(directory, MANIFEST_FILENAME),
+    )
+
+
+def load_bundle(version=None):
+    version = version or current_version()
+    index_path, metadata_path, manifest_path = bundle_paths(version)
+    index = faiss.read_index(index_path)
+    # metadata.db is queried lazily by id; legacy JSON metadata is loaded whole
+    metadata = open_metadata(metadata_path)
+    manifest = {}
+    bm25 = None
+    if manifest_path:
+        bm25_path = os.path.join(os.path.dirname(manifest_path), BM25_FILENAME)
+        if os.path.exists(bm25_path):
+            with open(bm25_path, "r", encoding="utf-8") as f:
+                bm25 = json.load(f)
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    else:
+        version = legacy_version()
+    return {"version": version, "index": index, "metadata": metadata, "manifest": manifest, "bm25": bm25}
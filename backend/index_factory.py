@@ -0,0 +1,122 @@
+# === index_factory.py === (FAISS index types for the highlight index, shared by the pipeline, API and benchmarks)
+import math
+import faiss
+import numpy as np
+
+from config import FAISS_INDEX_TYPE, FAISS_NPROBE, FAISS_HNSW_M, FAISS_HNSW_EF_SEARCH, FAISS_PQ_BITS, FAISS_AUTO_FLAT_LIMIT, FAISS_AUTO_PQ_LIMIT
+
+INDEX_TYPES = ("flat_l2", "flat_ip", "ivf_flat", "ivf_pq", "hnsw")
+# FAISS warns below ~39 training points per IVF centroid
+MIN_POINTS_PER_CENTROID = 39
+# Below this many vectors IVF training is meaningless and exact search is cheap anyway
+MIN_TRAIN_POINTS = 256
+
+
+def choose_index_type(n, requested=FAISS_INDEX_TYPE):
+    """Exact search while it is cheap, HNSW for mid-sized corpora, IVF-PQ once memory matters."""
+    if requested != "auto":
+        if requested not in INDEX_TYPES:
+            raise ValueError(f"Unknown FAISS index type {requested!r}, expected auto or one of {INDEX_TYPES}")
+        if requested.startswith("ivf") and n < MIN_TRAIN_POINTS:
+            print(f"⚠️ {n} vectors are too few to train {requested}, using flat_ip")
+            return "flat_ip"
+        return requested
+    if n <= FAISS_AUTO_FLAT_LIMIT:
+        return "flat_ip"
+    if n <= FAISS_AUTO_PQ_LIMIT:
+        return "hnsw"
+    return "ivf_pq"
+
+
+def metric(index_type):
+    """Every type except the legacy flat_l2 searches normalised vectors by inner product (= cosine)."""
+    return "l2" if index_type == "flat_l2" else "ip"
+
+
+def prepare_vectors(vectors, index_type):
+    vectors = np.ascontiguousarray(vectors, dtype="float32").copy()
+    if metric(index_type) == "ip" and len(vectors):
+        faiss.normalize_L2(vectors)
+    return vectors
+
+
+def ivf_nlist(n):
+    return max(1, min(int(4 * math.sqrt(n)), n // MIN_POINTS_PER_CENTROID))
+
+
+def pq_subquantizers(dim):
+    """Largest sub-quantiser count ≤ dim / 8 that divides dim (384 → 48, i.e. 8 dims per code)."""
+    m = max(1, dim // 8)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def supports_removal(index_type):
+    return index_type != "hnsw"
+
+
+def create_index(index_type, dim, train_vectors):
+    """An empty IndexIDMap2 of the requested type, trained on train_vectors (already prepared).
+
+    Returns (index, params); params go into the bundle manifest.
+    """
+    n = len(train_vectors)
+    params = {}
+    if index_type == "flat_l2":
+        inner = faiss.IndexFlatL2(dim)
+    elif index_type == "flat_ip":
+        inner = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        inner = faiss.IndexHNSWFlat(dim, FAISS_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        inner.hnsw.efConstruction = max(40, 2 * FAISS_HNSW_M)
+        params = {"hnsw_m": FAISS_HNSW_M, "ef_construction": inner.hnsw.efConstruction}
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        nlist = ivf_nlist(n)
+        quantizer = faiss.IndexFlatIP(dim)
+        if index_type == "ivf_flat":
+            inner = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            params = {"nlist": nlist}
+        else:
+            m = pq_subquantizers(dim)
+            # PQ codebooks need 2^bits training points each; small corpora get fewer bits
+            bits = max(4, min(FAISS_PQ_BITS, int(math.log2(max(n // MIN_POINTS_PER_CENTROID, 16)))))
+            inner = faiss.IndexIVFPQ(quantizer, dim, nlist, m, bits, faiss.METRIC_INNER_PRODUCT)
+            params = {"nlist": nlist, "pq_m": m, "pq_bits": bits}
+        inner.train(train_vectors)
+    else:
+        raise ValueError(f"Unknown FAISS index type {index_type!r}")
+    index = faiss.IndexIDMap2(inner)
+    configure_search(index)
+    return index, params
+
+
+def configure_search(index, nprobe=FAISS_NPROBE, ef_search=FAISS_HNSW_EF_SEARCH):
+    """Apply query-time knobs; they are not reliably persisted with the index, so loaders call this too."""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(inner, faiss.IndexIVF):
+        inner.nprobe = min(nprobe, inner.nlist)
+    elif isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = ef_search
+    return index
+
+
+def search_params(index, allowed_ids, selectivity):
+    """SearchParameters restricting results to allowed_ids, keeping the index's own nprobe/efSearch.
+
+    Selective filters leave few matches in the probed lists or graph neighbourhood, so IVF probes
+    every list and HNSW widens its beam in proportion to how few vectors pass.
+    """
+    selector = faiss.IDSelectorBatch(np.asarray(sorted(allowed_ids), dtype="int64"))
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(inner, faiss.IndexIVF):
+        nprobe = inner.nlist if selectivity < 0.1 else inner.nprobe
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    elif isinstance(inner, faiss.IndexHNSW):
+        ef_search = min(1024, int(inner.hnsw.efSearch / max(selectivity, 1e-3)))
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=max(ef_search, inner.hnsw.efSearch))
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    # The selector must outlive the search call; SWIG does not keep it alive through params
+    params.selector_ref = selector
+    return params
@@ -0,0 +1,76 @@
+# === inference_backend.py === (torch fp32, dynamic int8 or ONNX Runtime models, with fallback to torch)
+import os
+import re
+
+from config import ONNX_EXPORT_DIR
+
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantisation of every Linear layer; weights are int8, activations stay float."""
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def onnx_dir(name):
+    return os.path.join(ONNX_EXPORT_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "--", name))
+
+
+def _check(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}, expected one of {BACKENDS}")
+
+
+def load_seq2seq(name, backend):
+    """(tokenizer, model, backend actually used) for a seq2seq model.
+
+    ONNX exports are cached under ONNX_EXPORT_DIR so only the first load pays for the export.
+    """
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    _check(backend)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            export_dir = onnx_dir(name)
+            if os.path.isdir(export_dir):
+                return tokenizer, ORTModelForSeq2SeqLM.from_pretrained(export_dir), "onnx"
+            model = ORTModelForSeq2SeqLM.from_pretrained(name, export=True)
+            model.save_pretrained(export_dir)
+            return tokenizer, model, "onnx"
+        except Exception as e:
+            print(f"⚠️ ONNX Runtime unavailable for {name} ({type(e).__name__}: {e}), falling back to torch")
+            backend = "torch"
+    model = AutoModelForSeq2SeqLM.from_pretrained(name)
+    if backend == "int8":
+        model = quantize_int8(model)
+    return tokenizer, model, backend
+
+
+def load_sentence_transformer(name, backend):
+    """(SentenceTransformer, backend actually used); ONNX goes through sentence-transformers' own ORT backend."""
+    from sentence_transformers import SentenceTransformer
+    _check(backend)
+    if backend == "onnx":
+        try:
+            return SentenceTransformer(name, backend="onnx"), "onnx"
+        except Exception as e:
+            print(f"⚠️ ONNX Runtime unavailable for {name} ({type(e).__name__}: {e}), falling back to torch")
+            backend = "torch"
+    model = SentenceTransformer(name)
+    if backend == "int8":
+        model = quantize_int8(model)
+    return model, backend
+
+
+def load_summarizer(name, backend):
+    from transformers import pipeline
+    tokenizer, model, backend = load_seq2seq(name, backend)
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=-1), backend
+
+
+def load_generator(name, backend):
+    from transformers import pipeline
+    tokenizer, model, backend = load_seq2seq(name, backend)
+    return pipeline("text2text-generation", model=model, tokenizer=tokenizer), backend
@@ -0,0 +1,133 @@
+# === metadata_store.py === (highlight metadata of an index bundle, looked up by FAISS id)
+import json
+import sqlite3
+import threading
+
+COLUMNS = ("id", "position", "title", "summary", "url", "category", "sources", "frequency", "content_hash")
+JSON_COLUMNS = {"sources"}
+
+SCHEMA = """
+CREATE TABLE metadata (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT, summary TEXT, url TEXT, category TEXT, sources TEXT, frequency INTEGER, content_hash TEXT
+);
+CREATE INDEX metadata_position ON metadata (position);
+CREATE INDEX metadata_category ON metadata (category COLLATE NOCASE);
+"""
+
+
+def write_metadata(path, items):
+    """Write bundle metadata once; the file is never modified after the bundle is published."""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        f"INSERT INTO metadata VALUES ({', '.join('?' * len(COLUMNS))})",
+        [(item["id"], position, *(json.dumps(item[c]) if c in JSON_COLUMNS else item.get(c) for c in COLUMNS[2:]))
+         for position, item in enumerate(items)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _decode(columns, row):
+    return {c: json.loads(v) if c in JSON_COLUMNS and v is not None else v for c, v in zip(columns, row) if c != "position"}
+
+
+class MetadataStore:
+    """Read-only view of a bundle's metadata.db.
+
+    Rows are fetched by FAISS id or page by page, so the API never holds the whole list; only the
+    columns a caller asks for are decoded. The file is opened immutable: bundles never change after
+    publishing, so SQLite skips locking entirely.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{path}?immutable=1", uri=True, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.count = self._query("SELECT count(*) FROM metadata")[0][0]
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def __len__(self):
+        return self.count
+
+    def get(self, ids, columns=COLUMNS):
+        """Items for ids in the given order; ids without metadata are skipped."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        columns = ("id",) + tuple(c for c in columns if c != "id")
+        rows = self._query(f"SELECT {', '.join(columns)} FROM metadata WHERE id IN ({', '.join('?' * len(ids))})", ids)
+        by_id = {row[0]: _decode(columns, row) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def project(self, *columns):
+        """(column, ...) tuples for every item in publish order, e.g. project("id", "category")."""
+        rows = self._query(f"SELECT {', '.join(columns)} FROM metadata ORDER BY position")
+        return [tuple(json.loads(v) if c in JSON_COLUMNS and v is not None else v for c, v in zip(columns, row)) for row in rows]
+
+    def page(self, category=None, source=None, offset=0, limit=None):
+        """(total, items) of the filtered items in publish order, for /api/highlights."""
+        where, params = [], []
+        if category:
+            where.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        if source:
+            # sources is a JSON list of outlet names
+            where.append("EXISTS (SELECT 1 FROM json_each(metadata.sources) WHERE lower(json_each.value) = lower(?))")
+            params.append(source)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        total = self._query(f"SELECT count(*) FROM metadata{clause}", params)[0][0]
+        rows = self._query(
+            f"SELECT {', '.join(COLUMNS)} FROM metadata{clause} ORDER BY position LIMIT ? OFFSET ?",
+            params + [-1 if limit is None else limit, offset],
+        )
+        return total, [_decode(COLUMNS, row) for row in rows]
+
+    def __iter__(self):
+        return iter(self.page()[1])
+
+
+class JsonMetadata:
+    """The same interface over an in-memory list, for bundles published before metadata.db."""
+
+    def __init__(self, items):
+        self.items = items
+        # FAISS ids map to metadata "id"; older positional indexes fall back to list position
+        self.by_id = {item.get("id", pos): item for pos, item in enumerate(items)}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, ids, columns=None):
+        items = [self.by_id[int(i)] for i in ids if int(i) in self.by_id]
+        if columns is None:
+            return items
+        return [{c: item[c] for c in columns if c in item} for item in items]
+
+    def project(self, *columns):
+        return [tuple(item.get(c, pos) if c == "id" else item.get(c) for c in columns) for pos, item in enumerate(self.items)]
+
+    def page(self, category=None, source=None, offset=0, limit=None):
+        items = self.items
+        if category:
+            items = [item for item in items if item.get("category", "").lower() == category.lower()]
+        if source:
+            items = [item for item in items if source.lower() in (s.lower() for s in item.get("sources", []))]
+        return len(items), items[offset:offset + limit] if limit is not None else items[offset:]
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def open_metadata(path):
+    return MetadataStore(path) if path.endswith(".db") else JsonMetadata.load(path)
@@ -0,0 +1,39 @@
+# === model_registry.py === (models are loaded lazily, once per process, and shared by every stage)
+import time
+import threading
+
+from config import MODEL_NAME, EMBEDDING_MODEL, GEN_MODEL_NAME, SUMMARY_BACKEND, EMBEDDING_BACKEND, GEN_BACKEND
+from inference_backend import load_summarizer, load_sentence_transformer, load_generator
+
+_models = {}
+_locks = {}
+_registry_lock = threading.Lock()
+load_times = {}
+backends = {}
+
+
+def _get(name, loader):
+    if name in _models:
+        return _models[name]
+    with _registry_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+    # Per-model lock: two stages asking for the same model wait for one load, different models load in parallel
+    with lock:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name], backends[name] = loader()
+            load_times[name] = time.perf_counter() - start
+            print(f"🧠 Loaded {name} ({backends[name]}) in {load_times[name]:.2f}s")
+    return _models[name]
+
+
+def get_summarizer():
+    return _get(f"summarizer:{MODEL_NAME}", lambda: load_summarizer(MODEL_NAME, SUMMARY_BACKEND))
+
+
+def get_embedder():
+    return _get(f"embedder:{EMBEDDING_MODEL}", lambda: load_sentence_transformer(EMBEDDING_MODEL, EMBEDDING_BACKEND))
+
+
+def get_generator():
+    return _get(f"generator:{GEN_MODEL_NAME}", lambda: load_generator(GEN_MODEL_NAME, GEN_BACKEND))
@@ -0,0 +1,219 @@
+# === news_store.py === (pipeline datasets in one SQLite database instead of pretty-printed JSON files)
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+from datetime import datetime
+
+from config import NEWS_DB, NEWS_DB_SNAPSHOTS_KEEP, NEWS_DB_COMPRESS_TEXT, RAW_JSON, SUMMARY_JSON, HIGHLIGHTS_JSON
+from incremental import article_hash
+
+RAW = "raw"
+SUMMARY = "summary"
+HIGHLIGHTS = "highlights"
+# Runs from before the store wrote these files; they are read once when the store has no snapshot yet
+LEGACY_FILES = {RAW: RAW_JSON, SUMMARY: SUMMARY_JSON, HIGHLIGHTS: HIGHLIGHTS_JSON}
+
+# Columns per table; JSON-encoded ones are lists, fields outside these go into "extra"
+ARTICLE_COLUMNS = ("url", "title", "source", "category", "summary", "scraped_at", "content_hash")
+HIGHLIGHT_COLUMNS = ("url", "title", "summary", "category", "sources", "frequency")
+JSON_COLUMNS = {"sources"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    run INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    layout TEXT
+);
+CREATE TABLE IF NOT EXISTS texts (
+    hash TEXT PRIMARY KEY,
+    raw_text NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    run INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    group_source TEXT NOT NULL,
+    group_category TEXT NOT NULL,
+    url TEXT, title TEXT, source TEXT, category TEXT, summary TEXT, scraped_at TEXT, content_hash TEXT,
+    text_hash TEXT,
+    extra TEXT,
+    PRIMARY KEY (run, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS highlights (
+    run INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT, title TEXT, summary TEXT, category TEXT, sources TEXT, frequency INTEGER,
+    extra TEXT,
+    PRIMARY KEY (run, position)
+) WITHOUT ROWID;
+"""
+
+
+def connect(path=NEWS_DB):
+    """A WAL connection: readers keep reading the last committed snapshot while a run writes the next."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# Article bodies are most of the bytes and only stages that need them read them; compressed ones are
+# stored as zlib BLOBs and plain ones as TEXT, so either setting reads databases written with the other
+def compress_text(text):
+    return zlib.compress(text.encode("utf-8"), 1) if NEWS_DB_COMPRESS_TEXT else text
+
+
+def decompress_text(value):
+    return zlib.decompress(value).decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _encode(item, columns):
+    values = [json.dumps(item[c]) if c in JSON_COLUMNS and c in item else item.get(c) for c in columns]
+    extra = {key: value for key, value in item.items() if key not in columns and key != "raw_text"}
+    return values, json.dumps(extra, separators=(",", ":")) if extra else None
+
+
+def _decode(row, columns):
+    item = {}
+    for column, value in zip(columns, row):
+        if column == "extra":
+            if value:
+                item.update(json.loads(value))
+        elif value is not None:
+            item[column] = json.loads(value) if column in JSON_COLUMNS else value
+    return item
+
+
+def save_dataset(dataset, data, path=NEWS_DB):
+    """Append data as a new snapshot of dataset and prune snapshots beyond NEWS_DB_SNAPSHOTS_KEEP.
+
+    Article text is stored once per distinct raw_text, so the raw and summary snapshots of a run,
+    and unchanged articles across runs, share it.
+    """
+    with connect(path) as conn:
+        # Sources and categories in order, so empty ones survive the round trip
+        layout = None if dataset == HIGHLIGHTS else json.dumps({source: list(categories) for source, categories in data.items()})
+        run = conn.execute("INSERT INTO snapshots (dataset, created_at, layout) VALUES (?, ?, ?)",
+                           (dataset, datetime.now().isoformat(), layout)).lastrowid
+        if dataset == HIGHLIGHTS:
+            rows = []
+            for position, item in enumerate(data):
+                values, extra = _encode(item, HIGHLIGHT_COLUMNS)
+                rows.append((run, position, *values, extra))
+            conn.executemany(f"INSERT INTO highlights VALUES ({', '.join('?' * (len(HIGHLIGHT_COLUMNS) + 3))})", rows)
+        else:
+            rows, texts = [], {}
+            position = 0
+            for group_source, categories in data.items():
+                for group_category, articles in categories.items():
+                    for article in articles:
+                        # Stored even when the scrape predates it, so lookups by hash never need raw_text
+                        values, extra = _encode({**article, "content_hash": article_hash(article)}, ARTICLE_COLUMNS)
+                        digest = None
+                        if "raw_text" in article:
+                            digest = text_hash(article["raw_text"])
+                            if digest not in texts:
+                                texts[digest] = compress_text(article["raw_text"])
+                        rows.append((run, position, group_source, group_category, *values, digest, extra))
+                        position += 1
+            conn.executemany("INSERT OR IGNORE INTO texts VALUES (?, ?)", texts.items())
+            conn.executemany(f"INSERT INTO articles VALUES ({', '.join('?' * (len(ARTICLE_COLUMNS) + 6))})", rows)
+        _prune(conn, dataset)
+    conn.close()
+    return run
+
+
+def _prune(conn, dataset):
+    stale = [run for (run,) in conn.execute(
+        "SELECT run FROM snapshots WHERE dataset = ? ORDER BY run DESC LIMIT -1 OFFSET ?", (dataset, NEWS_DB_SNAPSHOTS_KEEP))]
+    if not stale:
+        return
+    marks = ", ".join("?" * len(stale))
+    table = "highlights" if dataset == HIGHLIGHTS else "articles"
+    conn.execute(f"DELETE FROM {table} WHERE run IN ({marks})", stale)
+    conn.execute(f"DELETE FROM snapshots WHERE run IN ({marks})", stale)
+    if table == "articles":
+        conn.execute("DELETE FROM texts WHERE hash NOT IN (SELECT text_hash FROM articles WHERE text_hash IS NOT NULL)")
+
+
+def latest_run(conn, dataset):
+    """(run, layout) of the newest snapshot of dataset, or (None, None)."""
+    row = conn.execute("SELECT run, layout FROM snapshots WHERE dataset = ? ORDER BY run DESC LIMIT 1", (dataset,)).fetchone()
+    return row or (None, None)
+
+
+def load_dataset(dataset, default=None, fields=None, path=NEWS_DB):
+    """Latest snapshot of dataset in the shape its JSON file had, or default when there is none.
+
+    fields projects articles/highlights to just those keys; raw_text is only read when asked for.
+    """
+    if not os.path.exists(path):
+        return _load_legacy(dataset, default, fields)
+    conn = connect(path)
+    try:
+        run, layout = latest_run(conn, dataset)
+        if run is None:
+            return _load_legacy(dataset, default, fields)
+        if dataset == HIGHLIGHTS:
+            columns = [c for c in HIGHLIGHT_COLUMNS if fields is None or c in fields] + ["extra"]
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM highlights WHERE run = ? ORDER BY position", (run,))
+            return [_project(_decode(row, columns), fields) for row in rows]
+
+        columns = [c for c in ARTICLE_COLUMNS if fields is None or c in fields] + ["extra"]
+        with_text = fields is None or "raw_text" in fields
+        select = ", ".join(f"a.{c}" for c in columns) + (", t.raw_text" if with_text else "")
+        join = " LEFT JOIN texts t ON t.hash = a.text_hash" if with_text else ""
+        data = {source: {category: [] for category in categories} for source, categories in json.loads(layout).items()}
+        for row in conn.execute(
+            f"SELECT a.group_source, a.group_category, {select} FROM articles a{join} WHERE a.run = ? ORDER BY a.position", (run,)
+        ):
+            article = _decode(row[2:2 + len(columns)], columns)
+            if with_text and row[-1] is not None:
+                article["raw_text"] = decompress_text(row[-1])
+            data.setdefault(row[0], {}).setdefault(row[1], []).append(_project(article, fields))
+        return data
+    finally:
+        conn.close()
+
+
+def _project(item, fields):
+    return item if fields is None else {key: value for key, value in item.items() if key in fields}
+
+
+def _load_legacy(dataset, default, fields):
+    path = LEGACY_FILES[dataset]
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if fields is None:
+        return data
+    if dataset == HIGHLIGHTS:
+        return [_project(item, fields) for item in data]
+    # As in the database, content_hash is available without raw_text
+    return {source: {category: [_project({**a, "content_hash": article_hash(a)}, fields) for a in articles]
+                     for category, articles in categories.items()}
+            for source, categories in data.items()}
+
+
+def export_json(dataset, path):
+    """Pretty-printed JSON of the latest snapshot, for inspecting a run by hand."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(load_dataset(dataset, default=[] if dataset == HIGHLIGHTS else {}), f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3 or sys.argv[1] not in LEGACY_FILES:
+        print(f"Usage: python news_store.py {{{'|'.join(LEGACY_FILES)}}} OUTPUT.json")
+        sys.exit(1)
+    export_json(sys.argv[1], sys.argv[2])
+    print(f"💾 Exported {sys.argv[1]} to {sys.argv[2]}")
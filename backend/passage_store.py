@@ -0,0 +1,142 @@
+# === passage_store.py === (full-text passages: chunking and a compact on-disk store, shared by the pipeline, API and benchmarks)
+import os
+import re
+import json
+import mmap
+import faiss
+import numpy as np
+
+from config import PASSAGE_WORDS, PASSAGE_OVERLAP, PASSAGE_BUNDLES_DIR
+
+PASSAGE_INDEX_FILENAME = "passage_index.faiss"
+ARTICLES_FILENAME = "articles.json"
+TEXTS_FILENAME = "texts.bin"
+PASSAGES_FILENAME = "passages.npy"
+MANIFEST_FILENAME = "manifest.json"
+
+# One row per passage: the article it belongs to and its byte span in texts.bin (20 bytes per passage)
+PASSAGE_DTYPE = np.dtype([("article", "<i4"), ("start", "<i8"), ("end", "<i8")])
+WORD_RE = re.compile(rb"\S+")
+
+
+def chunk_spans(text_bytes, words=PASSAGE_WORDS, overlap=PASSAGE_OVERLAP):
+    """(start, end) byte spans of overlapping windows of `words` words, stepping words - overlap.
+
+    Spans start and end on word boundaries, so every slice of the UTF-8 text decodes cleanly.
+    """
+    bounds = [(match.start(), match.end()) for match in WORD_RE.finditer(text_bytes)]
+    if not bounds:
+        return []
+    step = max(1, words - overlap)
+    spans = []
+    for first in range(0, len(bounds), step):
+        last = min(first + words, len(bounds)) - 1
+        spans.append((bounds[first][0], bounds[last][1]))
+        if last == len(bounds) - 1:
+            break
+    return spans
+
+
+def chunk_articles(articles, words=PASSAGE_WORDS, overlap=PASSAGE_OVERLAP):
+    """Split each article's raw_text into passages.
+
+    Returns (records, texts, passages): per-article metadata without the text, every raw_text
+    concatenated as UTF-8 bytes, and a PASSAGE_DTYPE array of spans into those bytes.
+    """
+    records = []
+    chunks = []
+    spans = []
+    offset = 0
+    for article in articles:
+        text_bytes = article["raw_text"].encode("utf-8")
+        article_spans = chunk_spans(text_bytes, words, overlap)
+        if not article_spans:
+            continue
+        row = len(records)
+        records.append({
+            "url": article["url"],
+            "title": article.get("title", ""),
+            "source": article.get("source", ""),
+            "category": article.get("category", ""),
+            "scraped_at": article.get("scraped_at", ""),
+        })
+        spans.extend((row, offset + start, offset + end) for start, end in article_spans)
+        chunks.append(text_bytes)
+        offset += len(text_bytes)
+    return records, b"".join(chunks), np.array(spans, dtype=PASSAGE_DTYPE)
+
+
+def write_passage_store(directory, records, texts, passages):
+    with open(os.path.join(directory, ARTICLES_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(records, f, separators=(",", ":"))
+    with open(os.path.join(directory, TEXTS_FILENAME), "wb") as f:
+        f.write(texts)
+    np.save(os.path.join(directory, PASSAGES_FILENAME), passages)
+
+
+class PassageStore:
+    """Read side of a passage bundle: article records in memory, spans and text memory-mapped.
+
+    Only the passages that are actually returned get read from disk, so opening a store of
+    100k passages costs about as much as loading its article list.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, ARTICLES_FILENAME), "r", encoding="utf-8") as f:
+            self.articles = json.load(f)
+        self.passages = np.load(os.path.join(directory, PASSAGES_FILENAME), mmap_mode="r")
+        self.texts = None
+        texts_path = os.path.join(directory, TEXTS_FILENAME)
+        if os.path.getsize(texts_path):
+            with open(texts_path, "rb") as f:
+                self.texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.passages)
+
+    def text(self, passage_id):
+        row = self.passages[passage_id]
+        return self.texts[int(row["start"]):int(row["end"])].decode("utf-8")
+
+    def article_id(self, passage_id):
+        return int(self.passages[passage_id]["article"])
+
+    def group_by_article(self, passage_ids, scores, k, per_article):
+        """Merge ranked passages into at most k articles, best article first.
+
+        An article ranks by its best passage and carries up to per_article of its matching
+        passages in document order.
+        """
+        grouped = {}
+        for passage_id, score in zip(passage_ids, scores):
+            article_id = self.article_id(passage_id)
+            if article_id not in grouped:
+                if len(grouped) == k:
+                    continue
+                grouped[article_id] = {"score": float(score), "passage_ids": []}
+            if len(grouped[article_id]["passage_ids"]) < per_article:
+                grouped[article_id]["passage_ids"].append(int(passage_id))
+        return [
+            {
+                **self.articles[article_id],
+                # Same shape as highlight sources, which list every outlet that covered the story
+                "sources": [self.articles[article_id]["source"]],
+                "score": round(match["score"], 4),
+                "passages": [self.text(passage_id) for passage_id in sorted(match["passage_ids"])],
+            }
+            for article_id, match in grouped.items()
+        ]
+
+
+def embedding_text(record, passage):
+    """Passages are embedded with their article title, which often names what the body only implies."""
+    return f"{record['title']}. {passage}"
+
+
+def read_passage_index(version, bundles_dir=PASSAGE_BUNDLES_DIR):
+    """(faiss index, PassageStore, manifest) of a published passage bundle."""
+    directory = os.path.join(bundles_dir, version)
+    with open(os.path.join(directory, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    index = faiss.read_index(os.path.join(directory, PASSAGE_INDEX_FILENAME))
+    return index, PassageStore(directory), manifest
@@ -1,21 +1,19 @@
 # run_pipeline.py
-import subprocess
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+from config import PIPELINE_MODE
+from pipeline_runner import run_pipeline
+from stream_pipeline import run_streaming_pipeline
 
-steps = [
-    ("Scraping news", "python3 scraper/scraper_manager.py"),
-    ("Generating summaries", "python3 scraper/create_summary.py"),
-    ("Creating highlights", "python3 scraper/create_highlights.py"),
-    ("Building FAISS index", "python3 scraper/create_faiss_index.py"),
-]
-
-for desc, cmd in steps:
-    logging.info(f"Running: {desc}")
+# Every stage runs in this process: models load once and stage outputs stay in memory.
+# The __main__ guard matters: inference worker processes are spawned and re-import this file.
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
     try:
-        subprocess.run(cmd, shell=True, check=True)
-        logging.info(f"✅ {desc} complete")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"❌ Failed at step: {desc} | Error: {e}")
-        break
\ No newline at end of file
+        if PIPELINE_MODE == "stream":
+            run_streaming_pipeline()
+        else:
+            run_pipeline()
+        logging.info("✅ Pipeline complete")
+    except Exception as e:
+        logging.error(f"❌ Pipeline failed | Error: {e}")
@@ -0,0 +1,186 @@
+# === pipeline_runner.py === (runs scrape → summarise → highlights → index in one process as a DAG)
+import os
+import sys
+import copy
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+from config import NEWS_DB, INCREMENTAL, RETENTION_DAYS, PIPELINE_MAX_WORKERS, PIPELINE_METRICS_FILE
+from incremental import merge_scrapes
+from news_store import RAW, SUMMARY, HIGHLIGHTS, load_dataset, save_dataset
+from model_registry import get_summarizer, get_embedder, load_times
+from worker_pool import get_pool
+from scraper_manager import SOURCES, scrape_source
+from create_summary import SUMMARY_LOOKUP_FIELDS, reuse_summaries, summarize_articles
+from create_highlights import collect_articles, embed_articles, build_highlights
+from create_faiss_index import build_index
+from create_passage_index import build_passage_index
+import http_cache
+import telemetry
+
+logger = logging.getLogger("pipeline")
+
+STAGE_DURATION = telemetry.gauge("news_pipeline_stage_seconds", "Duration of each DAG stage in the last pipeline run.", ["stage"])
+RUN_DURATION = telemetry.gauge("news_pipeline_last_run_seconds", "Duration of the last pipeline run.", ["mode"])
+RUN_SUCCESS = telemetry.gauge("news_pipeline_last_run_success", "1 if the last pipeline run completed.", ["mode"])
+RUN_TIMESTAMP = telemetry.gauge("news_pipeline_last_run_timestamp_seconds", "When the last pipeline run finished.", ["mode"])
+
+
+def run_dag(stages, max_workers=PIPELINE_MAX_WORKERS):
+    """Run {name: (dependencies, fn)} as soon as each stage's dependencies are done.
+
+    fn receives the dict of finished results. Returns (results, timings); the first failing
+    stage stops scheduling and its exception is re-raised once running stages have finished.
+    """
+    pending = dict(stages)
+    running = {}
+    results = {}
+    timings = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        logger.info(f"▶️ {name}")
+        result = fn(results)
+        timings[name] = (start, time.perf_counter() - start)
+        STAGE_DURATION.set(round(timings[name][1], 3), stage=name)
+        logger.info(f"✅ {name} complete in {timings[name][1]:.2f}s")
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name, (dependencies, fn) in list(pending.items()):
+                if all(dependency in results for dependency in dependencies):
+                    del pending[name]
+                    running[executor.submit(timed, name, fn)] = name
+            if not running:
+                raise RuntimeError(f"Stages with unmet dependencies: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    logger.exception(f"❌ Failed at stage: {name}")
+                    pending.clear()
+                    wait(running)
+                    raise
+    return results, timings
+
+
+def warm_models(_):
+    # Loads overlap with scraping; stages that need a model later block on the same registry entry
+    pool = get_pool()
+    if pool is not None:
+        logger.info(f"🧵 {pool.warm()} inference workers ready")
+        return
+    for loader in (get_summarizer, get_embedder):
+        try:
+            loader()
+        except Exception as e:
+            logger.warning(f"⚠️ Model warm-up failed, stages will retry on first use: {e}")
+
+
+def load_previous(_):
+    if not INCREMENTAL:
+        return {"raw": {}, "summary": {}}
+    return {"raw": load_dataset(RAW, {}), "summary": load_dataset(SUMMARY, {}, fields=SUMMARY_LOOKUP_FIELDS)}
+
+
+def scrape_stage(source):
+    def run(results):
+        categories = scrape_source(source)
+        if INCREMENTAL:
+            # Keep recent articles from earlier runs instead of overwriting them
+            previous = {source: results["previous"]["raw"].get(source, {})}
+            categories = merge_scrapes(previous, {source: categories}, RETENTION_DAYS).get(source, {})
+        return categories
+    return run
+
+
+def summarise_stage(source):
+    def run(results):
+        # Summaries go on a copy so the raw scrape is persisted as it was fetched
+        data = {source: copy.deepcopy(results[f"scrape:{source}"])}
+        reused_count = reuse_summaries(data, results["previous"]["summary"]) if INCREMENTAL else 0
+        updated_count = summarize_articles(data)
+        print(f"✅ {source}: {updated_count} summaries added, {reused_count} reused")
+        return data[source]
+    return run
+
+
+def embed_stage(source):
+    def run(results):
+        # Fills the shared embedding store so the highlights stage only reads cached vectors
+        articles = collect_articles({source: results[f"summarise:{source}"]})
+        embed_articles(articles)
+        return len(articles)
+    return run
+
+
+def combined(results, stage):
+    return {source: results.get(f"{stage}:{source}", {}) for source in SOURCES}
+
+
+def save_outputs(raw, summary, highlights):
+    for dataset, data in ((RAW, raw), (SUMMARY, summary), (HIGHLIGHTS, highlights)):
+        run = save_dataset(dataset, data)
+        print(f"💾 Saved {dataset} snapshot {run} to {NEWS_DB}")
+
+
+def persist(results):
+    save_outputs(combined(results, "scrape"), combined(results, "summarise"), results["highlights"])
+
+
+def pipeline_stages():
+    stages = {
+        "previous": ([], load_previous),
+        "warm_models": ([], warm_models),
+    }
+    for source in SOURCES:
+        stages[f"scrape:{source}"] = (["previous"], scrape_stage(source))
+        stages[f"summarise:{source}"] = ([f"scrape:{source}"], summarise_stage(source))
+        stages[f"embed:{source}"] = ([f"summarise:{source}"], embed_stage(source))
+
+    stages["highlights"] = ([f"embed:{source}" for source in SOURCES],
+                            lambda results: build_highlights(combined(results, "summarise")))
+    stages["index"] = (["highlights"], lambda results: build_index(results["highlights"]))
+    # Full-text passages run off the critical path, alongside the highlight index and persisting
+    stages["passages"] = (["highlights"], lambda results: build_passage_index(combined(results, "scrape")))
+    stages["persist"] = (["highlights"], persist)
+    return stages
+
+
+def log_timings(timings, total):
+    logger.info("⏱️ Stage timings (start offset / duration):")
+    first_start = min(start for start, _ in timings.values()) if timings else 0
+    for name, (start, elapsed) in sorted(timings.items(), key=lambda item: item[1][0]):
+        logger.info(f"   {name:<28} +{start - first_start:7.2f}s  {elapsed:7.2f}s")
+    for name, elapsed in load_times.items():
+        logger.info(f"   🧠 {name} loaded in {elapsed:.2f}s")
+    logger.info(f"⏱️ Total pipeline time: {total:.2f}s")
+
+
+def export_metrics(mode, start, success):
+    """Record how the run went and, if PIPELINE_METRICS_FILE is set, write every metric of this process there."""
+    RUN_DURATION.set(round(time.perf_counter() - start, 3), mode=mode)
+    RUN_SUCCESS.set(int(success), mode=mode)
+    RUN_TIMESTAMP.set(round(time.time(), 3), mode=mode)
+    if PIPELINE_METRICS_FILE:
+        telemetry.write_textfile(PIPELINE_METRICS_FILE)
+        logger.info(f"📈 Metrics written to {PIPELINE_METRICS_FILE}")
+
+
+def run_pipeline():
+    start = time.perf_counter()
+    success = False
+    try:
+        results, timings = run_dag(pipeline_stages())
+        success = True
+    finally:
+        export_metrics("dag", start, success)
+    http_cache.report()
+    log_timings(timings, time.perf_counter() - start)
+    return results
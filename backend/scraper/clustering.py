@@ -0,0 +1,96 @@
+import os
+import numpy as np
+import faiss
+
+# Config import
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import CLUSTER_INDEX_TYPE, CLUSTER_QUERY_BATCH, CLUSTER_HNSW_M, CLUSTER_NPROBE
+
+# Below this size an exact flat scan is both fast and exact; above it "auto" switches to IVF
+AUTO_FLAT_LIMIT = 20000
+
+
+def normalize(embeddings):
+    x = np.array(embeddings, dtype="float32", copy=True)
+    faiss.normalize_L2(x)
+    return x
+
+
+def greedy_clusters(embeddings, sources, threshold):
+    """Reference algorithm: dense n×n cosine matrix and a pure-Python double loop (O(n²) time and memory)."""
+    x = normalize(embeddings)
+    sim_matrix = x @ x.T
+
+    visited = set()
+    clusters = []
+    for i in range(len(x)):
+        if i in visited:
+            continue
+        cluster = [i]
+        visited.add(i)
+        for j in range(i + 1, len(x)):
+            if j not in visited and sim_matrix[i][j] > threshold:
+                if sources[i] != sources[j]:
+                    cluster.append(j)
+                    visited.add(j)
+        if len(cluster) > 1:
+            clusters.append(cluster)
+    return clusters
+
+
+def build_neighbour_index(x, index_type):
+    n, dim = x.shape
+    if index_type == "auto":
+        index_type = "flat" if n <= AUTO_FLAT_LIMIT else "ivf"
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, CLUSTER_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    elif index_type == "ivf":
+        nlist = max(1, min(int(4 * np.sqrt(n)), n // 39))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dim), dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(x)
+        index.nprobe = min(CLUSTER_NPROBE, nlist)
+    else:
+        raise ValueError(f"Unknown CLUSTER_INDEX_TYPE: {index_type}")
+
+    index.add(x)
+    return index
+
+
+def range_neighbours(x, threshold, index_type):
+    """For every row i, the rows j > i whose cosine similarity exceeds threshold, in ascending order."""
+    index = build_neighbour_index(x, index_type)
+    neighbours = []
+    for start in range(0, len(x), CLUSTER_QUERY_BATCH):
+        lims, _, labels = index.range_search(x[start:start + CLUSTER_QUERY_BATCH], threshold)
+        for offset in range(len(lims) - 1):
+            i = start + offset
+            found = labels[lims[offset]:lims[offset + 1]]
+            neighbours.append(np.sort(found[found > i]))
+    return neighbours
+
+
+def ann_clusters(embeddings, sources, threshold, index_type=CLUSTER_INDEX_TYPE):
+    """Same greedy cross-source clustering as greedy_clusters, applied to range-search neighbours only."""
+    if len(embeddings) == 0:
+        return []
+    x = normalize(embeddings)
+    neighbours = range_neighbours(x, threshold, index_type)
+
+    visited = np.zeros(len(x), dtype=bool)
+    clusters = []
+    for i in range(len(x)):
+        if visited[i]:
+            continue
+        cluster = [i]
+        visited[i] = True
+        for j in neighbours[i]:
+            if not visited[j] and sources[i] != sources[j]:
+                cluster.append(int(j))
+                visited[j] = True
+        if len(cluster) > 1:
+            clusters.append(cluster)
+    return clusters
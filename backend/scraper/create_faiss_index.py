@@ -1,52 +1,170 @@
 import os
 import json
+import logging
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 # Config import
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import HIGHLIGHTS_JSON, FAISS_INDEX_FILE, METADATA_FILE, EMBEDDING_MODEL, RAG_INDEX_DIR
-
-# Load model
-model = SentenceTransformer(EMBEDDING_MODEL)
-
-# Load highlights
-with open(HIGHLIGHTS_JSON, "r", encoding="utf-8") as f:
-    highlights = json.load(f)
-
-print("-------------------------highlights", len(highlights))
-
-# Prepare texts and metadata
-texts = []
-metadatas = []
-
-for h in highlights:
-    content = f"{h['title']} {h['summary']}"
-    texts.append(content)
-    metadatas.append({
-        "title": h["title"],
-        "summary": h["summary"],
-        "url": h["url"],
-        "category": h["category"],
-        "sources": h["sources"],
-        "frequency": h["frequency"]
+from config import EMBEDDING_MODEL_ID, EMBEDDING_STORE_DIR, INCREMENTAL, TOMBSTONE_COMPACT_RATIO, FAISS_RETRAIN_GROWTH
+from incremental import content_hash, stable_id, load_json
+from news_store import HIGHLIGHTS, load_dataset
+from metadata_store import open_metadata, write_metadata
+from embedding_store import shared_store, encode_with_store
+from worker_pool import get_encoder
+from index_bundle import bundle_paths, publish_bundle, INDEX_FILENAME, METADATA_FILENAME, BM25_FILENAME
+from index_factory import choose_index_type, create_index, metric, prepare_vectors, supports_removal
+from bm25 import BM25Index
+from telemetry import span
+
+logger = logging.getLogger("pipeline")
+
+
+def prepare_metadata(highlights):
+    """Texts and metadata keyed by a stable per-URL FAISS id."""
+    texts = {}
+    metadatas = {}
+
+    for h in highlights:
+        content = f"{h['title']} {h['summary']}"
+        faiss_id = stable_id(h["url"])
+        texts[faiss_id] = content
+        metadatas[faiss_id] = {
+            "id": faiss_id,
+            "title": h["title"],
+            "summary": h["summary"],
+            "url": h["url"],
+            "category": h["category"],
+            "sources": h["sources"],
+            "frequency": h["frequency"],
+            "content_hash": content_hash(content)
+        }
+    return texts, metadatas
+
+
+def load_previous_index():
+    """The currently published ID-mapped index, {id: content hash} of its metadata and its manifest.
+
+    Returns (None, {}, {}) when there is nothing to update.
+    """
+    previous_index_file, previous_metadata_file, previous_manifest_file = bundle_paths()
+    if not os.path.exists(previous_index_file):
+        return None, {}, {}
+    existing = faiss.read_index(previous_index_file)
+    if not isinstance(existing, faiss.IndexIDMap2):
+        print("⚠️ Existing index has no id map, rebuilding from scratch")
+        return None, {}, {}
+    manifest = load_json(previous_manifest_file, {}) if previous_manifest_file else {}
+    # Only ids and content hashes are needed to diff against the new highlights
+    previous = dict(open_metadata(previous_metadata_file).project("id", "content_hash"))
+    return existing, previous, manifest
+
+
+def can_update(manifest, index_type, n):
+    """Whether the previous index can be patched in place instead of rebuilt."""
+    # Bundles from before index types were recorded are flat L2 over the same model
+    if manifest.get("index_type", "flat_l2") != index_type or not supports_removal(index_type):
+        return False
+    if manifest.get("embedding_model", EMBEDDING_MODEL_ID) != EMBEDDING_MODEL_ID:
+        return False
+    # IVF centroids trained on a much smaller corpus leave lists unbalanced; retrain instead
+    return not index_type.startswith("ivf") or n <= manifest.get("trained_on", 0) * FAISS_RETRAIN_GROWTH
+
+
+@span("index.build")
+def build_index(highlights):
+    """Update (INCREMENTAL=1) or rebuild the FAISS index for highlights and publish it as a bundle."""
+    # Highlight texts were already embedded by create_highlights, so the store normally answers
+    # every lookup and the embedding model is never loaded here
+    store = shared_store(EMBEDDING_STORE_DIR, EMBEDDING_MODEL_ID)
+    texts, metadatas = prepare_metadata(highlights)
+    index_type = choose_index_type(len(metadatas))
+
+    def embed(faiss_ids):
+        embeddings = encode_with_store(store, [texts[faiss_id] for faiss_id in faiss_ids], get_encoder, batch_size=16, show_progress_bar=True)
+        return prepare_vectors(embeddings, index_type)
+
+    # Reuse the currently published ID-mapped index in incremental mode
+    index, previous, manifest = load_previous_index() if INCREMENTAL else (None, {}, {})
+    if index is not None and not can_update(manifest, index_type, len(metadatas)):
+        previous_type = manifest.get("index_type", "flat_l2")
+        print(f"♻️ Rebuilding {previous_type} index as {index_type}" if previous_type != index_type
+              else f"♻️ Retraining {index_type} index on {len(metadatas)} highlights")
+        index, previous = None, {}
+
+    misses_before = store.misses
+    tombstones = set()
+    if index is None:
+        # Fresh build: every vector is needed up front to train IVF centroids / PQ codebooks
+        to_add = list(metadatas)
+        vectors = embed(to_add)
+        dim = vectors.shape[1] if len(vectors) else store.dim or get_encoder().get_sentence_embedding_dimension()
+        index, params = create_index(index_type, dim, vectors)
+        trained_on = len(vectors)
+        if to_add:
+            index.add_with_ids(vectors, np.array(to_add, dtype="int64"))
+    else:
+        params, trained_on = manifest.get("params", {}), manifest.get("trained_on", 0)
+        to_add = [
+            faiss_id for faiss_id, meta in metadatas.items()
+            if previous.get(faiss_id) != meta["content_hash"]
+        ]
+
+        # Vectors of dropped highlights stay in the index as tombstones (the API ignores ids missing from
+        # metadata) until they make up TOMBSTONE_COMPACT_RATIO of the index, then they are removed in one pass.
+        stored_ids = set(faiss.vector_to_array(index.id_map).tolist())
+        tombstones = stored_ids - set(metadatas)
+        to_remove = stored_ids & set(to_add)
+        if index.ntotal and len(tombstones) > TOMBSTONE_COMPACT_RATIO * index.ntotal:
+            to_remove |= tombstones
+            tombstones = set()
+
+        if to_remove:
+            index.remove_ids(np.array(sorted(to_remove), dtype="int64"))
+
+        # Add embeddings for new or changed highlights only
+        if to_add:
+            index.add_with_ids(embed(to_add), np.array(to_add, dtype="int64"))
+
+    if to_add:
+        store.save()
+
+    print(f"✅ {index_type} index: {len(to_add)} highlights added ({store.misses - misses_before} newly embedded), "
+          f"{len(metadatas) - len(to_add)} unchanged, {len(tombstones)} tombstoned")
+
+    # Keyword index for hybrid retrieval; rebuilt in full, it is cheap next to embedding
+    bm25 = BM25Index.build(list(metadatas.values()))
+
+    # Publish index, metadata and BM25 postings as a new bundle; the API picks it up without a restart
+    def write_bundle(directory):
+        faiss.write_index(index, os.path.join(directory, INDEX_FILENAME))
+        write_metadata(os.path.join(directory, METADATA_FILENAME), list(metadatas.values()))
+        with open(os.path.join(directory, BM25_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(bm25.to_dict(), f, separators=(",", ":"))
+
+    version = publish_bundle(write_bundle, {
+        "embedding_model": EMBEDDING_MODEL_ID,
+        "index_type": index_type,
+        "metric": metric(index_type),
+        "params": params,
+        "trained_on": trained_on,
+        "ntotal": int(index.ntotal),
+        "highlights": len(metadatas),
+        "bm25_terms": len(bm25.postings),
     })
 
-# Generate embeddings
-embeddings = model.encode(texts, batch_size=16, show_progress_bar=True)
-embeddings = np.array(embeddings).astype("float32")
+    print(f"✅ FAISS index and metadata published as bundle {version}")
+    return version
+
 
-# Build FAISS index
-index = faiss.IndexFlatL2(embeddings.shape[1])
-index.add(embeddings)
+def main():
+    # Load highlights
+    highlights = load_dataset(HIGHLIGHTS, default=[])
 
-# Save index and metadata
-os.makedirs(RAG_INDEX_DIR, exist_ok=True)
-faiss.write_index(index, FAISS_INDEX_FILE)
+    logger.debug("Building the index from %d highlights", len(highlights))
+    build_index(highlights)
 
-with open(METADATA_FILE, "w", encoding="utf-8") as f:
-    json.dump(metadatas, f, indent=2)
 
-print(f"✅ FAISS index and metadata saved to {RAG_INDEX_DIR}")
+if __name__ == "__main__":
+    main()
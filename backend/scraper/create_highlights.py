@@ -1,66 +1,20 @@
 import os
-import json
 import re
+import logging
 import numpy as np
 from collections import Counter
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
 # Config import
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import SUMMARY_JSON, HIGHLIGHTS_JSON, COSINE_THRESHOLD, EMBEDDING_MODEL
-
-# Load model
-model = SentenceTransformer(EMBEDDING_MODEL)
-
-# Load articles
-with open(SUMMARY_JSON, "r", encoding="utf-8") as f:
-    combined_data = json.load(f)
-
-# Collect all articles
-all_articles = []
-for source, categories in combined_data.items():
-    for category, articles in categories.items():
-        for article in articles:
-            title = article.get("title", "").strip()
-            summary = article.get("summary", "").strip()
-            raw_text = article.get("raw_text", "").strip()
-            if not title:
-                continue
-            all_articles.append({
-                "source": source,
-                "category": category,
-                "title": title,
-                "summary": summary,
-                "url": article["url"],
-            })
-
-print(f"✅ Total articles loaded: {len(all_articles)}")
-
-# Generate embeddings
-texts = [a["title"] + " " + a["summary"] for a in all_articles]
-embeddings = model.encode(texts, batch_size=16, show_progress_bar=True)
-
-# Compute similarity
-sim_matrix = cosine_similarity(embeddings)
+from config import NEWS_DB, COSINE_THRESHOLD, EMBEDDING_MODEL_ID, EMBEDDING_STORE_DIR
+from embedding_store import shared_store, encode_with_store
+from worker_pool import get_encoder
+from clustering import ann_clusters
+from news_store import SUMMARY, HIGHLIGHTS, load_dataset, save_dataset
+from telemetry import span
 
-# Cluster similar articles
-visited = set()
-clusters = []
-
-for i in range(len(all_articles)):
-    if i in visited:
-        continue
-    cluster = [i]
-    visited.add(i)
-    for j in range(i + 1, len(all_articles)):
-        if j not in visited and sim_matrix[i][j] > COSINE_THRESHOLD:
-            if all_articles[i]["source"] != all_articles[j]["source"]:
-                cluster.append(j)
-                visited.add(j)
-    if len(cluster) > 1:
-        clusters.append(cluster)
+logger = logging.getLogger("pipeline")
 
 # === Priority Keyword Highlights ===
 priority_keywords = [
@@ -72,41 +26,100 @@ def is_priority_article(article):
     title = article.get("title", "").lower()
     for kw in priority_keywords:
         if re.search(rf"\\b{re.escape(kw)}\\b", title):
-            print(f"✅ Matched keyword: '{kw}' in title: '{title}'")
+            logger.debug("Priority keyword %r in title %r", kw, title)
             return True
     return False
 
-# Add cluster-based highlights
-highlight_data = []
-for cluster in clusters:
-    sources = [all_articles[i]["source"] for i in cluster]
-    main_idx = cluster[0]
-    highlight_data.append({
-        "title": all_articles[main_idx]["title"],
-        "summary": all_articles[main_idx]["summary"],
-        "category": all_articles[main_idx]["category"],
-        "url": all_articles[main_idx]["url"],
-        "sources": list(set(sources)),
-        "frequency": len(cluster)
-    })
-
-# Add keyword-priority highlights
-used_urls = {item["url"] for item in highlight_data}
-for article in all_articles:
-    if article["url"] not in used_urls and is_priority_article(article):
-        print("--------------", article["title"])
+def article_record(source, category, article):
+    """The fields highlights need from one article, or None when it has no title."""
+    title = article.get("title", "").strip()
+    if not title:
+        return None
+    return {
+        "source": source,
+        "category": category,
+        "title": title,
+        "summary": article.get("summary", "").strip(),
+        "url": article["url"],
+    }
+
+def collect_articles(combined_data):
+    all_articles = []
+    for source, categories in combined_data.items():
+        for category, articles in categories.items():
+            for article in articles:
+                record = article_record(source, category, article)
+                if record:
+                    all_articles.append(record)
+    return all_articles
+
+def embedding_text(article):
+    return article["title"] + " " + article["summary"]
+
+@span("highlights.encode")
+def embed_articles(all_articles, show_progress_bar=False, save=True):
+    """Embed title + summary through the shared store; the model is only loaded on a miss."""
+    store = shared_store(EMBEDDING_STORE_DIR, EMBEDDING_MODEL_ID)
+    embeddings = encode_with_store(store, [embedding_text(a) for a in all_articles], get_encoder,
+                                   batch_size=16, show_progress_bar=show_progress_bar)
+    if save:
+        store.save()
+    return embeddings
+
+@span("highlights.build")
+def build_highlights(combined_data):
+    all_articles = collect_articles(combined_data)
+    print(f"✅ Total articles loaded: {len(all_articles)}")
+
+    # Generate embeddings, reusing stored vectors for text that was embedded before
+    embeddings = embed_articles(all_articles, show_progress_bar=True)
+
+    # Cluster similar articles from different sources via a FAISS range search over normalised vectors
+    with span("highlights.cluster", articles=len(all_articles)):
+        clusters = ann_clusters(embeddings, [a["source"] for a in all_articles], COSINE_THRESHOLD)
+
+    # Add cluster-based highlights
+    highlight_data = []
+    for cluster in clusters:
+        sources = [all_articles[i]["source"] for i in cluster]
+        main_idx = cluster[0]
         highlight_data.append({
-            "title": article["title"],
-            "summary": article["summary"],
-            "category": article["category"],
-            "url": article["url"],
-            "sources": [article["source"]],
-            "frequency": 1,
-            "priority_keyword": True
+            "title": all_articles[main_idx]["title"],
+            "summary": all_articles[main_idx]["summary"],
+            "category": all_articles[main_idx]["category"],
+            "url": all_articles[main_idx]["url"],
+            "sources": list(set(sources)),
+            "frequency": len(cluster)
         })
 
-# Save highlights
-with open(HIGHLIGHTS_JSON, "w", encoding="utf-8") as f:
-    json.dump(highlight_data, f, indent=2)
+    # Add keyword-priority highlights
+    used_urls = {item["url"] for item in highlight_data}
+    clustered = len(highlight_data)
+    for article in all_articles:
+        if article["url"] not in used_urls and is_priority_article(article):
+            highlight_data.append({
+                "title": article["title"],
+                "summary": article["summary"],
+                "category": article["category"],
+                "url": article["url"],
+                "sources": [article["source"]],
+                "frequency": 1,
+                "priority_keyword": True
+            })
+    print(f"✅ {clustered} cluster highlights, {len(highlight_data) - clustered} keyword-priority highlights")
+
+    return highlight_data
+
+def main():
+    # Load articles
+    combined_data = load_dataset(SUMMARY, {})
+
+    highlight_data = build_highlights(combined_data)
+
+    # Save highlights
+    save_dataset(HIGHLIGHTS, highlight_data)
+
+    print(f"📌 Highlights saved to {NEWS_DB} ({len(highlight_data)} items)")
 
-print(f"📌 Highlights saved to {HIGHLIGHTS_JSON} ({len(highlight_data)} items)")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import time
+import faiss
+import numpy as np
+
+# Config import
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import EMBEDDING_MODEL_ID, PASSAGE_EMBEDDING_STORE_DIR, PASSAGE_EMBEDDING_STORE_MAX_ENTRIES
+from config import PASSAGE_BUNDLES_DIR, PASSAGE_CURRENT_FILE, PASSAGE_WORDS, PASSAGE_OVERLAP, PASSAGE_EMBED_BATCH
+from incremental import iter_articles
+from news_store import RAW, load_dataset
+from embedding_store import shared_store, encode_with_store
+from worker_pool import get_encoder
+from index_bundle import publish_bundle
+from index_factory import choose_index_type, create_index, metric, prepare_vectors
+from passage_store import chunk_articles, write_passage_store, embedding_text, PASSAGE_INDEX_FILENAME
+from telemetry import span
+
+
+def collect_full_text(combined_data):
+    """Every scraped article with body text, once per URL."""
+    seen = set()
+    articles = []
+    for source, category, article in iter_articles(combined_data):
+        if article["url"] in seen or not article.get("raw_text", "").strip():
+            continue
+        seen.add(article["url"])
+        articles.append({**article, "source": source, "category": category})
+    return articles
+
+
+@span("passages.build")
+def build_passage_index(combined_data):
+    """Chunk, embed and index the full text of every article, then publish it as a passage bundle.
+
+    The index is rebuilt on every run; passage vectors come from their own embedding store, so
+    only passages of new or edited articles are encoded.
+    """
+    start = time.perf_counter()
+    records, texts, passages = chunk_articles(collect_full_text(combined_data))
+    print(f"✂️ {len(records)} articles split into {len(passages)} passages "
+          f"({PASSAGE_WORDS} words, {PASSAGE_OVERLAP} overlap)")
+
+    store = shared_store(PASSAGE_EMBEDDING_STORE_DIR, EMBEDDING_MODEL_ID, max_entries=PASSAGE_EMBEDDING_STORE_MAX_ENTRIES)
+    passage_texts = [
+        embedding_text(records[row["article"]], texts[row["start"]:row["end"]].decode("utf-8"))
+        for row in passages
+    ]
+    misses_before = store.misses
+    with span("passages.encode", passages=len(passage_texts)):
+        embeddings = encode_with_store(store, passage_texts, get_encoder, batch_size=PASSAGE_EMBED_BATCH, show_progress_bar=True)
+    store.save()
+    del passage_texts
+
+    index_type = choose_index_type(len(embeddings))
+    vectors = prepare_vectors(embeddings, index_type)
+    dim = vectors.shape[1] if len(vectors) else store.dim or get_encoder().get_sentence_embedding_dimension()
+    index, params = create_index(index_type, dim, vectors)
+    if len(vectors):
+        # Passage ids are rows of passages.npy
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+
+    def write_bundle(directory):
+        faiss.write_index(index, os.path.join(directory, PASSAGE_INDEX_FILENAME))
+        write_passage_store(directory, records, texts, passages)
+
+    version = publish_bundle(write_bundle, {
+        "embedding_model": EMBEDDING_MODEL_ID,
+        "index_type": index_type,
+        "metric": metric(index_type),
+        "params": params,
+        "passage_words": PASSAGE_WORDS,
+        "passage_overlap": PASSAGE_OVERLAP,
+        "articles": len(records),
+        "passages": len(passages),
+        "text_bytes": len(texts),
+    }, bundles_dir=PASSAGE_BUNDLES_DIR, current_file=PASSAGE_CURRENT_FILE)
+
+    print(f"✅ {index_type} passage index: {len(passages)} passages ({store.misses - misses_before} newly embedded) "
+          f"published as bundle {version} in {time.perf_counter() - start:.2f}s")
+    return version
+
+
+def main():
+    build_passage_index(load_dataset(RAW, {}))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,116 @@
 import os
-import json
 import time
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+import threading
 
 # Setup config import
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import MODEL_NAME, RAW_JSON, SUMMARY_JSON, MAX_CHARS, MAX_SUMMARY_WORDS
-
-BATCH_SIZE = 8  # local-only config
-
-# === START TIMER ===
-start_time = time.time()
-
-# === LOAD MODEL ===
-print("🧠 Loading model...")
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
-summarizer = pipeline("summarization", model=model, tokenizer=tokenizer, device=-1)
-
-# === LOAD JSON DATA ===
-with open(RAW_JSON, "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-updated_count = 0
-batch_number = 1
-
-# === GENERATE SUMMARIES IN BATCHES ===
-for source, categories in data.items():
-    for category, articles in categories.items():
-        texts_to_summarize = []
-        article_refs = []
-
-        for article in articles:
-            if not article.get("summary") and article.get("raw_text"):
-                raw_text = article["raw_text"].replace("\n", " ").strip()
-                if len(raw_text) < 50:
-                    continue
-                text = raw_text[:MAX_CHARS]
-                texts_to_summarize.append(text)
-                article_refs.append(article)
-
-        for i in range(0, len(texts_to_summarize), BATCH_SIZE):
-            batch = texts_to_summarize[i:i + BATCH_SIZE]
-            try:
-                results = summarizer(batch, max_length=MAX_SUMMARY_WORDS, min_length=20, do_sample=False)
-                for j, result in enumerate(results):
-                    article_refs[i + j]["summary"] = result["summary_text"]
-                    updated_count += 1
-                print(f"✅ Completed Batch #{batch_number}")
-                batch_number += 1
-            except Exception as e:
-                print(f"❌ Error summarizing batch starting at index {i}: {e}")
-
-# === SAVE UPDATED JSON ===
-with open(SUMMARY_JSON, "w", encoding="utf-8") as f:
-    json.dump(data, f, indent=2)
-
-elapsed_time = time.time() - start_time
-print(f"✅ {updated_count} summaries added → saved to {SUMMARY_JSON}")
-print(f"⏱️ Total processing time: {elapsed_time:.2f} seconds")
+from config import NEWS_DB, SUMMARY_MAX_INPUT_TOKENS, INCREMENTAL
+from incremental import iter_articles, article_hash
+from news_store import RAW, SUMMARY, load_dataset, save_dataset
+from model_registry import get_summarizer
+from summary_scheduler import ThroughputReport, summarize_scheduled
+from worker_pool import get_pool
+from telemetry import span
+
+BATCH_SIZE = 8  # articles per streamed batch; whole runs are batched by token budget
+MAX_INPUT_CHARS = SUMMARY_MAX_INPUT_TOKENS * 8  # cheap cut before tokenising, well past the token limit
+
+# One summariser is shared by every caller; concurrent batches would only fight over CPU threads
+_summarizer_lock = threading.Lock()
+
+
+# What reuse_summary needs from a previous run; skipping raw_text keeps that load small
+SUMMARY_LOOKUP_FIELDS = ("url", "title", "summary", "content_hash")
+
+
+def summary_lookup(previous):
+    return {article["url"]: article for _, _, article in iter_articles(previous)}
+
+
+def reuse_summary(article, lookup):
+    """Copy the summary of an unchanged article (same URL and content hash) from a previous run."""
+    old = lookup.get(article["url"])
+    if not article.get("summary") and old and old.get("summary") and article_hash(old) == article_hash(article):
+        article["summary"] = old["summary"]
+        return True
+    return False
+
+
+def reuse_summaries(data, previous):
+    """Copy summaries of unchanged articles from a previous run; returns how many were reused."""
+    lookup = summary_lookup(previous)
+    return sum(reuse_summary(article, lookup) for _, _, article in iter_articles(data))
+
+
+def summary_input(article):
+    """Text to summarise, or None when the article has a summary or too little text."""
+    if article.get("summary") or not article.get("raw_text"):
+        return None
+    raw_text = article["raw_text"].replace("\n", " ").strip()
+    if len(raw_text) < 50:
+        return None
+    return raw_text[:MAX_INPUT_CHARS]
+
+
+@span("summarise")
+def summarize_batch(articles, texts, report=None):
+    """Summarise texts and store the results on the matching articles; returns how many were updated."""
+    pool = get_pool()
+    if pool is not None:
+        updated_count = 0
+        for article, summary in zip(articles, pool.summarize(texts, report)):
+            if summary is not None:
+                article["summary"] = summary
+                updated_count += 1
+        return updated_count
+    with _summarizer_lock:
+        return summarize_scheduled(get_summarizer(), articles, texts, report)
+
+
+def summarize_articles(data):
+    """Fill in missing summaries in place.
+
+    Pending articles from every source and category are scheduled together, so small categories
+    no longer produce tiny batches.
+    """
+    articles, texts = [], []
+    for _, _, article in iter_articles(data):
+        text = summary_input(article)
+        if text is not None:
+            articles.append(article)
+            texts.append(text)
+
+    report = ThroughputReport()
+    try:
+        updated_count = summarize_batch(articles, texts, report)
+    except Exception as e:
+        print(f"❌ Error summarizing {len(texts)} articles: {e}")
+        updated_count = 0
+    report.print()
+    return updated_count
+
+
+def main():
+    # === START TIMER ===
+    start_time = time.time()
+
+    # === LOAD SCRAPED ARTICLES ===
+    data = load_dataset(RAW, {})
+
+    # === REUSE SUMMARIES OF UNCHANGED ARTICLES ===
+    reused_count = reuse_summaries(data, load_dataset(SUMMARY, {}, fields=SUMMARY_LOOKUP_FIELDS)) if INCREMENTAL else 0
+
+    # === GENERATE SUMMARIES IN BATCHES ===
+    updated_count = summarize_articles(data)
+
+    # === SAVE SUMMARISED ARTICLES ===
+    save_dataset(SUMMARY, data)
+
+    elapsed_time = time.time() - start_time
+    print(f"✅ {updated_count} summaries added, {reused_count} reused → saved to {NEWS_DB}")
+    print(f"⏱️ Total processing time: {elapsed_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
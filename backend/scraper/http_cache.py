@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Config import
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import HTTP_CACHE_DIR, HTTP_CACHE_ENABLED, RETENTION_DAYS
+
+# Per-run counters, shared by every scraper thread
+_stats = {"hits_304": 0, "hits_unchanged": 0, "misses": 0, "bytes_downloaded": 0, "bytes_saved": 0}
+_stats_lock = threading.Lock()
+# Entries untouched for longer than the retention window are pruned once per process, on first use
+_pruned = False
+
+
+def _entry_path(url):
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def body_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def prune(max_age_days=RETENTION_DAYS):
+    """Delete entries no scrape has touched in max_age_days; their articles have left the retention window."""
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    try:
+        entries = list(os.scandir(HTTP_CACHE_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    if removed:
+        print(f"🗑️ HTTP cache: pruned {removed} entries unused for {max_age_days:g} days")
+    return removed
+
+
+def _prune_once():
+    global _pruned
+    with _stats_lock:
+        if _pruned:
+            return
+        _pruned = True
+    prune()
+
+
+def load_entry(url, parser):
+    """The cached entry for url, or None when there is none or it was extracted by another parser version."""
+    if not HTTP_CACHE_ENABLED:
+        return None
+    _prune_once()
+    try:
+        with open(_entry_path(url), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # No conditional GET either: the page has to be downloaded again to re-extract it
+    return entry if entry.get("parser") == parser else None
+
+
+def save_entry(url, response, result, parser):
+    """Store validators, body hash and the extracted result for a freshly parsed page."""
+    if not HTTP_CACHE_ENABLED:
+        return
+    _write_entry(url, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_hash": body_hash(response.content),
+        "body_size": len(response.content),
+        "parser": parser,
+        "result": result,
+    })
+
+
+def refresh_entry(url, entry, response):
+    """Keep a cache hit's entry alive past pruning, taking any new validators a 200 or 304 carries."""
+    if not HTTP_CACHE_ENABLED:
+        return
+    etag = response.headers.get("ETag") or entry.get("etag")
+    last_modified = response.headers.get("Last-Modified") or entry.get("last_modified")
+    if (etag, last_modified) == (entry.get("etag"), entry.get("last_modified")):
+        try:
+            os.utime(_entry_path(url))
+        except FileNotFoundError:
+            pass
+        return
+    _write_entry(url, {**entry, "etag": etag, "last_modified": last_modified})
+
+
+def _write_entry(url, entry):
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    path = _entry_path(url)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def record(kind, downloaded=0, saved=0):
+    with _stats_lock:
+        _stats[kind] += 1
+        _stats["bytes_downloaded"] += downloaded
+        _stats["bytes_saved"] += saved
+
+
+def get_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def report():
+    stats = get_stats()
+    total = stats["hits_304"] + stats["hits_unchanged"] + stats["misses"]
+    hits = stats["hits_304"] + stats["hits_unchanged"]
+    print(
+        f"🗄️ HTTP cache: {hits}/{total} hits "
+        f"({stats['hits_304']} not modified, {stats['hits_unchanged']} unchanged body), "
+        f"{stats['misses']} misses, {stats['bytes_downloaded']} bytes downloaded, "
+        f"{stats['bytes_saved']} bytes saved"
+    )
+    return stats
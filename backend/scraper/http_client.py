@@ -0,0 +1,77 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Config import
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import SCRAPE_CONCURRENCY, SCRAPE_PER_HOST_LIMIT, SCRAPE_TIMEOUT, SCRAPE_MAX_RETRIES, SCRAPE_BACKOFF, SCRAPE_MAX_BACKOFF
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# One pooled session shared by every scraper, so connections to the same host are kept alive
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=SCRAPE_CONCURRENCY, pool_maxsize=SCRAPE_CONCURRENCY, pool_block=True)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Scrape-wide limit on in-flight requests, plus a smaller limit per host
+_global_slots = threading.BoundedSemaphore(SCRAPE_CONCURRENCY)
+_host_slots = {}
+_host_lock = threading.Lock()
+
+
+def _host_semaphore(url):
+    host = urlsplit(url).netloc
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(SCRAPE_PER_HOST_LIMIT)
+        return _host_slots[host]
+
+
+def _backoff_delay(attempt, response=None):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit() and float(retry_after) <= SCRAPE_MAX_BACKOFF:
+            return float(retry_after)
+    return SCRAPE_BACKOFF * (2 ** attempt) + random.uniform(0, SCRAPE_BACKOFF)
+
+
+def fetch(url, headers=None):
+    """GET a URL through the shared pool, retrying transient failures with exponential backoff."""
+    host_slots = _host_semaphore(url)
+    for attempt in range(SCRAPE_MAX_RETRIES + 1):
+        response = None
+        try:
+            # Host slot first: threads queued on a slow or throttled host must not sit on global slots
+            # that requests to every other host could be using
+            with host_slots, _global_slots:
+                response = _session.get(url, headers=headers, timeout=SCRAPE_TIMEOUT)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == SCRAPE_MAX_RETRIES:
+                raise
+        if attempt == SCRAPE_MAX_RETRIES:
+            response.raise_for_status()
+        time.sleep(_backoff_delay(attempt, response))
+
+
+def map_concurrent(fn, items):
+    """Apply fn to every item on a thread pool and return the results in input order.
+
+    Pools are cheap and created per call, so nested calls (categories → articles) cannot
+    deadlock; the real limit on network concurrency is the semaphores inside fetch().
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(SCRAPE_CONCURRENCY, len(items))) as executor:
+        return list(executor.map(fn, items))
@@ -0,0 +1,150 @@
+# === page_parser.py === (HTML parser backends behind the small interface article extractors use)
+#
+# Extractors receive a page node and only call select(), select_one(), children(), text() and .name,
+# so the same function runs on any backend and returns the same output:
+#   html.parser  BeautifulSoup's pure-Python parser (what the scrapers always used)
+#   lxml         BeautifulSoup on lxml's C parser: same tree and selectors, faster tree building
+#   selectolax   Lexbor's C parser and CSS engine; several times faster than either
+# BeautifulSoup backends parse in a process pool on multi-core machines (see PARSE_WORKERS in config).
+# benchmarks/bench_parse.py measures each backend and checks its output against html.parser.
+import os
+import sys
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup, FeatureNotFound
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import HTML_PARSER, PARSE_WORKERS
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+# Bump whenever an extractor's output changes: cached extractions from older code are then parsed again
+EXTRACTOR_VERSION = 1
+# BeautifulSoup's get_text() leaves out the strings in these; Lexbor's text() would include them
+NON_TEXT_TAGS = ["script", "style", "template"]
+
+
+class SoupNode:
+    """A BeautifulSoup tag, from either tree builder."""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.name = tag.name
+
+    def select(self, css):
+        return [SoupNode(tag) for tag in self.tag.select(css)]
+
+    def select_one(self, css):
+        tag = self.tag.select_one(css)
+        return SoupNode(tag) if tag is not None else None
+
+    def children(self):
+        return [SoupNode(tag) for tag in self.tag.find_all(recursive=False)]
+
+    def text(self):
+        return self.tag.get_text(strip=True)
+
+
+class LexborNode:
+    """A selectolax (Lexbor) node."""
+
+    def __init__(self, node):
+        self.node = node
+        self.name = node.tag
+
+    def select(self, css):
+        return [LexborNode(node) for node in self.node.css(css)]
+
+    def select_one(self, css):
+        node = self.node.css_first(css)
+        return LexborNode(node) if node is not None else None
+
+    def children(self):
+        return [LexborNode(node) for node in self.node.iter(include_text=False)]
+
+    def text(self):
+        # Each text node stripped and joined without a separator, as get_text(strip=True) does
+        return self.node.text(deep=True, separator="", strip=True)
+
+
+def installed(backend):
+    try:
+        if backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif backend == "lxml":
+            import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return backend in BACKENDS
+
+
+def resolve_backend(name):
+    """The backend to use for name: auto picks the fastest installed, a missing one falls back the same way."""
+    if name != "auto" and installed(name):
+        return name
+    backend = next(backend for backend in BACKENDS if installed(backend))
+    if name != "auto":
+        print(f"⚠️ HTML parser {name} is not available, using {backend}")
+    return backend
+
+
+BACKEND = resolve_backend(HTML_PARSER)
+
+
+def parse_page(content, backend=None):
+    """Root node of an HTML page (bytes or str)."""
+    backend = backend or BACKEND
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        tree = LexborHTMLParser(content)
+        tree.strip_tags(NON_TEXT_TAGS)
+        return LexborNode(tree.root)
+    try:
+        return SoupNode(BeautifulSoup(content, backend))
+    except FeatureNotFound:
+        return SoupNode(BeautifulSoup(content, "html.parser"))
+
+
+def parser_version(extract, backend=None):
+    """What an extraction depends on besides the page itself: backend, extractor and EXTRACTOR_VERSION."""
+    return f"{backend or BACKEND}/{extract.__qualname__}/{EXTRACTOR_VERSION}"
+
+
+def _extract(extract, content, backend):
+    return extract(parse_page(content, backend))
+
+
+# ------------------ PARSE POOL ------------------ #
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def parse_workers(backend=BACKEND, workers=PARSE_WORKERS):
+    if workers:
+        return workers
+    # Shipping a page to a worker and the result back costs more than Lexbor takes to parse it
+    return 1 if backend == "selectolax" else min(os.cpu_count() or 1, 4)
+
+
+def get_parse_pool():
+    """The process-wide parse pool, or None when pages are parsed on the fetch threads."""
+    global _pool
+    workers = parse_workers()
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the fetch threads are already running when the first page comes back
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown, wait=True, cancel_futures=True)
+            print(f"🧵 Started {workers} parse workers ({BACKEND})")
+        return _pool
+
+
+def extract_page(content, extract, backend=None):
+    """extract(page) for the HTML in content; extract must be a module-level function so it can be sent to the pool."""
+    pool = get_parse_pool()
+    if pool is None:
+        return _extract(extract, content, backend)
+    return pool.submit(_extract, extract, content, backend or BACKEND).result()
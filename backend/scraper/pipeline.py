@@ -1,22 +1,25 @@
-import subprocess
+import os
+import sys
+import logging
 
-steps = [
-    ("🕸️ Scraping all news sources", "python scraper/scraper_manager.py"),
-    ("🧠 Generating summaries", "python scraper/create_summary.py"),
-    ("📌 Creating news highlights", "python scraper/create_highlights.py"),
-    ("📂 Building FAISS index", "python scraper/create_faiss_index.py"),
-]
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import PIPELINE_MODE
+from pipeline_runner import run_pipeline
+from stream_pipeline import run_streaming_pipeline
+
+# Inference worker processes are spawned and re-import this file, hence the __main__ guard
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-for desc, cmd in steps:
     print("\n" + "=" * 60)
-    print(f"{desc}...\nRunning: {cmd}")
+    print("🕸️ Scraping → 🧠 summarising → 📌 highlights → 📂 FAISS index (in-process)")
     print("=" * 60)
     try:
-        subprocess.run(cmd, shell=True, check=True)
-        print(f"✅ Completed: {desc}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed during step: {desc}")
+        if PIPELINE_MODE == "stream":
+            run_streaming_pipeline()
+        else:
+            run_pipeline()
+        print("\n🎉 ALL DONE — Pipeline completed successfully!")
+    except Exception as e:
+        print("❌ Pipeline failed")
         print(f"Error: {e}")
-        break
-else:
-    print("\n🎉 ALL DONE — Pipeline completed successfully!")
@@ -1,4 +1,5 @@
-from scraper_base import get_soup, make_article
+from scraper_base import get_soup, make_article, fetch_and_extract
+from http_client import map_concurrent
 
 BASE_URL = "https://www.abc.net.au"
 
@@ -9,41 +10,43 @@ CATEGORY_URLS = {
     "business": "https://www.abc.net.au/news/business/"
 }
 
+def parse_summary_and_raw_text(page):
+    # --- Extract "In Short" Summary ---
+    summary = ""
+    summary_block = page.select_one("div.Article_main___guM5")
+    if summary_block:
+        lines = []
+        found = False
+        for el in summary_block.children():
+            if el.name == "h2" and "in short" in el.text().lower():
+                found = True
+                continue
+            if found:
+                if el.name == "h2":
+                    break
+                if el.name == "p":
+                    lines.append(el.text())
+        summary = " ".join(lines).strip()
+
+    # --- Extract Full Raw Text ---
+    raw_text = ""
+    article_body = page.select_one("div.ArticleRender_article__7i2EW")
+    if article_body:
+        paragraphs = [p.text() for p in article_body.select("p")]
+        raw_text = " ".join(paragraphs).strip()
+
+    return summary, raw_text
+
 def extract_summary_and_raw_text(url):
     try:
-        soup = get_soup(url)
-
-        # --- Extract "In Short" Summary ---
-        summary = ""
-        summary_block = soup.select_one("div.Article_main___guM5")
-        if summary_block:
-            lines = []
-            found = False
-            for el in summary_block.find_all(recursive=False):
-                if el.name == "h2" and "in short" in el.get_text(strip=True).lower():
-                    found = True
-                    continue
-                if found:
-                    if el.name == "h2":
-                        break
-                    if el.name == "p":
-                        lines.append(el.get_text(strip=True))
-            summary = " ".join(lines).strip()
-
-        # --- Extract Full Raw Text ---
-        raw_text = ""
-        article_body = soup.select_one("div.ArticleRender_article__7i2EW")
-        if article_body:
-            paragraphs = [p.get_text(strip=True) for p in article_body.find_all("p")]
-            raw_text = " ".join(paragraphs).strip()
-
+        summary, raw_text = fetch_and_extract(url, parse_summary_and_raw_text)
         return summary, raw_text
 
     except Exception as e:
         print(f"❌ Failed to extract: {url} → {e}")
         return "", ""
 
-def fetch_abc_articles(category_name, url):
+def fetch_abc_articles(category_name, url, on_article=None):
     articles = []
     soup = get_soup(url)
 
@@ -61,6 +64,7 @@ def fetch_abc_articles(category_name, url):
         print(f"❌ No article list found for: {category_name}")
         return []
 
+    cards = []
     for card in ul_block.select("li.FeaturedCollection_cardList__lnpB_"):
         try:
             a_tag = card.select_one("h3 a")
@@ -70,20 +74,28 @@ def fetch_abc_articles(category_name, url):
             title = a_tag.get_text(strip=True)
             href = a_tag.get("href", "")
             full_url = href if href.startswith("http") else BASE_URL + href
-
-            summary, raw_text = extract_summary_and_raw_text(full_url)
-
-            article = make_article(
-                title=title,
-                url=full_url,
-                source="ABC News",
-                category=category_name,
-                summary=summary,
-                raw_text=raw_text
-            )
-            articles.append(article)
+            cards.append((title, full_url))
 
         except Exception as e:
             print(f"⚠️ Failed to parse card: {e}")
 
+    # Article pages are fetched concurrently; results come back in card order.
+    # on_article (streaming mode) receives each article as soon as its page is parsed.
+    def build(card):
+        title, full_url = card
+        summary, raw_text = extract_summary_and_raw_text(full_url)
+        article = make_article(
+            title=title,
+            url=full_url,
+            source="ABC News",
+            category=category_name,
+            summary=summary,
+            raw_text=raw_text
+        )
+        if on_article:
+            on_article(article)
+        return article
+
+    articles.extend(map_concurrent(build, cards))
+
     return articles
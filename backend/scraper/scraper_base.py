@@ -1,6 +1,14 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+from http_client import fetch
+from page_parser import extract_page, parser_version
+import http_cache
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from incremental import content_hash
+from telemetry import span
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
@@ -10,9 +18,39 @@ HEADERS = {
 
 
 def get_soup(url):
-    response = requests.get(url, headers=HEADERS)
-    response.raise_for_status()
-    return BeautifulSoup(response.content, "html.parser")
+    with span("scrape.fetch", url=url):
+        response = fetch(url, headers=HEADERS)
+    with span("scrape.parse", url=url):
+        return BeautifulSoup(response.content, "html.parser")
+
+def fetch_and_extract(url, extract):
+    """Fetch an article page with a conditional GET and run extract(page) on it.
+
+    page is a page_parser node from the configured HTML parser backend. A 304 or a
+    byte-identical body returns the cached extraction without parsing, as long as it came from the
+    same parser backend and extractor version.
+    """
+    parser = parser_version(extract)
+    entry = http_cache.load_entry(url, parser)
+    with span("scrape.fetch", url=url):
+        response = fetch(url, headers={**HEADERS, **http_cache.conditional_headers(entry)})
+
+    if response.status_code == 304 and entry:
+        http_cache.record("hits_304", saved=entry["body_size"])
+        http_cache.refresh_entry(url, entry, response)
+        return entry["result"]
+
+    if entry and entry["body_hash"] == http_cache.body_hash(response.content):
+        http_cache.record("hits_unchanged", downloaded=len(response.content))
+        # Without the server's current validators every later request would stay unconditional
+        http_cache.refresh_entry(url, entry, response)
+        return entry["result"]
+
+    http_cache.record("misses", downloaded=len(response.content))
+    with span("scrape.parse", url=url):
+        result = extract_page(response.content, extract)
+    http_cache.save_entry(url, response, result, parser)
+    return result
 
 def make_article(title, url, source, category, summary=None, raw_text=None):
     return {
@@ -22,5 +60,6 @@ def make_article(title, url, source, category, summary=None, raw_text=None):
         "category": category,
         "summary": summary or "",
         "raw_text": raw_text or "",
+        "content_hash": content_hash(title.strip(), (raw_text or "").strip()),
         "scraped_at": datetime.now().isoformat()
     }
@@ -1,4 +1,5 @@
-from scraper_base import make_article, get_soup
+from scraper_base import make_article, get_soup, fetch_and_extract
+from http_client import map_concurrent
 
 CATEGORY_URLS = {
     "sport": "https://www.theguardian.com/au/sport",
@@ -14,16 +15,18 @@ CONTAINER_IDS = {
     "lifestyle": "container-lifestyle"
 }
 
+def parse_guardian_article(page):
+    paragraphs = page.select("div[data-gu-name='body'] p")
+    return " ".join(p.text() for p in paragraphs)
+
 def extract_guardian_article(url):
     try:
-        soup = get_soup(url)
-        paragraphs = soup.select("div[data-gu-name='body'] p")
-        return " ".join(p.get_text(strip=True) for p in paragraphs)
+        return fetch_and_extract(url, parse_guardian_article)
     except Exception as e:
         print(f"❌ Failed to extract full text from {url}: {e}")
         return ""
 
-def fetch_guardian_articles(category_name, url):
+def fetch_guardian_articles(category_name, url, on_article=None):
     articles = []
     seen_urls = set()  # ✅ Set to track already seen article URLs
 
@@ -36,6 +39,7 @@ def fetch_guardian_articles(category_name, url):
             print(f"❌ No container found for {category_name}")
             return []
 
+        cards = []
         li_elements = container.select("ul li")
         for li in li_elements:
             a_tag = li.find("a", href=True)
@@ -50,17 +54,25 @@ def fetch_guardian_articles(category_name, url):
             seen_urls.add(full_url)
 
             title = a_tag.get("aria-label") or a_tag.get_text(strip=True)
-            full_text = extract_guardian_article(full_url)
+            cards.append((title, full_url))
 
+        # Article pages are fetched concurrently; results come back in card order.
+        # on_article (streaming mode) receives each article as soon as its page is parsed.
+        def build(card):
+            title, full_url = card
             article = make_article(
                 title=title,
                 url=full_url,
                 source="The Guardian Australia",
                 category=category_name,
                 summary="",
-                raw_text=full_text
+                raw_text=extract_guardian_article(full_url)
             )
-            articles.append(article)
+            if on_article:
+                on_article(article)
+            return article
+
+        articles.extend(map_concurrent(build, cards))
 
     except Exception as e:
         print(f"❌ Error scraping {category_name}: {e}")
@@ -1,52 +1,74 @@
 import os
-import json
+import time
 from scraper_abc import fetch_abc_articles, CATEGORY_URLS as ABC_CATEGORY_URLS
 from scraper_guardian import fetch_guardian_articles, CATEGORY_URLS as GUARDIAN_CATEGORY_URLS
 from scraper_thenewdaily import fetch_newdaily_articles, CATEGORY_URLS as NEWDAILY_CATEGORY_URLS
+from http_client import map_concurrent
+import http_cache
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import RAW_JSON, NEWS_DATA_DIR
+from config import NEWS_DB, INCREMENTAL, RETENTION_DAYS
+from incremental import merge_scrapes
+from news_store import RAW, load_dataset, save_dataset
+
+def scrape_category(job, on_article=None):
+    source, label, fetch_fn, category, url = job
+    print(f"🔎 Scraping {label} - {category}...")
+    try:
+        articles = fetch_fn(category_name=category, url=url, on_article=on_article)
+        print(f"✅ {len(articles)} articles added under {source} → {category}")
+        return articles
+    except Exception as e:
+        print(f"❌ Failed {label} scrape for category {category}: {e}")
+        return None
+
+# source → (log label, fetch function, category URLs)
+SOURCES = {
+    "ABC News": ("ABC", fetch_abc_articles, ABC_CATEGORY_URLS),
+    "The Guardian": ("Guardian", fetch_guardian_articles, GUARDIAN_CATEGORY_URLS),
+    # "The New Daily": ("New Daily", fetch_newdaily_articles, NEWDAILY_CATEGORY_URLS),
+}
+
+def source_jobs(source):
+    label, fetch_fn, category_urls = SOURCES[source]
+    return [(source, label, fetch_fn, category, url) for category, url in category_urls.items()]
+
+def run_jobs(jobs, combined_data, on_article=None):
+    # Every job runs at once; the fetch layer caps total in-flight requests
+    results = map_concurrent(lambda job: scrape_category(job, on_article), jobs)
+    for (source, _, _, category, _), articles in zip(jobs, results):
+        if articles is not None:
+            combined_data.setdefault(source, {})[category] = articles
+    return combined_data
+
+def scrape_source(source, on_article=None):
+    """Scrape every category of one source and return {category: articles}.
+
+    on_article(article) is called from the fetch threads as each article is parsed.
+    """
+    return run_jobs(source_jobs(source), {}, on_article).get(source, {})
 
 def run_all_scrapers():
+    start_time = time.time()
     combined_data = {
         "ABC News": {},
         "The Guardian": {},
         "The New Daily": {}
     }
 
-    for category, url in ABC_CATEGORY_URLS.items():
-        print(f"🔎 Scraping ABC - {category}...")
-        try:
-            articles = fetch_abc_articles(category_name=category, url=url)
-            combined_data["ABC News"][category] = articles
-            print(f"✅ {len(articles)} articles added under ABC News → {category}")
-        except Exception as e:
-            print(f"❌ Failed ABC scrape for category {category}: {e}")
-
-    for category, url in GUARDIAN_CATEGORY_URLS.items():
-        print(f"🔎 Scraping Guardian - {category}...")
-        try:
-            articles = fetch_guardian_articles(category_name=category, url=url)
-            combined_data["The Guardian"][category] = articles
-            print(f"✅ {len(articles)} articles added under The Guardian → {category}")
-        except Exception as e:
-            print(f"❌ Failed Guardian scrape for category {category}: {e}")
-
-    # for category, url in NEWDAILY_CATEGORY_URLS.items():
-    #     print(f"🔎 Scraping New Daily - {category}...")
-    #     try:
-    #         articles = fetch_newdaily_articles(category_name=category, url=url)
-    #         combined_data["The New Daily"][category] = articles
-    #         print(f"✅ {len(articles)} articles added under The New Daily → {category}")
-    #     except Exception as e:
-    #         print(f"❌ Failed New Daily scrape for category {category}: {e}")
-
-    os.makedirs(NEWS_DATA_DIR, exist_ok=True)
-    with open(RAW_JSON, "w", encoding="utf-8") as f:
-        json.dump(combined_data, f, indent=2)
-
-    print(f"🎉 All data saved to {RAW_JSON}")
+    jobs = [job for source in SOURCES for job in source_jobs(source)]
+    run_jobs(jobs, combined_data)
+
+    if INCREMENTAL:
+        # Keep recent articles from earlier runs instead of overwriting them
+        combined_data = merge_scrapes(load_dataset(RAW, {}), combined_data, RETENTION_DAYS)
+
+    save_dataset(RAW, combined_data)
+
+    print(f"🎉 All data saved to {NEWS_DB}")
+    http_cache.report()
+    print(f"⏱️ Total scrape time: {time.time() - start_time:.2f} seconds")
 
 if __name__ == "__main__":
     run_all_scrapers()
@@ -1,4 +1,5 @@
-from scraper_base import get_soup, make_article
+from scraper_base import get_soup, make_article, fetch_and_extract
+from http_client import map_concurrent
 
 BASE_URL = "https://thenewdaily.com.au"
 
@@ -9,19 +10,22 @@ CATEGORY_URLS = {
     "business": "https://thenewdaily.com.au/finance/"
 }
 
+def parse_newdaily_text(page):
+    paragraphs = page.select("p.text-article-body")  # More specific selector
+    return " ".join(p.text() for p in paragraphs).strip()
+
 def extract_newdaily_text(url):
     try:
-        soup = get_soup(url)
-        paragraphs = soup.select("p.text-article-body")  # More specific selector
-        return " ".join(p.get_text(strip=True) for p in paragraphs).strip()
+        return fetch_and_extract(url, parse_newdaily_text)
     except Exception as e:
         print(f"❌ Failed to extract full text from {url}: {e}")
         return ""
 
-def fetch_newdaily_articles(category_name, url):
+def fetch_newdaily_articles(category_name, url, on_article=None):
     articles = []
     soup = get_soup(url)
     seen_urls = set()
+    cards = []
 
     for card in soup.select(".lg\\:grid-in-main .group"):
         try:
@@ -36,20 +40,28 @@ def fetch_newdaily_articles(category_name, url):
                 continue
 
             title = title_tag.get_text(strip=True)
-            raw_text = extract_newdaily_text(full_url)
-
-            article = make_article(
-                title=title,
-                url=full_url,
-                source="The New Daily",
-                category=category_name,
-                summary="",
-                raw_text=raw_text
-            )
-            articles.append(article)
+            cards.append((title, full_url))
             seen_urls.add(full_url)
 
         except Exception as e:
             print(f"⚠️ Error parsing article card: {e}")
 
+    # Article pages are fetched concurrently; results come back in card order.
+    # on_article (streaming mode) receives each article as soon as its page is parsed.
+    def build(card):
+        title, full_url = card
+        article = make_article(
+            title=title,
+            url=full_url,
+            source="The New Daily",
+            category=category_name,
+            summary="",
+            raw_text=extract_newdaily_text(full_url)
+        )
+        if on_article:
+            on_article(article)
+        return article
+
+    articles.extend(map_concurrent(build, cards))
+
     return articles
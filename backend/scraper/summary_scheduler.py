@@ -0,0 +1,123 @@
+import os
+import time
+
+# Config import
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import MAX_SUMMARY_WORDS, SUMMARY_MAX_INPUT_TOKENS, SUMMARY_TOKEN_BUDGET, SUMMARY_MAX_BATCH
+from telemetry import span
+
+
+class ThroughputReport:
+    """Counters for one scheduling run; padding ratio is the share of model input that was padding."""
+
+    def __init__(self):
+        self.articles = 0
+        self.batches = 0
+        self.failed = 0
+        self.input_tokens = 0
+        self.padded_tokens = 0
+        self.seconds = 0.0
+
+    def add(self, lengths, elapsed):
+        self.articles += len(lengths)
+        self.batches += 1
+        self.input_tokens += sum(lengths)
+        self.padded_tokens += len(lengths) * max(lengths)
+        self.seconds += elapsed
+
+    def counters(self):
+        return {"articles": self.articles, "batches": self.batches, "failed": self.failed,
+                "input_tokens": self.input_tokens, "padded_tokens": self.padded_tokens}
+
+    def merge(self, counters):
+        """Add counters from another report (e.g. a worker process); time is tracked by the caller."""
+        for name, value in counters.items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        seconds = self.seconds or 1e-9
+        return {
+            "articles": self.articles,
+            "batches": self.batches,
+            "failed": self.failed,
+            "input_tokens": self.input_tokens,
+            "articles_per_sec": round(self.articles / seconds, 2),
+            "tokens_per_sec": round(self.input_tokens / seconds, 1),
+            "padding_ratio": round(1 - self.input_tokens / self.padded_tokens, 3) if self.padded_tokens else 0.0,
+            "seconds": round(self.seconds, 2),
+        }
+
+    def print(self):
+        stats = self.as_dict()
+        print(f"📊 Summarised {stats['articles']} articles in {stats['batches']} batches ({stats['failed']} failed): "
+              f"{stats['articles_per_sec']} articles/s, {stats['tokens_per_sec']} tokens/s, "
+              f"padding {stats['padding_ratio']:.1%}")
+
+
+def tokenize(summarizer, texts):
+    """Tokenise every text once, truncated to SUMMARY_MAX_INPUT_TOKENS; the pipeline's task prefix is kept."""
+    prefix = getattr(summarizer, "prefix", None) or ""
+    encoded = summarizer.tokenizer([prefix + text for text in texts], truncation=True, max_length=SUMMARY_MAX_INPUT_TOKENS)
+    return encoded["input_ids"]
+
+
+def plan_batches(lengths, token_budget=SUMMARY_TOKEN_BUDGET, max_batch=SUMMARY_MAX_BATCH):
+    """Group item indices into batches of similar length whose padded size stays within token_budget.
+
+    Items are sorted by length, so each batch pads to its last (longest) item; a batch closes when
+    one more item would push batch_size × longest over the budget.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    batch = []
+    for i in order:
+        if batch and ((len(batch) + 1) * lengths[i] > token_budget or len(batch) >= max_batch):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def summarize_scheduled(summarizer, articles, texts, report=None):
+    """Summarise texts in token-budget batches and write each result to the matching article.
+
+    Returns the number of articles that received a summary.
+    """
+    import torch
+
+    report = report or ThroughputReport()
+    if not texts:
+        return 0
+    tokenizer, model = summarizer.tokenizer, summarizer.model
+    generation_config = getattr(summarizer, "generation_config", None)
+    input_ids = tokenize(summarizer, texts)
+    lengths = [len(ids) for ids in input_ids]
+
+    updated_count = 0
+    for batch_number, batch in enumerate(plan_batches(lengths), start=1):
+        start = time.perf_counter()
+        try:
+            inputs = tokenizer.pad({"input_ids": [input_ids[i] for i in batch]}, return_tensors="pt")
+            with span("summarise.batch", articles=len(batch), tokens=int(inputs["input_ids"].numel())), torch.inference_mode():
+                outputs = model.generate(
+                    input_ids=inputs["input_ids"].to(model.device),
+                    attention_mask=inputs["attention_mask"].to(model.device),
+                    generation_config=generation_config,
+                    max_new_tokens=MAX_SUMMARY_WORDS,
+                    min_length=20,
+                    do_sample=False,
+                )
+            summaries = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        except Exception as e:
+            report.failed += len(batch)
+            print(f"❌ Error summarizing batch #{batch_number} ({len(batch)} articles): {e}")
+            continue
+        for i, summary in zip(batch, summaries):
+            articles[i]["summary"] = summary.strip()
+            updated_count += 1
+        report.add([lengths[i] for i in batch], time.perf_counter() - start)
+        print(f"✅ Completed Batch #{batch_number} ({len(batch)} articles, ≤{max(lengths[i] for i in batch)} tokens each)")
+    return updated_count
@@ -0,0 +1,230 @@
+# === stream_pipeline.py === (scrape → summarise → embed as a streaming producer/consumer chain)
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+from config import INCREMENTAL, RETENTION_DAYS, STREAM_QUEUE_SIZE, STREAM_BATCH_WAIT
+from incremental import merge_scrapes
+from news_store import RAW, SUMMARY, load_dataset
+from scraper_manager import SOURCES, scrape_source
+from create_summary import BATCH_SIZE, SUMMARY_LOOKUP_FIELDS, summary_lookup, reuse_summary, summary_input, summarize_batch
+from summary_scheduler import ThroughputReport
+from create_highlights import article_record, embed_articles, build_highlights
+from create_faiss_index import build_index
+from create_passage_index import build_passage_index
+from pipeline_runner import save_outputs, warm_models, export_metrics
+from telemetry import span
+import http_cache
+
+logger = logging.getLogger("pipeline")
+
+_DONE = object()
+# How often a stage blocked on a queue checks whether another stage has failed
+POLL_INTERVAL = 0.5
+
+
+class StreamAborted(Exception):
+    """Raised in a stage waiting on a queue once another stage has failed."""
+
+
+def put(q, item, failed):
+    """q.put(item), giving up with StreamAborted once failed is set instead of waiting on a stage that died."""
+    while not failed.is_set():
+        try:
+            q.put(item, timeout=POLL_INTERVAL)
+            return
+        except queue.Full:
+            pass
+    raise StreamAborted()
+
+
+def take_batch(q, max_size, max_wait, failed):
+    """Block for one item, then keep collecting until max_size items or max_wait seconds.
+
+    Returns (batch, finished); finished is True once the end-of-stream marker was read. Raises
+    StreamAborted if failed is set while waiting for the first item.
+    """
+    while True:
+        if failed.is_set():
+            raise StreamAborted()
+        try:
+            item = q.get(timeout=POLL_INTERVAL)
+            break
+        except queue.Empty:
+            pass
+    if item is _DONE:
+        return [], True
+    batch = [item]
+    deadline = time.monotonic() + max_wait
+    while len(batch) < max_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = q.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+class StreamItem:
+    __slots__ = ("source", "article", "scraped_at")
+
+    def __init__(self, source, article):
+        self.source = source
+        self.article = article
+        self.scraped_at = time.monotonic()
+
+
+class StreamingPipeline:
+    """Scraper threads → bounded queue → summariser batches → bounded queue → embedder batches.
+
+    A full queue blocks the stage feeding it, so fetching slows down to the pace of inference
+    instead of piling parsed pages up in memory. A stage that fails sets `failed`, which every other
+    stage's queue waits check, and run() re-raises its error once all threads have stopped.
+    """
+
+    def __init__(self, queue_size=STREAM_QUEUE_SIZE, batch_wait=STREAM_BATCH_WAIT):
+        self.scraped = queue.Queue(maxsize=queue_size)
+        self.summarised = queue.Queue(maxsize=queue_size)
+        self.batch_wait = batch_wait
+        self.previous_raw = load_dataset(RAW, {}) if INCREMENTAL else {}
+        self.previous_summaries = summary_lookup(load_dataset(SUMMARY, {}, fields=SUMMARY_LOOKUP_FIELDS)) if INCREMENTAL else {}
+        self.raw = {source: {} for source in SOURCES}
+        self.summary = {source: {} for source in SOURCES}
+        self.latencies = []
+        self.counts = {"scraped": 0, "summarised": 0, "reused": 0, "embedded": 0}
+        self.summary_report = ThroughputReport()
+        self.lock = threading.Lock()
+        self.failed = threading.Event()
+        self.error = None
+
+    def stage(self, target, *args):
+        """Run one stage thread's body, recording the first failure and telling the other stages."""
+        try:
+            target(*args)
+        except StreamAborted:
+            pass
+        except Exception as e:
+            with self.lock:
+                if self.error is None:
+                    self.error = e
+            self.failed.set()
+            print(f"❌ Streaming stage {target.__name__} failed: {e}")
+
+    def produce(self, source):
+        def on_article(article):
+            # The raw article is kept as scraped; the summary goes on a copy
+            put(self.scraped, StreamItem(source, dict(article)), self.failed)
+            with self.lock:
+                self.counts["scraped"] += 1
+        self.raw[source] = scrape_source(source, on_article=on_article)
+
+    def summarise(self):
+        finished = False
+        while not finished:
+            batch, finished = take_batch(self.scraped, BATCH_SIZE, self.batch_wait, self.failed)
+            pending, texts = [], []
+            for item in batch:
+                if reuse_summary(item.article, self.previous_summaries):
+                    self.counts["reused"] += 1
+                    continue
+                text = summary_input(item.article)
+                if text is not None:
+                    pending.append(item.article)
+                    texts.append(text)
+            if texts:
+                # A dead consumer would leave the scrapers blocked on a full queue, so never let errors escape
+                try:
+                    self.counts["summarised"] += summarize_batch(pending, texts, self.summary_report)
+                except Exception as e:
+                    print(f"❌ Error summarizing streamed batch of {len(texts)}: {e}")
+            for item in batch:
+                put(self.summarised, item, self.failed)
+        put(self.summarised, _DONE, self.failed)
+
+    def embed(self):
+        finished = False
+        while not finished:
+            batch, finished = take_batch(self.summarised, BATCH_SIZE * 2, self.batch_wait, self.failed)
+            records = [article_record(item.source, item.article["category"], item.article) for item in batch]
+            try:
+                embed_articles([record for record in records if record], save=False)
+            except Exception as e:
+                print(f"❌ Error embedding streamed batch of {len(batch)}: {e}")
+            now = time.monotonic()
+            for item in batch:
+                self.summary[item.source].setdefault(item.article["category"], []).append(item.article)
+                self.latencies.append(now - item.scraped_at)
+            self.counts["embedded"] += len(batch)
+        # One store flush at the end instead of rewriting its key file after every batch
+        embed_articles([], save=True)
+
+    def run(self):
+        # Model loads overlap the first page fetches
+        warmers = [threading.Thread(target=warm_models, args=(None,), daemon=True)]
+        consumers = [threading.Thread(target=self.stage, args=(self.summarise,)), threading.Thread(target=self.stage, args=(self.embed,))]
+        producers = {source: threading.Thread(target=self.stage, args=(self.produce, source)) for source in SOURCES}
+        for thread in warmers + consumers + list(producers.values()):
+            thread.start()
+        for thread in producers.values():
+            thread.join()
+        self.stage(put, self.scraped, _DONE, self.failed)
+        for thread in consumers:
+            thread.join()
+        if self.error is not None:
+            raise RuntimeError(f"Streaming pipeline failed: {self.error}") from self.error
+
+    def combined(self):
+        """(raw, summarised) data in the usual {source: {category: [articles]}} shape."""
+        # Articles finish out of order across fetch threads; restore the scrape order per category
+        for source, categories in self.summary.items():
+            for category, articles in categories.items():
+                order = {article["url"]: i for i, article in enumerate(self.raw[source].get(category, []))}
+                articles.sort(key=lambda article: order.get(article["url"], len(order)))
+        raw, summary = self.raw, self.summary
+        if INCREMENTAL:
+            # Keep recent articles from earlier runs; their summaries and embeddings are already stored
+            raw = merge_scrapes(self.previous_raw, raw, RETENTION_DAYS)
+            summary = merge_scrapes(load_dataset(SUMMARY, {}), summary, RETENTION_DAYS)
+        return raw, summary
+
+    def report(self):
+        latencies = np.array(self.latencies or [0.0])
+        logger.info(f"🌊 Streamed {self.counts['scraped']} articles: {self.counts['summarised']} summarised, "
+                    f"{self.counts['reused']} reused, {self.counts['embedded']} embedded")
+        self.summary_report.print()
+        logger.info(f"⏱️ Scrape → embedded latency: p50 {np.percentile(latencies, 50):.2f}s, "
+                    f"p95 {np.percentile(latencies, 95):.2f}s, max {latencies.max():.2f}s")
+
+
+def run_streaming_pipeline():
+    start = time.perf_counter()
+    success = False
+    try:
+        stream = StreamingPipeline()
+        with span("pipeline.stream"):
+            stream.run()
+        stream_time = time.perf_counter() - start
+        raw, summary = stream.combined()
+
+        highlights = build_highlights(summary)
+        version = build_index(highlights)
+        passage_version = build_passage_index(raw)
+        save_outputs(raw, summary, highlights)
+        success = True
+    finally:
+        export_metrics("stream", start, success)
+
+    http_cache.report()
+    stream.report()
+    logger.info(f"⏱️ Streaming stages: {stream_time:.2f}s, total pipeline time: {time.perf_counter() - start:.2f}s")
+    return {"highlights": highlights, "index": version, "passages": passage_version}
@@ -0,0 +1,209 @@
+# === telemetry.py === (metrics and spans shared by the pipeline and the API)
+#
+# Metrics live in this process and are rendered in the Prometheus text format: the API serves them at
+# /metrics, batch pipeline runs write them to PIPELINE_METRICS_FILE for node_exporter's textfile
+# collector. span() times a block into news_stage_seconds{stage=...} and, with OTEL_TRACES=1 and
+# opentelemetry installed, records it as an OpenTelemetry span as well.
+import os
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+from config import OTEL_TRACES, OTEL_SERVICE_NAME
+
+# Seconds; spans range from sub-millisecond searches to minutes-long summarisation runs
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+_metrics = {}
+_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def samples(self):
+        """(suffix, label values, extra labels, value) for every series."""
+        with self.lock:
+            return [("", key, (), value) for key, value in self.values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_label_text(self.labels, key, extra)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self.values.items()]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                samples.append(("_bucket", key, (("le", _number(float(bound))),), cumulative))
+            samples.append(("_sum", key, (), total))
+            samples.append(("_count", key, (), cumulative))
+        return samples
+
+
+class Callback(Metric):
+    """Read at scrape time: fn returns a number, or {label values tuple: number}, or None to skip."""
+
+    def __init__(self, name, help, fn, kind="gauge", labels=()):
+        super().__init__(name, help, labels)
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        values = value if isinstance(value, dict) else {(): value}
+        return [("", tuple(str(v) for v in key), (), number) for key, number in values.items()]
+
+
+def _register(cls, name, *args, **kwargs):
+    # Get-or-create, so a module imported twice (scripts run directly and as imports) shares one series
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = cls(name, *args, **kwargs)
+        return _metrics[name]
+
+
+def counter(name, help, labels=()):
+    return _register(Counter, name, help, labels)
+
+
+def gauge(name, help, labels=()):
+    return _register(Gauge, name, help, labels)
+
+
+def histogram(name, help, labels=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, help, labels, buckets)
+
+
+def callback(name, help, fn, kind="gauge", labels=()):
+    with _lock:
+        # Replaced rather than kept: the callback closes over the live object it reports on
+        _metrics[name] = Callback(name, help, fn, kind, labels)
+        return _metrics[name]
+
+
+def render():
+    """Every metric in the Prometheus text exposition format."""
+    with _lock:
+        metrics = sorted(_metrics.values(), key=lambda metric: metric.name)
+    return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+def write_textfile(path):
+    """Write render() atomically, as node_exporter's textfile collector expects."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+# ------------------ SPANS ------------------ #
+STAGE_SECONDS = histogram("news_stage_seconds", "Time spent in each pipeline or request stage.", ["stage"])
+STAGE_ERRORS = counter("news_stage_errors_total", "Stages that raised.", ["stage"])
+
+_tracer = None
+if OTEL_TRACES:
+    try:
+        from opentelemetry import trace
+        try:
+            # Exporter settings come from the standard OTEL_EXPORTER_OTLP_* variables
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+        except ImportError:  # API only: spans go to whatever provider is installed (e.g. opentelemetry-instrument)
+            pass
+        _tracer = trace.get_tracer("news-highlights")
+    except ImportError:  # opentelemetry is optional; metrics work without it
+        print("⚠️ OTEL_TRACES is set but opentelemetry is not installed; exporting metrics only")
+
+
+@contextmanager
+def span(stage, **attributes):
+    """Time the block as stage; attributes only go to the trace, so they may be high-cardinality."""
+    scope = _tracer.start_as_current_span(stage, attributes=attributes) if _tracer is not None else nullcontext()
+    start = time.perf_counter()
+    with scope:
+        try:
+            yield
+        except Exception:
+            STAGE_ERRORS.inc(stage=stage)
+            raise
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
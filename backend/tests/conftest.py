@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import backend modules the same way the pipeline scripts and the API do
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
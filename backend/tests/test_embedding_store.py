@@ -0,0 +1,171 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from embedding_store import EmbeddingStore, encode_with_store
+
+MODEL = "test-model"
+
+
+def vec(i, dim=4):
+    return np.full(dim, i, dtype="float32")
+
+
+def vector_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".f32"))
+
+
+def crash_on_keys_write(monkeypatch):
+    def fail(self):
+        raise OSError("disk full")
+    monkeypatch.setattr(EmbeddingStore, "_write_keys", fail)
+
+
+def test_round_trip_through_disk(tmp_path):
+    store = EmbeddingStore(str(tmp_path), MODEL)
+    store.put("a", vec(1))
+    store.put("b", vec(2))
+    assert np.array_equal(store.get("a"), vec(1))
+    store.save()
+
+    reopened = EmbeddingStore(str(tmp_path), MODEL)
+    assert len(reopened) == 2
+    assert np.array_equal(reopened.get("b"), vec(2))
+    assert reopened.get("missing") is None
+    assert (reopened.hits, reopened.misses) == (1, 1)
+
+
+def test_append_interrupted_before_keys_is_ignored_and_overwritten(tmp_path, monkeypatch):
+    store = EmbeddingStore(str(tmp_path), MODEL)
+    store.put("a", vec(1))
+    store.save()
+
+    store.put("b", vec(2))
+    with monkeypatch.context() as m:
+        crash_on_keys_write(m)
+        with pytest.raises(OSError):
+            store.save()
+    # The orphaned row is on disk but keys.json never listed it
+    assert os.path.getsize(store.vectors_path) == 2 * 4 * 4
+
+    reopened = EmbeddingStore(str(tmp_path), MODEL)
+    assert np.array_equal(reopened.get("a"), vec(1))
+    assert reopened.get("b") is None
+    reopened.put("c", vec(3))
+    reopened.save()
+
+    assert os.path.getsize(reopened.vectors_path) == 2 * 4 * 4
+    final = EmbeddingStore(str(tmp_path), MODEL)
+    assert np.array_equal(final.get("c"), vec(3))
+    assert final.get("b") is None
+
+
+def test_compaction_interrupted_before_keys_keeps_previous_generation(tmp_path, monkeypatch):
+    store = EmbeddingStore(str(tmp_path), MODEL, max_entries=2)
+    store.put("a", vec(1))
+    store.put("b", vec(2))
+    store.save()
+    before = vector_files(tmp_path)
+
+    # Evicting both old rows leaves them all dead, which forces a rewrite into a new generation
+    store.put("c", vec(3))
+    store.put("d", vec(4))
+    store.last_used.update({store.key("a"): 0, store.key("b"): 0})
+    with monkeypatch.context() as m:
+        crash_on_keys_write(m)
+        with pytest.raises(OSError):
+            store.save()
+    assert len(vector_files(tmp_path)) == len(before) + 1
+
+    reopened = EmbeddingStore(str(tmp_path), MODEL, max_entries=2)
+    assert np.array_equal(reopened.get("a"), vec(1))
+    assert np.array_equal(reopened.get("b"), vec(2))
+    assert reopened.get("c") is None
+
+    # The next successful save clears out the file the crashed rewrite left behind
+    reopened.save()
+    assert vector_files(tmp_path) == [os.path.basename(reopened.vectors_path)]
+
+
+def test_compaction_moves_to_next_generation_and_removes_the_old_file(tmp_path):
+    store = EmbeddingStore(str(tmp_path), MODEL, max_entries=2)
+    store.put("a", vec(1))
+    store.put("b", vec(2))
+    store.save()
+    first = os.path.basename(store.vectors_path)
+
+    store.put("c", vec(3))
+    store.put("d", vec(4))
+    store.last_used.update({store.key("a"): 0, store.key("b"): 0})
+    store.save()
+
+    assert store.generation == 2
+    assert vector_files(tmp_path) == [os.path.basename(store.vectors_path)]
+    assert os.path.basename(store.vectors_path) != first
+    reopened = EmbeddingStore(str(tmp_path), MODEL, max_entries=2)
+    assert reopened.total_rows == 2
+    assert np.array_equal(reopened.get("d"), vec(4))
+    assert reopened.get("a") is None
+
+
+def test_truncated_vectors_file_rebuilds_the_store(tmp_path):
+    store = EmbeddingStore(str(tmp_path), MODEL)
+    store.put("a", vec(1))
+    store.put("b", vec(2))
+    store.save()
+    with open(store.vectors_path, "r+b") as f:
+        f.truncate(4 * 4)
+
+    reopened = EmbeddingStore(str(tmp_path), MODEL)
+    assert len(reopened) == 0
+    assert reopened.get("a") is None
+    reopened.put("a", vec(1))
+    reopened.save()
+    assert np.array_equal(EmbeddingStore(str(tmp_path), MODEL).get("a"), vec(1))
+
+
+def test_keys_without_generation_read_the_legacy_vectors_file(tmp_path):
+    store = EmbeddingStore(str(tmp_path), MODEL)
+    with open(tmp_path / "vectors.f32", "wb") as f:
+        f.write(vec(7).tobytes())
+    key = store.key("a")
+    with open(tmp_path / "keys.json", "w", encoding="utf-8") as f:
+        json.dump({"model": MODEL, "dim": 4, "total_rows": 1, "rows": {key: 0}, "last_used": {key: 1.0}}, f)
+
+    legacy = EmbeddingStore(str(tmp_path), MODEL)
+    assert legacy.generation == 0
+    assert np.array_equal(legacy.get("a"), vec(7))
+
+
+def test_model_change_invalidates_into_a_new_generation(tmp_path):
+    store = EmbeddingStore(str(tmp_path), MODEL)
+    store.put("a", vec(1))
+    store.save()
+    old_file = store.vectors_path
+
+    other = EmbeddingStore(str(tmp_path), "other-model")
+    assert len(other) == 0
+    other.put("a", vec(9, dim=8))
+    other.save()
+
+    assert other.vectors_path != old_file
+    assert vector_files(tmp_path) == [os.path.basename(other.vectors_path)]
+    assert np.array_equal(EmbeddingStore(str(tmp_path), "other-model").get("a"), vec(9, dim=8))
+
+
+def test_encode_with_store_only_encodes_misses(tmp_path):
+    store = EmbeddingStore(str(tmp_path), MODEL)
+    store.put("cached", vec(1))
+    encoded = []
+
+    class Model:
+        def encode(self, texts, **kwargs):
+            encoded.extend(texts)
+            return [vec(2) for _ in texts]
+
+    vectors = encode_with_store(store, ["cached", "new"], Model)
+    assert encoded == ["new"]
+    assert np.array_equal(vectors, np.vstack([vec(1), vec(2)]))
+    assert encode_with_store(store, ["new"], lambda: pytest.fail("model loaded on a full hit")).shape == (1, 4)
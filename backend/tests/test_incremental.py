@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from incremental import article_hash, content_hash, merge_scrapes, stable_id
+
+
+def article(url, days_ago=0, **fields):
+    return {"url": url, "title": url, "scraped_at": (datetime.now() - timedelta(days=days_ago)).isoformat(), **fields}
+
+
+def urls(data, source, category):
+    return [a["url"] for a in data.get(source, {}).get(category, [])]
+
+
+def test_previous_articles_inside_the_window_are_kept_after_current_ones():
+    previous = {"ABC": {"sport": [article("a", days_ago=1), article("b", days_ago=2)]}}
+    current = {"ABC": {"sport": [article("c")]}}
+    assert urls(merge_scrapes(previous, current, retention_days=7), "ABC", "sport") == ["c", "a", "b"]
+
+
+def test_articles_older_than_retention_are_dropped():
+    previous = {"ABC": {"sport": [article("old", days_ago=10), article("recent", days_ago=1)]}}
+    assert urls(merge_scrapes(previous, {}, retention_days=7), "ABC", "sport") == ["recent"]
+
+
+def test_articles_without_scrape_time_are_dropped():
+    previous = {"ABC": {"sport": [{"url": "undated", "title": "undated"}]}}
+    assert merge_scrapes(previous, {}, retention_days=7) == {}
+
+
+def test_current_scrape_wins_over_previous_copy_of_the_same_url():
+    previous = {"ABC": {"sport": [article("a", days_ago=1, title="stale")]}}
+    current = {"ABC": {"finance": [article("a", title="fresh")]}}
+    merged = merge_scrapes(previous, current, retention_days=7)
+    assert urls(merged, "ABC", "sport") == []
+    assert [a["title"] for a in merged["ABC"]["finance"]] == ["fresh"]
+
+
+def test_url_repeated_in_previous_scrape_is_kept_once():
+    previous = {"ABC": {"sport": [article("a", days_ago=1)]}, "Guardian": {"sport": [article("a", days_ago=1)]}}
+    merged = merge_scrapes(previous, {}, retention_days=7)
+    assert urls(merged, "ABC", "sport") + urls(merged, "Guardian", "sport") == ["a"]
+
+
+def test_sources_and_categories_missing_from_current_are_created():
+    previous = {"The New Daily": {"music": [article("m", days_ago=1)]}}
+    current = {"ABC": {"sport": [article("s")]}}
+    merged = merge_scrapes(previous, current, retention_days=7)
+    assert urls(merged, "ABC", "sport") == ["s"]
+    assert urls(merged, "The New Daily", "music") == ["m"]
+
+
+def test_merge_does_not_mutate_current():
+    current = {"ABC": {"sport": [article("c")]}}
+    merge_scrapes({"ABC": {"sport": [article("a", days_ago=1)]}}, current, retention_days=7)
+    assert urls(current, "ABC", "sport") == ["c"]
+
+
+def test_article_hash_prefers_stored_hash_and_ignores_surrounding_whitespace():
+    assert article_hash({"content_hash": "abc", "title": "t"}) == "abc"
+    assert article_hash({"title": " t ", "raw_text": "body\n"}) == content_hash("t", "body")
+    assert article_hash({"title": "t", "raw_text": "body"}) != article_hash({"title": "t", "raw_text": "other"})
+
+
+def test_stable_id_is_deterministic_and_fits_a_positive_int64():
+    ids = {stable_id(f"https://example.com/{i}") for i in range(1000)}
+    assert len(ids) == 1000
+    assert all(0 <= i < 2 ** 60 for i in ids)
+    assert stable_id("https://example.com/0") == stable_id("https://example.com/0")
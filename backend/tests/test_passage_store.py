@@ -0,0 +1,54 @@
+from passage_store import PassageStore, chunk_articles, chunk_spans, write_passage_store
+
+
+def words_of(text_bytes, spans):
+    return [text_bytes[start:end].decode("utf-8").split() for start, end in spans]
+
+
+def test_windows_overlap_and_cover_every_word():
+    text = " ".join(f"w{i}" for i in range(10)).encode("utf-8")
+    chunks = words_of(text, chunk_spans(text, words=4, overlap=1))
+    assert chunks == [["w0", "w1", "w2", "w3"], ["w3", "w4", "w5", "w6"], ["w6", "w7", "w8", "w9"]]
+
+
+def test_last_window_is_not_repeated_when_it_reaches_the_end():
+    text = " ".join(f"w{i}" for i in range(5)).encode("utf-8")
+    assert words_of(text, chunk_spans(text, words=4, overlap=2)) == [["w0", "w1", "w2", "w3"], ["w2", "w3", "w4"]]
+
+
+def test_short_and_empty_texts():
+    assert chunk_spans(b"one two", words=4, overlap=1) == [(0, 7)]
+    assert chunk_spans(b"", words=4, overlap=1) == []
+    assert chunk_spans(b"  \n\t ", words=4, overlap=1) == []
+
+
+def test_overlap_not_smaller_than_window_still_advances():
+    text = b"a b c"
+    assert words_of(text, chunk_spans(text, words=2, overlap=5)) == [["a", "b"], ["b", "c"]]
+
+
+def test_spans_fall_on_utf8_boundaries():
+    text = "Café naïve – déjà vu über straße".encode("utf-8")
+    for start, end in chunk_spans(text, words=2, overlap=1):
+        text[start:end].decode("utf-8")
+
+
+def test_chunk_articles_offsets_point_into_the_joined_text(tmp_path):
+    articles = [
+        {"url": "u1", "title": "One", "raw_text": "alpha beta gamma delta"},
+        {"url": "u2", "title": "Empty", "raw_text": "   "},
+        {"url": "u3", "title": "Three", "raw_text": "épsilon zeta"},
+    ]
+    records, texts, passages = chunk_articles(articles, words=3, overlap=1)
+    # Articles without text get no record, so passage rows still index into records
+    assert [record["url"] for record in records] == ["u1", "u3"]
+    assert passages["article"].tolist() == [0, 0, 1]
+    assert texts[passages[2]["start"]:passages[2]["end"]].decode("utf-8") == "épsilon zeta"
+
+    write_passage_store(tmp_path, records, texts, passages)
+    store = PassageStore(tmp_path)
+    assert [store.text(i) for i in range(len(store))] == ["alpha beta gamma", "gamma delta", "épsilon zeta"]
+    grouped = store.group_by_article([2, 1, 0], [0.9, 0.8, 0.7], k=5, per_article=2)
+    assert [article["url"] for article in grouped] == ["u3", "u1"]
+    # Passages come back in document order, not score order
+    assert grouped[1]["passages"] == ["alpha beta gamma", "gamma delta"]
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+from metadata_store import JsonMetadata
+from index_factory import create_index, prepare_vectors
+from api.index_state import IndexState
+
+ITEMS = [
+    {"id": 10, "title": "RBA holds interest rates", "summary": "The Reserve Bank kept the cash rate on hold.",
+     "category": "Finance", "sources": ["ABC News"]},
+    {"id": 11, "title": "Matildas win in Perth", "summary": "A late goal sealed the match.",
+     "category": "Sport", "sources": ["The Guardian"]},
+    {"id": 12, "title": "Banks pass on rate cut", "summary": "Lenders cut variable rates after the RBA decision.",
+     "category": "Finance", "sources": ["The Guardian", "ABC News"]},
+    {"id": 13, "title": "Festival line-up announced", "summary": "Headliners include a local band.",
+     "category": "Music", "sources": ["ABC News"]},
+]
+# One axis per item, so vector similarity is fully under the test's control
+VECTORS = np.eye(4, dtype="float32")
+
+
+def make_state():
+    index, _ = create_index("flat_ip", 4, VECTORS)
+    index.add_with_ids(prepare_vectors(VECTORS, "flat_ip"), np.array([item["id"] for item in ITEMS], dtype="int64"))
+    return IndexState({"version": "test", "index": index, "metadata": JsonMetadata(ITEMS),
+                       "manifest": {"index_type": "flat_ip"}, "bm25": None})
+
+
+def test_tokenize_keeps_names_and_drops_stopwords():
+    assert tokenize("What did O'Brien say about BHP.AX and the ASX?") == ["o'brien", "say", "bhp.ax", "asx"]
+
+
+def test_bm25_ranks_matching_documents_and_respects_allowed():
+    bm25 = BM25Index.build(ITEMS)
+    ranked = [doc_id for doc_id, _ in bm25.search("rba rate cut", 10)]
+    assert ranked[0] == 12
+    assert set(ranked) == {10, 12}
+    assert [doc_id for doc_id, _ in bm25.search("rba rate cut", 10, allowed={10})] == [10]
+    assert bm25.search("unknown words only", 10) == []
+
+
+def test_bm25_round_trips_through_dict():
+    bm25 = BM25Index.build(ITEMS)
+    restored = BM25Index.from_dict(bm25.to_dict())
+    assert restored.search("rba rates", 5) == bm25.search("rba rates", 5)
+
+
+def test_reciprocal_rank_fusion():
+    assert reciprocal_rank_fusion([[1, 2, 3]]) == [1, 2, 3]
+    # Ranked by both lists beats first in only one
+    assert reciprocal_rank_fusion([[1, 2], [3, 2]])[0] == 2
+    # Lower k rewards top ranks more: 3 is first once in one list, 4 second in both
+    assert reciprocal_rank_fusion([[3, 4], [5, 4]], k=1)[0] == 4
+    assert reciprocal_rank_fusion([[3, 4, 6], [3, 6]], k=1)[:2] == [3, 6]
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_allowed_ids_filters_case_insensitively():
+    state = make_state()
+    assert state.allowed_ids() is None
+    assert state.allowed_ids(category="finance") == {10, 12}
+    assert state.allowed_ids(source="the guardian") == {11, 12}
+    assert state.allowed_ids(category="Finance", source="The Guardian") == {12}
+    assert state.allowed_ids(category="weather") == set()
+
+
+def test_vector_search_respects_filters():
+    state = make_state()
+    query = VECTORS[[1]]
+    assert state.vector_search(query, 1) == [[11]]
+    # Nearest is Sport; the Finance filter must exclude it inside FAISS
+    assert 11 not in state.vector_search(query, 4, state.allowed_ids(category="finance"))[0]
+    assert state.vector_search(query, 4, set()) == [[]]
+
+
+def test_search_groups_queries_by_filter(monkeypatch):
+    monkeypatch.setattr("api.index_state.HYBRID_RETRIEVAL", False)
+    state = make_state()
+    queries = VECTORS[[1, 1]]
+    results = state.search(queries, [2, 2], filters=[(None, None), ("music", None)])
+    assert results[0][0]["id"] == 11
+    assert [item["id"] for item in results[1]] == [13]
+
+
+def test_hybrid_search_fuses_lexical_matches(monkeypatch):
+    monkeypatch.setattr("api.index_state.HYBRID_RETRIEVAL", True)
+    state = make_state()
+    # The vector points at the festival story; the words point at the rate stories
+    results = state.search(VECTORS[[3]], [4], queries=["rba rate cut"])
+    ids = [item["id"] for item in results[0]]
+    # Matching both words well and being a vector candidate puts 12 first; 10 matches words, 11 neither
+    assert ids[0] == 12
+    assert ids.index(10) < ids.index(11)
+    assert 13 in ids
+
+
+def test_ranked_returns_scores_best_first():
+    state = make_state()
+    results = state.ranked(VECTORS[[0]], 2)
+    assert results[0]["id"] == 10
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[0]["score"] >= results[1]["score"]
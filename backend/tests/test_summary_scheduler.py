@@ -0,0 +1,45 @@
+from summary_scheduler import ThroughputReport, plan_batches
+
+
+def padded_size(batch, lengths):
+    return len(batch) * max(lengths[i] for i in batch)
+
+
+def test_every_item_is_scheduled_once():
+    lengths = [50, 400, 120, 80, 300, 20, 510, 90]
+    batches = plan_batches(lengths, token_budget=1024, max_batch=8)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+
+def test_batches_stay_within_budget_and_group_similar_lengths():
+    lengths = [50, 400, 120, 80, 300, 20, 510, 90]
+    batches = plan_batches(lengths, token_budget=1024, max_batch=8)
+    assert all(padded_size(batch, lengths) <= 1024 for batch in batches)
+    # Sorted by length: each batch's items are no longer than the next batch's
+    for batch, following in zip(batches, batches[1:]):
+        assert max(lengths[i] for i in batch) <= min(lengths[i] for i in following)
+
+
+def test_max_batch_caps_batch_size():
+    batches = plan_batches([10] * 10, token_budget=10_000, max_batch=4)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_item_longer_than_budget_gets_its_own_batch():
+    batches = plan_batches([2000, 10, 10], token_budget=512, max_batch=8)
+    assert batches == [[1, 2], [0]]
+
+
+def test_empty_input():
+    assert plan_batches([], token_budget=512, max_batch=8) == []
+
+
+def test_throughput_report_padding_ratio():
+    report = ThroughputReport()
+    report.add([10, 30], 1.0)
+    report.add([20], 1.0)
+    stats = report.as_dict()
+    assert stats["articles"] == 3 and stats["batches"] == 2
+    # 60 real tokens in 2 × 30 + 1 × 20 = 80 padded ones
+    assert stats["padding_ratio"] == 0.25
+    assert stats["articles_per_sec"] == 1.5
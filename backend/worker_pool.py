@@ -0,0 +1,144 @@
+# === worker_pool.py === (multi-process CPU inference for summarisation and bulk embedding)
+import os
+import sys
+import time
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+from config import INFERENCE_WORKERS, INFERENCE_THREADS_PER_WORKER
+
+
+def threads_per_worker(workers, threads=INFERENCE_THREADS_PER_WORKER):
+    return threads or max(1, (os.cpu_count() or 1) // workers)
+
+
+def _init_worker(threads):
+    # Pin intra-op threads so N workers split the cores instead of each spinning up one thread per core
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+
+def _warm(_):
+    from model_registry import get_summarizer, get_embedder
+    get_summarizer()
+    get_embedder()
+    return os.getpid()
+
+
+def _summarize_shard(texts):
+    from model_registry import get_summarizer
+    from summary_scheduler import ThroughputReport, summarize_scheduled
+    articles = [{} for _ in texts]
+    report = ThroughputReport()
+    summarize_scheduled(get_summarizer(), articles, texts, report)
+    return [article.get("summary") for article in articles], report.counters()
+
+
+def _encode_shard(args):
+    texts, batch_size = args
+    from model_registry import get_embedder
+    return np.asarray(get_embedder().encode(texts, batch_size=batch_size, show_progress_bar=False), dtype="float32")
+
+
+def balanced_shards(sizes, workers):
+    """Deal item indices to workers longest-first so every shard gets a similar amount of text.
+
+    Each shard keeps its indices in ascending order, so results can be merged back by index.
+    """
+    shards = [[] for _ in range(min(workers, len(sizes)))]
+    for n, i in enumerate(sorted(range(len(sizes)), key=lambda i: -sizes[i])):
+        shards[n % len(shards)].append(i)
+    return [sorted(shard) for shard in shards]
+
+
+class WorkerPool:
+    """N spawned processes, each with its own copy of the models and a pinned torch thread count."""
+
+    def __init__(self, workers=INFERENCE_WORKERS, threads=INFERENCE_THREADS_PER_WORKER):
+        self.workers = workers
+        self.threads = threads_per_worker(workers, threads)
+        # spawn, not fork: the parent already runs threads (and possibly torch) that must not be cloned
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.threads,),
+        )
+
+    def warm(self):
+        """Start the workers and load their models; returns how many distinct workers answered."""
+        return len(set(self.executor.map(_warm, range(self.workers))))
+
+    def summarize(self, texts, report=None):
+        """Summaries for texts in input order (None where a batch failed)."""
+        start = time.perf_counter()
+        summaries = [None] * len(texts)
+        shards = balanced_shards([len(text) for text in texts], self.workers)
+        for shard, (results, counters) in zip(shards, self.executor.map(_summarize_shard, [[texts[i] for i in shard] for shard in shards])):
+            for i, summary in zip(shard, results):
+                summaries[i] = summary
+            if report is not None:
+                report.merge(counters)
+        if report is not None:
+            report.seconds += time.perf_counter() - start
+        return summaries
+
+    def encode(self, texts, batch_size=16):
+        """Embeddings for texts in input order, encoded in contiguous shards."""
+        shards = [list(shard) for shard in np.array_split(np.array(texts, dtype=object), min(self.workers, len(texts))) if len(shard)]
+        return np.vstack(list(self.executor.map(_encode_shard, [(shard, batch_size) for shard in shards])))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class PooledEncoder:
+    """Drop-in for SentenceTransformer.encode that fans texts out to the worker pool."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def encode(self, texts, batch_size=16, show_progress_bar=False):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype="float32")
+        return self.pool.encode(texts, batch_size=batch_size)
+
+    def get_sentence_embedding_dimension(self):
+        return self.pool.encode(["dimension probe"]).shape[1]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide WorkerPool, or None when INFERENCE_WORKERS <= 1 (inference stays in-process)."""
+    global _pool
+    if INFERENCE_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+            atexit.register(_pool.shutdown)
+            print(f"🧵 Started {_pool.workers} inference workers × {_pool.threads} threads")
+        return _pool
+
+
+def get_encoder():
+    """Model for bulk encoding: the worker pool when enabled, otherwise the shared in-process embedder."""
+    pool = get_pool()
+    if pool is not None:
+        return PooledEncoder(pool)
+    from model_registry import get_embedder
+    return get_embedder()
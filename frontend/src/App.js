@@ -21,13 +21,45 @@ function App() {
     setSources([]);
 
     try {
-      const res = await axios.post("http://localhost:8000/api/chat-query", {
-        query,
-        top_k: 3,
+      // Sources arrive as soon as retrieval is done; answer tokens follow as they are generated
+      const res = await fetch("http://localhost:8000/api/chat-query/stream", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ query, top_k: 3 }),
       });
 
-      setAnswer(res.data.answer);
-      setSources(res.data.sources || []);
+      if (!res.headers.get("content-type")?.includes("text/event-stream")) {
+        const data = await res.json();
+        setAnswer(data.error ? `❌ Error: ${data.error}` : data.answer);
+        return;
+      }
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || "null");
+          if (event === "sources") {
+            setSources(data || []);
+          } else if (event === "token") {
+            setLoading(false);
+            setAnswer(prev => prev + data.text);
+          } else if (event === "done") {
+            setAnswer(data.answer);
+          } else if (event === "error") {
+            setAnswer("❌ Error: Could not fetch answer.");
+          }
+        }
+      }
     } catch (err) {
       setAnswer("❌ Error: Could not fetch answer.");
       console.error(err);